@@ -0,0 +1,30 @@
+"""seed_lexicons_cache_version
+
+Revision ID: a8c4e1f7d2b9
+Revises: f3b9c2d4e8a1
+Create Date: 2025-10-16 20:51:08.314205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4e1f7d2b9'
+down_revision: Union[str, Sequence[str], None] = 'f3b9c2d4e8a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Version counter of the compiled lexicon caches
+    cache_versions = sa.table('cache_versions', sa.column('name', sa.String()), sa.column('version', sa.BigInteger()))
+    op.bulk_insert(cache_versions, [{'name': 'lexicons', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM cache_versions WHERE name = 'lexicons'")
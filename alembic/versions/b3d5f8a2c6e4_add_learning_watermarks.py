@@ -0,0 +1,39 @@
+"""add_learning_watermarks
+
+Revision ID: b3d5f8a2c6e4
+Revises: a8c4e1f7d2b9
+Create Date: 2025-10-16 22:14:41.508326
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d5f8a2c6e4'
+down_revision: Union[str, Sequence[str], None] = 'a8c4e1f7d2b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Newest correction timestamp each incremental learner has processed
+    op.create_table(
+        'learning_watermarks',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('watermark', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    # Incremental learning scans corrections by timestamp, then regroups the touched originals
+    op.create_index('ix_corrections_timestamp', 'corrections', ['timestamp'])
+    op.create_index('ix_corrections_original_text', 'corrections', ['original_text'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_corrections_original_text', table_name='corrections')
+    op.drop_index('ix_corrections_timestamp', table_name='corrections')
+    op.drop_table('learning_watermarks')
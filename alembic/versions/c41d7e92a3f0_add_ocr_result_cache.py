@@ -0,0 +1,46 @@
+"""add_ocr_result_cache
+
+Revision ID: c41d7e92a3f0
+Revises: 5b0998fcad9b
+Create Date: 2025-10-16 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e92a3f0'
+down_revision: Union[str, Sequence[str], None] = '5b0998fcad9b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Content hash of the uploaded file
+    op.add_column('documents', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_documents_content_hash', 'documents', ['content_hash'])
+
+    # OCR results cache keyed by content hash and model version
+    op.create_table(
+        'ocr_cache_entries',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('model_version', sa.String(), nullable=False),
+        sa.Column('document_id', UUID(as_uuid=True), sa.ForeignKey('documents.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('content_hash', 'model_version', name='uq_ocr_cache_hash_model')
+    )
+    op.create_index('ix_ocr_cache_entries_content_hash', 'ocr_cache_entries', ['content_hash'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ocr_cache_entries_content_hash', table_name='ocr_cache_entries')
+    op.drop_table('ocr_cache_entries')
+    op.drop_index('ix_documents_content_hash', table_name='documents')
+    op.drop_column('documents', 'content_hash')
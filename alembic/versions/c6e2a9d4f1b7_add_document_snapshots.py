@@ -0,0 +1,37 @@
+"""add_document_snapshots
+
+Revision ID: c6e2a9d4f1b7
+Revises: b3d5f8a2c6e4
+Create Date: 2025-10-16 23:02:57.916450
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e2a9d4f1b7'
+down_revision: Union[str, Sequence[str], None] = 'b3d5f8a2c6e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Corrected OCR data per document, tagged with the versions it was built from
+    op.create_table(
+        'document_snapshots',
+        sa.Column('document_id', UUID(as_uuid=True), sa.ForeignKey('documents.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('corrections_version', sa.BigInteger(), nullable=False),
+        sa.Column('lexicons_version', sa.BigInteger(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('document_snapshots')
@@ -0,0 +1,35 @@
+"""add_cache_versions
+
+Revision ID: d7a3e91c5b20
+Revises: c41d7e92a3f0
+Create Date: 2025-10-16 14:03:17.220941
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3e91c5b20'
+down_revision: Union[str, Sequence[str], None] = 'c41d7e92a3f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Version counters used to invalidate per-process caches
+    cache_versions = op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.bulk_insert(cache_versions, [{'name': 'corrections', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cache_versions')
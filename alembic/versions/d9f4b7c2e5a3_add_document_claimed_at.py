@@ -0,0 +1,29 @@
+"""add_document_claimed_at
+
+Revision ID: d9f4b7c2e5a3
+Revises: c6e2a9d4f1b7
+Create Date: 2025-10-17 09:41:12.384517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f4b7c2e5a3'
+down_revision: Union[str, Sequence[str], None] = 'c6e2a9d4f1b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Last time a worker claimed the document or made progress on it
+    op.add_column('documents', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'claimed_at')
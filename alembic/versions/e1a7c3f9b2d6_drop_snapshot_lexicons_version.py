@@ -0,0 +1,31 @@
+"""drop_snapshot_lexicons_version
+
+Revision ID: e1a7c3f9b2d6
+Revises: d9f4b7c2e5a3
+Create Date: 2025-10-17 14:26:03.518274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a7c3f9b2d6'
+down_revision: Union[str, Sequence[str], None] = 'd9f4b7c2e5a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Snapshots only apply the correction index, which no longer depends on the lexicons
+    op.drop_column('document_snapshots', 'lexicons_version')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Existing snapshots are marked stale; the refresher rebuilds them
+    op.add_column('document_snapshots', sa.Column('lexicons_version', sa.BigInteger(), nullable=False, server_default='-1'))
+    op.alter_column('document_snapshots', 'lexicons_version', server_default=None)
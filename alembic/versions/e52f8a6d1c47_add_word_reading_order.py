@@ -0,0 +1,34 @@
+"""add_word_reading_order
+
+Revision ID: e52f8a6d1c47
+Revises: d7a3e91c5b20
+Create Date: 2025-10-16 16:41:05.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e52f8a6d1c47'
+down_revision: Union[str, Sequence[str], None] = 'd7a3e91c5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Reading order computed at ingest; existing rows are filled by
+    # `python manage.py backfill-reading-order`
+    op.add_column('words', sa.Column('line_index', sa.Integer(), nullable=True))
+    op.add_column('words', sa.Column('word_index', sa.Integer(), nullable=True))
+    op.create_index('ix_words_page_reading_order', 'words', ['page_id', 'line_index', 'word_index'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_words_page_reading_order', table_name='words')
+    op.drop_column('words', 'word_index')
+    op.drop_column('words', 'line_index')
@@ -0,0 +1,29 @@
+"""add_document_page_count
+
+Revision ID: f3b9c2d4e8a1
+Revises: e52f8a6d1c47
+Create Date: 2025-10-16 18:22:49.671033
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9c2d4e8a1'
+down_revision: Union[str, Sequence[str], None] = 'e52f8a6d1c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Total pages of a document, known before all of them are recognized
+    op.add_column('documents', sa.Column('page_count', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'page_count')
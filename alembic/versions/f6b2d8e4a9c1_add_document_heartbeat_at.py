@@ -0,0 +1,29 @@
+"""add_document_heartbeat_at
+
+Revision ID: f6b2d8e4a9c1
+Revises: e1a7c3f9b2d6
+Create Date: 2025-10-17 16:05:47.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b2d8e4a9c1'
+down_revision: Union[str, Sequence[str], None] = 'e1a7c3f9b2d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Last sign of life of the worker holding the claim; claimed_at now stays fixed per claim
+    op.add_column('documents', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'heartbeat_at')
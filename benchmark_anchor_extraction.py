@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Benchmark anchor-based field extraction against the previous scalar implementation.
+
+The previous extractor ran re.search with the raw pattern strings for every word,
+field and pattern, and again for every candidate value, and scored candidates one
+pair at a time in Python. Both extractors run over the stored OCR outputs in
+data/outputs and over a synthetic dense page; their AnchorMatch results are compared
+before timing.
+
+Usage:
+    python benchmark_anchor_extraction.py --limit 50 --dense-words 2000 --runs 3
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from postprocessing.anchors import AnchorExtractor, AnchorMatch, PositionedWords
+
+BASE_DIR = Path(__file__).resolve().parent
+OUTPUT_DIR = BASE_DIR / "data" / "outputs"
+
+class LegacyAnchorExtractor(AnchorExtractor):
+    """AnchorExtractor with its previous pattern matching and per-candidate scoring."""
+
+    def _classify_anchor_words(self, words: List[Dict]) -> Dict[str, List[Dict]]:
+        return {
+            field_name: self._find_anchor_words(words, config["patterns"])
+            for field_name, config in self.field_anchors.items()
+        }
+
+    def _find_anchor_words(self, words: List[Dict], patterns: List[str]) -> List[Dict]:
+        anchor_words = []
+        for word in words:
+            text = word["text"].lower()
+            for pattern in patterns:
+                if re.search(pattern, text, re.IGNORECASE):
+                    anchor_words.append(word)
+                    break
+        return anchor_words
+
+    def _matches_value_patterns(self, text: str, patterns: List[str]) -> bool:
+        for pattern in patterns:
+            if re.search(pattern, text, re.IGNORECASE):
+                return True
+        return False
+
+    def _find_anchored_values(self, words: List[Dict], field_name: str, field_config: Dict,
+                              anchor_words: Optional[List[Dict]] = None) -> List[AnchorMatch]:
+        matches = []
+        if not isinstance(words, PositionedWords):
+            words = PositionedWords(words)
+        anchor_words = self._find_anchor_words(words, field_config["patterns"])
+        for anchor_word in anchor_words:
+            for direction in field_config["search_directions"]:
+                for candidate, distance in self._find_candidates_in_direction(words, anchor_word, direction):
+                    if self._matches_value_patterns(candidate["text"], field_config["value_patterns"]):
+                        matches.append(AnchorMatch(
+                            field_name=field_name,
+                            anchor_text=anchor_word["text"],
+                            value_text=candidate["text"],
+                            confidence=self._calculate_anchor_confidence(anchor_word, candidate, distance, direction),
+                            anchor_bbox=anchor_word["bbox"],
+                            value_bbox=candidate["bbox"],
+                            distance=distance
+                        ))
+        return matches
+
+    def _find_best_anchored_value(self, words: List[Dict], field_name: str, field_config: Dict,
+                                  anchor_words: Optional[List[Dict]] = None) -> Optional[AnchorMatch]:
+        matches = self._find_anchored_values(words, field_name, field_config, anchor_words)
+        return max(matches, key=lambda m: m.confidence) if matches else None
+
+def load_stored_outputs(limit: Optional[int] = None) -> List[Tuple[str, Dict]]:
+    """(doc_id, OCR data) for the stored DocTR outputs."""
+    documents = []
+    for path in sorted(OUTPUT_DIR.glob("*.json")):
+        if "_" in path.stem:
+            # _raw, _layout, _quality, ... side files
+            continue
+        if limit is not None and len(documents) >= limit:
+            break
+        documents.append((path.stem, json.loads(path.read_text())))
+    return documents
+
+def make_dense_page(word_count: int, rng: random.Random, anchor_share: float = 0.03) -> Dict:
+    """
+    One synthetic statement page with word_count words in a grid of lines, of which
+    about anchor_share are field labels and the rest line-item text and values.
+    """
+    anchors = ["Total", "Amount due", "Invoice No", "Date", "Balance", "Customer", "from"]
+    fillers = ["INV-2024-001", "12/05/2024", "1,234.56", "$ 99.00", "ACME Corp", "item", "qty",
+               "Widget", "Service", "EA", "Shipping", "Qty", "Unit", "Price"]
+    per_line = 12
+    lines = []
+    for line_idx in range(0, word_count, per_line):
+        y = 0.02 + 0.96 * (line_idx // per_line) / max(1, word_count // per_line)
+        words = []
+        for column in range(min(per_line, word_count - line_idx)):
+            x = 0.02 + column * 0.08
+            words.append({
+                "value": rng.choice(anchors if rng.random() < anchor_share else fillers),
+                "confidence": rng.uniform(0.5, 1.0),
+                "geometry": [[x, y], [x + 0.06, y + 0.004]]
+            })
+        lines.append({"words": words})
+    return {"pages": [{"blocks": [{"lines": lines}]}]}
+
+def all_matches(extractor: AnchorExtractor, ocr_data: Dict) -> Dict[str, List[AnchorMatch]]:
+    """Every AnchorMatch per field, before the best one is picked."""
+    words = extractor._extract_words_with_positions(ocr_data)
+    anchors_by_field = extractor._classify_anchor_words(words)
+    return {
+        field_name: extractor._find_anchored_values(words, field_name, config, anchors_by_field[field_name])
+        for field_name, config in extractor.field_anchors.items()
+    }
+
+def time_extraction(extractor: AnchorExtractor, documents: List[Dict], runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        for ocr_data in documents:
+            extractor.extract_anchored_fields(ocr_data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark anchor-based field extraction.")
+    parser.add_argument("--limit", type=int, default=None, help="Stored documents to use.")
+    parser.add_argument("--dense-words", type=int, default=2000, help="Words on the synthetic page.")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    legacy = LegacyAnchorExtractor()
+    current = AnchorExtractor()
+
+    stored = [ocr_data for _, ocr_data in load_stored_outputs(args.limit)]
+    dense = [make_dense_page(args.dense_words, random.Random(0))]
+
+    for name, documents in (("stored outputs", stored), (f"{args.dense_words}-word page", dense)):
+        if not documents:
+            continue
+        for ocr_data in documents:
+            if all_matches(legacy, ocr_data) != all_matches(current, ocr_data):
+                raise SystemExit(f"{name}: extractors disagree")
+        legacy_seconds = time_extraction(legacy, documents, args.runs)
+        current_seconds = time_extraction(current, documents, args.runs)
+        print(f"{name:>18} ({len(documents)} documents): legacy {legacy_seconds * 1000:9.1f} ms  "
+              f"current {current_seconds * 1000:9.1f} ms  ({legacy_seconds / current_seconds:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""
+Benchmark the correction engine against the previous O(words x corrections) loop.
+
+Generates a synthetic correction history (MRZ-like codes, names with trailing
+'<' / '*' filler, case variants and colliding timestamps) and a synthetic document,
+applies both engines and checks that their output is identical before timing them.
+
+Usage:
+    python benchmark_correction_engine.py --corrections 5000 --words 4000 --runs 3
+"""
+
+import argparse
+import copy
+import random
+import string
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from corrections.correction_index import CorrectionIndex
+
+def legacy_apply_corrections(ocr_data, corrections):
+    """The matching loop used by main.apply_corrections_to_ocr_data before CorrectionIndex."""
+    if not corrections:
+        return ocr_data
+
+    sorted_corrections = sorted(
+        corrections,
+        key=lambda c: c.timestamp if c.timestamp else datetime.min,
+        reverse=True
+    )
+
+    exact_match_map = {}
+    fuzzy_match_map = {}
+    prefix_match_list = []
+
+    for correction in sorted_corrections:
+        original = correction.original_text
+        corrected = correction.corrected_text
+        timestamp = correction.timestamp if correction.timestamp else datetime.min
+
+        if original not in exact_match_map or timestamp > exact_match_map[original][1]:
+            exact_match_map[original] = (corrected, timestamp)
+
+        original_clean = original.rstrip('<*. ')
+        if original_clean:
+            if original_clean not in fuzzy_match_map or timestamp > fuzzy_match_map[original_clean][1]:
+                fuzzy_match_map[original_clean] = (corrected, timestamp)
+
+        prefix_match_list.append((original, corrected, timestamp))
+
+    for page in ocr_data.get("pages", []):
+        for block in page.get("blocks", []):
+            for line in block.get("lines", []):
+                for word in line.get("words", []):
+                    original_value = word.get("value", "")
+                    if not original_value:
+                        continue
+
+                    candidates = []
+                    value_clean = original_value.rstrip('<*. ')
+
+                    if original_value in exact_match_map:
+                        corr_text, corr_time = exact_match_map[original_value]
+                        candidates.append((corr_text, corr_time, "exact", 1))
+
+                    if value_clean in fuzzy_match_map:
+                        corr_text, corr_time = fuzzy_match_map[value_clean]
+                        candidates.append((corr_text, corr_time, "fuzzy", 2))
+
+                    for orig, corr, corr_time in prefix_match_list:
+                        orig_clean = orig.rstrip('<*. ')
+                        if orig_clean and value_clean.startswith(orig_clean):
+                            if len(original_value) - len(orig_clean) < 5:
+                                suffix = original_value[len(orig_clean):]
+                                candidates.append((corr + suffix, corr_time, "prefix", 3))
+
+                    for exact_original, (exact_corrected, corr_time) in exact_match_map.items():
+                        if exact_original.lower() == original_value.lower() and exact_original != original_value:
+                            candidates.append((exact_corrected, corr_time, "case_insensitive", 4))
+
+                    if candidates:
+                        candidates.sort(key=lambda x: (x[1], -x[3]), reverse=True)
+                        best_correction, best_time, best_method, _ = candidates[0]
+
+                        word["value"] = best_correction
+                        word["corrected"] = True
+                        word["original_value"] = original_value
+                        word["correction_method"] = best_method
+
+    return ocr_data
+
+def make_corrections(count: int, rng: random.Random, alphabet: str = "ABCab", max_len: int = 8):
+    """Build correction records with many collisions between strategies."""
+    base_time = datetime(2025, 1, 1)
+    corrections = []
+    for _ in range(count):
+        original = "".join(rng.choices(alphabet, k=rng.randint(1, max_len)))
+        original += "".join(rng.choices("<*. ", k=rng.choice((0, 0, 1, 2))))
+        corrected = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, max_len)))
+        # Few distinct timestamps so ties are common; some rows have none
+        timestamp = None if rng.random() < 0.05 else base_time + timedelta(minutes=rng.randint(0, count // 4 + 1))
+        corrections.append(SimpleNamespace(original_text=original, corrected_text=corrected, timestamp=timestamp))
+    return corrections
+
+def make_document(word_count: int, corrections, rng: random.Random, alphabet: str = "ABCab", max_len: int = 8):
+    """Build a DocTR-shaped export mixing corrected originals, variants and noise."""
+    words = []
+    for _ in range(word_count):
+        roll = rng.random()
+        if roll < 0.3 and corrections:
+            value = rng.choice(corrections).original_text
+        elif roll < 0.45 and corrections:
+            value = rng.choice(corrections).original_text.swapcase()
+        elif roll < 0.65 and corrections:
+            value = rng.choice(corrections).original_text + "".join(rng.choices(alphabet + "<*", k=rng.randint(1, 6)))
+        else:
+            value = "".join(rng.choices(alphabet + "<* .", k=rng.randint(0, max_len + 4)))
+        words.append({"value": value, "confidence": 0.9, "geometry": [[0, 0], [1, 1]]})
+
+    lines = [{"words": words[i:i + 10]} for i in range(0, len(words), 10)]
+    return {"pages": [{"page_idx": 0, "blocks": [{"lines": lines}]}]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the OCR correction engine.")
+    parser.add_argument("--corrections", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=4000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corrections = make_corrections(args.corrections, rng)
+    document = make_document(args.words, corrections, rng)
+
+    legacy_output = legacy_apply_corrections(copy.deepcopy(document), corrections)
+    indexed_output = copy.deepcopy(document)
+    CorrectionIndex(corrections).apply(indexed_output)
+    if legacy_output != indexed_output:
+        raise SystemExit("Engines disagree: indexed output differs from the legacy loop")
+    corrected = sum(1 for line in legacy_output["pages"][0]["blocks"][0]["lines"]
+                    for word in line["words"] if word.get("corrected"))
+    print(f"{args.corrections} corrections, {args.words} words: identical output ({corrected} words corrected)")
+
+    def run_legacy(data):
+        legacy_apply_corrections(data, corrections)
+
+    def run_indexed(data):
+        CorrectionIndex(corrections).apply(data)
+
+    for name, engine in (("legacy loop", run_legacy), ("index", run_indexed)):
+        timings = []
+        for _ in range(args.runs):
+            data = copy.deepcopy(document)
+            start = time.perf_counter()
+            engine(data)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:>12}: best {min(timings) * 1000:9.1f} ms  "
+              f"mean {sum(timings) / len(timings) * 1000:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Benchmark edit-distance lexicon lookups as LexiconProcessor runs them: the SymSpell
+index of a lexicon snapshot against a brute-force scan computing the bounded edit
+distance to every entry.
+
+Generates a synthetic lexicon of OCR-like tokens (codes, names, amounts) and
+queries that are lexicon entries with up to two random edits, checks that both
+approaches return the same closest terms on a sample, then times them. Also times
+deriving the next snapshot from a batch of learned entries, which extends the
+SymSpell index instead of rebuilding it.
+
+Usage:
+    python benchmark_fuzzy_lexicon.py --entries 100000 --queries 2000 --verify 50 --learned 100
+"""
+
+import argparse
+import random
+import string
+import time
+
+from corrections.symspell import edit_distance
+from postprocessing.lexicon_cache import FuzzyLexicon, _fuzzy_key
+
+def make_term(rng: random.Random) -> str:
+    length = rng.randint(4, 14)
+    # Mostly words; codes and amounts are skipped by the edit-distance index
+    alphabet = rng.choices([string.ascii_lowercase, string.ascii_lowercase + string.digits, string.digits + "-/."],
+                           weights=[8, 1, 1])[0]
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+def mutate(term: str, edits: int, rng: random.Random) -> str:
+    chars = list(term)
+    for _ in range(edits):
+        operation = rng.choice(["insert", "delete", "substitute", "transpose"])
+        position = rng.randrange(len(chars)) if chars else 0
+        if operation == "insert" or not chars:
+            chars.insert(position, rng.choice(string.ascii_lowercase))
+        elif operation == "delete":
+            del chars[position]
+        elif operation == "substitute":
+            chars[position] = rng.choice(string.ascii_lowercase)
+        elif position + 1 < len(chars):
+            chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    return "".join(chars)
+
+def brute_force_lookup(terms, word: str, max_distance: int):
+    best_distance = max_distance
+    closest = []
+    for term in terms:
+        distance = edit_distance(word, term, best_distance)
+        if distance is None:
+            continue
+        if distance < best_distance:
+            best_distance, closest = distance, [term]
+        else:
+            closest.append(term)
+    return [(term, best_distance) for term in closest]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark edit-distance lexicon lookups.")
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--verify", type=int, default=50, help="Queries also run by brute force.")
+    parser.add_argument("--learned", type=int, default=100, help="Entries added to the built snapshot.")
+    parser.add_argument("--max-edit-distance", type=int, default=2)
+    parser.add_argument("--prefix-length", type=int, default=7)
+    parser.add_argument("--min-chars-per-edit", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    misspellings = list({make_term(rng) for _ in range(args.entries + args.learned)})
+    learned, misspellings = misspellings[:args.learned], misspellings[args.learned:]
+    queries = [mutate(rng.choice(misspellings), rng.randint(0, args.max_edit_distance), rng)
+               for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    fuzzy = FuzzyLexicon.build(misspellings, args.max_edit_distance, args.prefix_length, args.min_chars_per_edit)
+    build_seconds = time.perf_counter() - start
+    print(f"Indexed {len(fuzzy.terms)} of {len(misspellings)} entries in {build_seconds:.2f} s "
+          f"(the others have digits or are mostly punctuation)")
+
+    start = time.perf_counter()
+    extended = fuzzy.extended(learned)
+    extend_seconds = time.perf_counter() - start
+    print(f"Extended with {len(learned)} learned entries in {extend_seconds * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    for query in queries:
+        extended.lookup(query)
+    symspell_seconds = time.perf_counter() - start
+
+    # Same rules as FuzzyLexicon.lookup, scanning every indexed term
+    terms = list(fuzzy.terms)
+    def brute_force(query):
+        key = _fuzzy_key(query)
+        if key is None:
+            return None
+        max_distance = min(args.max_edit_distance, len(key) // args.min_chars_per_edit)
+        if max_distance <= 0:
+            return None
+        matches = [fuzzy.terms[term] for term, _ in brute_force_lookup(terms, key, max_distance)]
+        return min(matches) if matches else None
+
+    sample = queries[:args.verify]
+    start = time.perf_counter()
+    expected = [brute_force(query) for query in sample]
+    brute_seconds = time.perf_counter() - start
+    for query, match in zip(sample, expected):
+        if fuzzy.lookup(query) != match:
+            raise SystemExit(f"Lookups disagree for {query!r}")
+
+    per_symspell = symspell_seconds / len(queries) * 1000
+    per_brute = brute_seconds / len(sample) * 1000
+    print(f"SymSpell    {per_symspell:8.3f} ms/query ({len(queries)} queries)")
+    print(f"Brute force {per_brute:8.3f} ms/query ({len(sample)} queries)  ({per_brute / per_symspell:.0f}x)")
+
+if __name__ == "__main__":
+    main()
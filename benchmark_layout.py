@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Benchmark the LayoutLMv3 engine: fp32 against dynamic int8 (optionally compiled).
+
+Takes every stored page (data/outputs/<doc_id>.json plus its page images) and runs
+it through process_document, one page per call as the app's process_layout does, then
+reports how often the optimized model predicts the same label as the fp32 model for
+a word.
+
+Usage:
+    python benchmark_layout.py --limit 20
+    python benchmark_layout.py --limit 20 --compile --threads 4
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from layout.layout_inference import LayoutInferenceEngine, configure_torch_threads
+
+BASE_DIR = Path(__file__).resolve().parent
+OUTPUT_DIR = BASE_DIR / "data" / "outputs"
+
+def load_pages(limit: int) -> List[Tuple[Path, Dict, str]]:
+    """(page image, OCR data of that page, doc_id) for the stored outputs that still have their page images."""
+    pages = []
+    documents = 0
+    for ocr_path in sorted(OUTPUT_DIR.glob("*.json")):
+        if "_" in ocr_path.stem:
+            # _raw, _layout, _quality, ... side files
+            continue
+        if documents >= limit:
+            break
+        doc_id = ocr_path.stem
+        ocr_data = json.loads(ocr_path.read_text())
+        document_pages = []
+        for page_idx, page in enumerate(ocr_data.get("pages", [])):
+            images = sorted(OUTPUT_DIR.glob(f"{doc_id}_page_{page.get('page_idx', page_idx)}.*"))
+            if images:
+                document_pages.append((images[0], {"pages": [page]}, doc_id))
+        if document_pages:
+            pages.extend(document_pages)
+            documents += 1
+    return pages
+
+def word_labels(result: Dict) -> Dict[int, str]:
+    """Label of every word; words missing from the entities were predicted "O"."""
+    labels = dict.fromkeys(range(result.get("total_words", 0)), "O")
+    for entity in result.get("entities", []):
+        labels[entity["word_index"]] = entity["label"]
+    return labels
+
+def run(engine: LayoutInferenceEngine, pages: List[Tuple[Path, Dict, str]]) -> Dict:
+    # The first call pays for lazy initialization (and compilation); keep it out of the timings
+    engine.process_document(*pages[0])
+
+    start = time.perf_counter()
+    results = [engine.process_document(*page) for page in pages]
+    latency = (time.perf_counter() - start) / len(pages)
+
+    return {"latency": latency, "results": results}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fp32 against int8 LayoutLMv3 inference.")
+    parser.add_argument("--limit", type=int, default=20, help="Documents to load from data/outputs.")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = all cores).")
+    parser.add_argument("--compile", action="store_true", help="Also torch.compile the int8 model.")
+    args = parser.parse_args()
+
+    threads = configure_torch_threads(intra_op_threads=args.threads, inter_op_threads=1, workers=1)
+
+    pages = load_pages(args.limit)
+    if not pages:
+        raise SystemExit("No stored OCR outputs with page images were found in data/outputs.")
+
+    reference = LayoutInferenceEngine(batch_size=args.batch_size)
+    fp32 = run(reference, pages)
+    del reference
+    total_words = sum(result.get("total_words", 0) for result in fp32["results"])
+    print(f"{len(pages)} pages, {total_words} words, {threads} intra-op threads\n")
+
+    optimized_engine = LayoutInferenceEngine(batch_size=args.batch_size, quantize=True, compile_model=args.compile)
+    optimized = run(optimized_engine, pages)
+
+    agreeing = 0
+    for reference_result, optimized_result in zip(fp32["results"], optimized["results"]):
+        reference_labels = word_labels(reference_result)
+        optimized_labels = word_labels(optimized_result)
+        agreeing += sum(1 for index, label in reference_labels.items() if optimized_labels.get(index, "O") == label)
+
+    label = f"int8{' compiled' if args.compile else ''}"
+    for name, timings in (("fp32", fp32), (label, optimized)):
+        print(f"{name:>14}: {timings['latency'] * 1000:8.1f} ms/page")
+    print(f"\n  speed-up             {fp32['latency'] / optimized['latency']:.2f}x latency")
+    print(f"  label agreement      {agreeing / max(1, total_words):.2%} of words")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Benchmark how often BatchingPredictor merges the windows of concurrent documents.
+
+Simulates the job queue: each job worker thread streams one document, submitting a
+window of pages and waiting for its result before submitting the next, with a random
+amount of other work (rasterizing, storing pages) in between. Recognition
+is replaced by a sleep of a fixed per-pass overhead plus a per-page cost, so the
+benchmark needs no model. As in ocr.doctr_ocr, there is one batch slot per pool
+worker. Reports documents per batch and pages per second for each job worker count.
+
+Usage:
+    python benchmark_ocr_batching.py --job-workers 2 4 --pool-workers 2 --windows 20
+"""
+
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+
+from ocr.batching import BatchingPredictor
+
+def run(job_workers: int, args) -> None:
+    batch_sizes = []
+    lock = threading.Lock()
+
+    def run_batch(pages):
+        time.sleep((args.overhead_ms + args.page_ms * len(pages)) / 1000.0)
+        with lock:
+            batch_sizes.append(len(pages) // args.window_pages)
+        return {"pages": [{} for _ in pages]}
+
+    # One slot per pool worker, as in ocr.doctr_ocr.get_batching_predictor
+    predictor = BatchingPredictor(run_batch, max_batch_pages=args.max_batch_pages,
+                                  max_wait_ms=args.max_wait_ms, max_concurrent_batches=args.pool_workers)
+    window = [np.zeros((1, 1, 3), dtype=np.uint8)] * args.window_pages
+
+    def job(seed):
+        rng = random.Random(seed)
+        for _ in range(args.windows):
+            time.sleep(rng.uniform(0, 2 * args.between_ms) / 1000.0)
+            predictor.submit(window).result()
+
+    threads = [threading.Thread(target=job, args=(seed,)) for seed in range(job_workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    pages = job_workers * args.windows * args.window_pages
+    print(f"{job_workers} job workers, {args.pool_workers} slots: {len(batch_sizes)} batches, "
+          f"{sum(batch_sizes) / len(batch_sizes):.2f} documents/batch, {pages / elapsed:.1f} pages/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-document OCR batching.")
+    parser.add_argument("--job-workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--pool-workers", type=int, default=2)
+    parser.add_argument("--windows", type=int, default=20, help="Windows per document.")
+    parser.add_argument("--window-pages", type=int, default=4)
+    parser.add_argument("--max-batch-pages", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=50)
+    parser.add_argument("--overhead-ms", type=float, default=300, help="Fixed cost of a forward pass.")
+    parser.add_argument("--page-ms", type=float, default=150, help="Cost of each page in a forward pass.")
+    parser.add_argument("--between-ms", type=float, default=300, help="Mean time between a job's windows.")
+    args = parser.parse_args()
+
+    for job_workers in args.job_workers:
+        run(job_workers, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Benchmark application startup.
+
+Imports each entry point in a fresh interpreter and reports the import time and
+whether any heavy ML library (torch, transformers, DocTR) was loaded on the way.
+An API-only or admin process should import in well under a second.
+
+Usage:
+    python benchmark_startup.py --runs 5
+    python benchmark_startup.py --modules main manage
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY_MODULES = ("torch", "transformers", "doctr")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def time_import(module: str) -> dict:
+    probe = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=Path(__file__).resolve().parent,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application import/startup time.")
+    parser.add_argument("--modules", nargs="+", default=["main", "manage", "processing.job_queue"])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        samples = [time_import(module) for _ in range(args.runs)]
+        timings = [sample["seconds"] for sample in samples]
+        heavy = sorted({name for sample in samples for name in sample["heavy"]})
+        print(f"{module:>22}: best {min(timings) * 1000:8.1f} ms  "
+              f"mean {sum(timings) / len(timings) * 1000:8.1f} ms  "
+              f"heavy modules loaded: {', '.join(heavy) or 'none'}")
+
+if __name__ == "__main__":
+    main()
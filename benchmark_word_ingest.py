@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Benchmark page/word ingestion for a synthetic 20-page bank statement.
+
+Compares the previous per-page ORM path (commit + refresh per page, then
+bulk_save_objects of Word instances) with the bulk path in processing.ingest
+(COPY on PostgreSQL, multi-row INSERT elsewhere). Uses DATABASE_URL; the
+benchmark documents are deleted afterwards.
+
+Usage:
+    python benchmark_word_ingest.py --pages 20 --words-per-page 600 --runs 3
+"""
+
+import argparse
+import random
+import string
+import time
+import uuid
+
+from database.connector import SessionLocal
+from database import models
+from processing.ingest import store_ocr_results
+
+def make_statement(pages: int, words_per_page: int) -> dict:
+    """Build a DocTR-shaped export with statement-like rows of words."""
+    rng = random.Random(42)
+    ocr_pages = []
+    for page_idx in range(pages):
+        lines = []
+        words_per_line = 8
+        for line_idx in range(words_per_page // words_per_line):
+            y = 0.02 + line_idx * (0.95 / (words_per_page // words_per_line))
+            words = []
+            for word_idx in range(words_per_line):
+                x = 0.03 + word_idx * 0.12
+                words.append({
+                    "value": "".join(rng.choices(string.ascii_uppercase + string.digits, k=rng.randint(3, 10))),
+                    "confidence": rng.random(),
+                    "geometry": ((x, y), (x + 0.1, y + 0.01))
+                })
+            lines.append({"words": words})
+        ocr_pages.append({"page_idx": page_idx, "dimensions": (2339, 1654), "blocks": [{"lines": lines}]})
+    return {"pages": ocr_pages}
+
+def legacy_store_ocr_results(db, document, ocr_data, image_paths):
+    """The per-page ORM ingestion path used before processing.ingest."""
+    for page_idx, page_data in enumerate(ocr_data.get("pages", [])):
+        db_page = models.Page(
+            document_id=document.id,
+            page_number=page_idx,
+            image_path=image_paths[page_idx],
+            dimensions=page_data.get('dimensions')
+        )
+        db.add(db_page)
+        db.commit()
+        db.refresh(db_page)
+
+        words_to_insert = []
+        for block in page_data.get("blocks", []):
+            for line in block.get("lines", []):
+                for word_info in line.get("words", []):
+                    words_to_insert.append(models.Word(
+                        page_id=db_page.id,
+                        text=word_info.get('value'),
+                        confidence=word_info.get('confidence'),
+                        geometry=word_info.get('geometry')
+                    ))
+        db.bulk_save_objects(words_to_insert)
+        db.commit()
+
+def time_ingest(store, ocr_data, runs):
+    timings = []
+    created = []
+    image_paths = [f"benchmark_page_{i}.png" for i in range(len(ocr_data["pages"]))]
+    for _ in range(runs):
+        db = SessionLocal()
+        try:
+            document = models.Document(id=uuid.uuid4(), filename="benchmark.pdf", status="benchmark")
+            db.add(document)
+            db.commit()
+            created.append(document.id)
+
+            start = time.perf_counter()
+            store(db, document, ocr_data, image_paths)
+            db.commit()
+            timings.append(time.perf_counter() - start)
+        finally:
+            db.close()
+    return timings, created
+
+def cleanup(document_ids):
+    db = SessionLocal()
+    try:
+        for document in db.query(models.Document).filter(models.Document.id.in_(document_ids)).all():
+            db.delete(document)
+        db.commit()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR word ingestion.")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--words-per-page", type=int, default=600)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    ocr_data = make_statement(args.pages, args.words_per_page)
+    total_words = args.pages * (args.words_per_page // 8) * 8
+    print(f"Synthetic statement: {args.pages} pages, {total_words} words")
+
+    created = []
+    try:
+        for name, store in (("legacy ORM", legacy_store_ocr_results), ("bulk", store_ocr_results)):
+            timings, ids = time_ingest(store, ocr_data, args.runs)
+            created.extend(ids)
+            best = min(timings)
+            print(f"{name:>12}: best {best * 1000:8.1f} ms  "
+                  f"mean {sum(timings) / len(timings) * 1000:8.1f} ms  "
+                  f"({total_words / best:,.0f} words/s)")
+    finally:
+        cleanup(created)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Compare OCR inference backends against the stored PyTorch results.
+
+For every data/outputs/<doc_id>_raw.json whose upload is still in data/uploads, the
+document is recognized again with the selected backend and its words are aligned with
+the stored words (the text DocTR produced, before lexicon auto-corrections). Reports
+word accuracy, character error rate, confidence drift and recognition time.
+
+Usage:
+    python compare_ocr_backends.py --backend onnx
+    python compare_ocr_backends.py --backend onnx --quantize --limit 20
+    python compare_ocr_backends.py --backend pytorch   # sanity check of the reference
+"""
+
+import argparse
+import difflib
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from ocr.doctr_ocr import _read_document, build_predictor
+
+BASE_DIR = Path(__file__).resolve().parent
+OUTPUT_DIR = BASE_DIR / "data" / "outputs"
+UPLOAD_DIR = BASE_DIR / "data" / "uploads"
+
+def stored_words(raw: Dict) -> List[List[Dict]]:
+    """Words per page as recognized by DocTR, undoing lexicon auto-corrections."""
+    pages = []
+    for page in raw.get("pages", []):
+        words = []
+        for word in page.get("words", []):
+            text = word.get("original_value") if word.get("auto_corrected") and word.get("original_value") else word.get("text", "")
+            words.append({"text": text, "confidence": word.get("confidence", 0.0)})
+        pages.append(words)
+    return pages
+
+def predicted_words(export: Dict) -> List[List[Dict]]:
+    pages = []
+    for page in export.get("pages", []):
+        words = []
+        for block in page.get("blocks", []):
+            for line in block.get("lines", []):
+                for word in line.get("words", []):
+                    words.append({"text": word.get("value", ""), "confidence": word.get("confidence", 0.0)})
+        pages.append(words)
+    return pages
+
+def compare_page(reference: List[Dict], candidate: List[Dict]) -> Dict:
+    """Align two word sequences and count matches, character edits and confidence drift."""
+    ref_texts = [word["text"] for word in reference]
+    cand_texts = [word["text"] for word in candidate]
+
+    matcher = difflib.SequenceMatcher(a=ref_texts, b=cand_texts, autojunk=False)
+    matched = 0
+    confidence_drift = 0.0
+    for block in matcher.get_matching_blocks():
+        for offset in range(block.size):
+            matched += 1
+            confidence_drift += abs(reference[block.a + offset]["confidence"] - candidate[block.b + offset]["confidence"])
+
+    ref_chars = " ".join(ref_texts)
+    cand_chars = " ".join(cand_texts)
+    char_matcher = difflib.SequenceMatcher(a=ref_chars, b=cand_chars, autojunk=False)
+    char_edits = max(len(ref_chars), len(cand_chars)) - sum(block.size for block in char_matcher.get_matching_blocks())
+
+    return {
+        "reference_words": len(ref_texts),
+        "candidate_words": len(cand_texts),
+        "matched_words": matched,
+        "reference_chars": len(ref_chars),
+        "char_edits": char_edits,
+        "confidence_drift": confidence_drift
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare an OCR backend with stored _raw.json results.")
+    parser.add_argument("--backend", choices=["pytorch", "onnx"], default="onnx")
+    parser.add_argument("--quantize", action="store_true", help="Use the int8 ONNX models.")
+    parser.add_argument("--limit", type=int, default=None, help="Compare at most this many documents.")
+    parser.add_argument("--report", type=Path, default=None, help="Write per-document results as JSON.")
+    args = parser.parse_args()
+
+    predictor = build_predictor(backend=args.backend, quantize=args.quantize)
+
+    totals = {"reference_words": 0, "candidate_words": 0, "matched_words": 0,
+              "reference_chars": 0, "char_edits": 0, "confidence_drift": 0.0}
+    total_seconds = 0.0
+    total_pages = 0
+    report = []
+
+    raw_files = sorted(OUTPUT_DIR.glob("*_raw.json"))
+    for raw_path in raw_files:
+        if args.limit is not None and len(report) >= args.limit:
+            break
+        raw = json.loads(raw_path.read_text())
+        doc_id = raw.get("document_id") or raw_path.name[:-len("_raw.json")]
+        uploads = sorted(UPLOAD_DIR.glob(f"{doc_id}.*"))
+        if not uploads:
+            continue
+
+        pages = _read_document(uploads[0])
+        start = time.perf_counter()
+        export = predictor(pages).export()
+        seconds = time.perf_counter() - start
+
+        doc_totals = dict.fromkeys(totals, 0)
+        for reference, candidate in zip(stored_words(raw), predicted_words(export)):
+            for key, value in compare_page(reference, candidate).items():
+                doc_totals[key] += value
+        for key in totals:
+            totals[key] += doc_totals[key]
+        total_seconds += seconds
+        total_pages += len(pages)
+
+        word_accuracy = doc_totals["matched_words"] / max(1, doc_totals["reference_words"])
+        cer = doc_totals["char_edits"] / max(1, doc_totals["reference_chars"])
+        report.append({"document_id": doc_id, "pages": len(pages), "seconds": seconds,
+                       "word_accuracy": word_accuracy, "cer": cer, **doc_totals})
+        print(f"{doc_id}: {len(pages)} pages  words {word_accuracy:6.2%}  CER {cer:6.2%}  {seconds * 1000:8.1f} ms")
+
+    if not report:
+        raise SystemExit("No stored _raw.json outputs with a matching upload were found.")
+
+    label = f"{args.backend}{' int8' if args.quantize else ''}"
+    print(f"\n{label}: {len(report)} documents, {total_pages} pages")
+    print(f"  word accuracy       {totals['matched_words'] / max(1, totals['reference_words']):.2%}")
+    print(f"  character error     {totals['char_edits'] / max(1, totals['reference_chars']):.2%}")
+    print(f"  mean |conf drift|   {totals['confidence_drift'] / max(1, totals['matched_words']):.4f}")
+    print(f"  recognition time    {total_seconds / max(1, total_pages) * 1000:.1f} ms/page")
+
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,68 @@ class ConfigManager:
             "export_settings": {
                 "include_correction_metadata": True,
                 "use_corrected_text_only": True
+            },
+            "corrections": {
+                "fuzzy": {
+                    "enabled": False,  # Edit-distance matching for words no other correction strategy matches, opt-in
+                    "lexicon_enabled": True,  # Edit-distance matching against the learned lexicon of the document type
+                    "max_edit_distance": 2,
+                    "prefix_length": 7,  # Characters of each term in the SymSpell deletion index
+                    "min_chars_per_edit": 4  # One edit allowed per this many characters of the word
+                },
+                "learning": {
+                    "watermark_overlap_seconds": 300  # Incremental learning rescans this far behind its watermark
+                }
+            },
+            "snapshots": {
+                "refresher_enabled": True,  # Rebuild stale corrected-OCR snapshots in the background
+                "refresh_interval_seconds": 30,  # Also woken up by every saved correction
+                "refresh_batch_size": 20  # Documents rebuilt per pass
+            },
+            "job_queue": {
+                "workers": 4,  # OCR worker threads per process; more than ocr.process_pool.workers so OCR batches combine documents
+                "poll_interval_seconds": 2.0,
+                "claim_timeout_seconds": 1800,  # A document processing this long without a worker heartbeat is claimed again
+                "run_in_web_process": True,  # False when workers run via `manage.py run-workers`
+                "warm_up_models": True  # Load the OCR models in the background at startup
+            },
+            "ocr": {
+                "batching": {
+                    "enabled": True,
+                    "max_batch_pages": 8,  # Pages per DocTR forward pass across documents
+                    "max_wait_ms": 50  # How long a pending page waits for more work
+                },
+                "process_pool": {
+                    "enabled": True,
+                    "workers": 2,  # OCR processes, each with its own model copy
+                    "torch_threads_per_worker": 0  # 0 = split the CPU cores evenly
+                },
+                "streaming": {
+                    "enabled": True,  # Rasterize, recognize and commit PDFs a window of pages at a time
+                    "window_pages": 4
+                },
+                "backend": "pytorch",  # "pytorch" or "onnx" (ONNX Runtime)
+                "onnx": {
+                    "quantize": False,  # Dynamic int8 quantization of the exported models
+                    "cache_dir": "models/onnx",  # Exports are cached per model version
+                    "intra_op_threads": 0  # 0 = same as the torch thread count
+                },
+                "page_images": {
+                    "format": "png",  # "png" or "webp"
+                    "png_compress_level": 1,  # zlib level 0-9; 1 is fast with little size cost
+                    "webp_quality": 80,
+                    "webp_method": 0,  # 0 (fastest) to 6 (smallest)
+                    "max_dim": 1024,  # Longest side of the saved review image
+                    "writer_threads": 4  # Encode page images in parallel with recognition
+                }
+            },
+            "layout": {
+                "batch_size": 8,  # LayoutLMv3 token windows per forward pass
+                "window_stride": 128,  # Tokens shared by consecutive windows of pages over 512 tokens
+                "quantize": True,  # Dynamic int8 quantization of the linear layers
+                "compile": False,  # torch.compile the model (slow first batches)
+                "intra_op_threads": 0,  # 0 = split the CPU cores between job_queue.workers
+                "inter_op_threads": 1
             }
         }
         
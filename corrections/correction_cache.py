@@ -0,0 +1,132 @@
+"""
+Process-wide cache of the compiled correction index.
+The index is built once per process and extended in place when this process saves a
+correction. Changes made by other processes are detected through the 'corrections'
+version counter, which costs one primary-key lookup per request. Rebuilds run outside
+the cache lock: while one thread rebuilds, other requests keep using the previous index.
+"""
+
+import logging
+import threading
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config_manager import get_config
+from database import models
+from database.versions import CORRECTIONS, get_version
+from corrections.correction_index import CorrectionIndex, MAX_EDIT_DISTANCE, MIN_CHARS_PER_EDIT, PREFIX_LENGTH
+
+logger = logging.getLogger(__name__)
+
+class CorrectionIndexCache:
+    """Holds the CorrectionIndex for every correction in the database."""
+
+    def __init__(self):
+        self._index: Optional[CorrectionIndex] = None
+        self._version: Optional[int] = None
+        # (version, index entry) of the last correction this process saved into the index
+        self._last_saved: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()  # Held by the one thread rebuilding the index
+
+    @property
+    def version(self) -> Optional[int]:
+        """Corrections version the cached index reflects."""
+        return self._version
+
+    def get_index(self, db: Session) -> CorrectionIndex:
+        """Return the index, rebuilding it if another process changed the corrections."""
+        return self.get_versioned_index(db)[0]
+
+    def get_versioned_index(self, db: Session) -> Tuple[CorrectionIndex, int]:
+        """
+        Return the index together with the corrections version it reflects.
+        If another thread is already rebuilding a stale index, the stale index and its
+        version are returned instead of waiting.
+        """
+        current_version = get_version(db, CORRECTIONS)
+        with self._lock:
+            if self._index is not None and self._version >= current_version:
+                return self._index, self._version
+            stale = self._index, self._version
+
+        if stale[0] is not None:
+            if not self._build_lock.acquire(blocking=False):
+                return stale
+        else:
+            # Nothing to serve yet, wait for the first build
+            self._build_lock.acquire()
+        try:
+            with self._lock:
+                if self._index is not None and self._version >= current_version:
+                    return self._index, self._version
+            index = self._build(db)
+            with self._lock:
+                # record() may have moved a newer index past this build meanwhile
+                if self._index is None or self._version < current_version:
+                    self._index = index
+                    self._version = current_version
+                    self._last_saved = None
+                return self._index, self._version
+        finally:
+            self._build_lock.release()
+
+    def _build(self, db: Session) -> CorrectionIndex:
+        # Corrections without a document were never applied, keep it that way
+        corrections = db.query(
+            models.Correction.original_text,
+            models.Correction.corrected_text,
+            models.Correction.timestamp
+        ).filter(
+            models.Correction.document_id.isnot(None)
+        ).order_by(models.Correction.timestamp.desc(), models.Correction.id).all()
+
+        fuzzy_config = get_config().get("corrections.fuzzy", {})
+        index = CorrectionIndex(
+            corrections,
+            max_edit_distance=fuzzy_config.get("max_edit_distance", MAX_EDIT_DISTANCE) if fuzzy_config.get("enabled", False) else 0,
+            prefix_length=fuzzy_config.get("prefix_length", PREFIX_LENGTH),
+            min_chars_per_edit=fuzzy_config.get("min_chars_per_edit", MIN_CHARS_PER_EDIT)
+        )
+        logger.info(f"Built correction index from {len(index)} corrections")
+        return index
+
+    def record(self, correction: models.Correction, new_version: int) -> None:
+        """
+        Add a committed correction to the index.
+        If the version moved by more than this one save, another process changed the
+        corrections too and the index is left stale so the next request rebuilds it.
+        """
+        with self._lock:
+            if self._index is None or self._version != new_version - 1:
+                return
+            seq = self._index.add(correction.original_text, correction.corrected_text, correction.timestamp)
+            self._version = new_version
+            self._last_saved = (new_version, seq)
+
+    def saved_entry(self, index: CorrectionIndex, version: int) -> Optional[int]:
+        """
+        Entry number in index of the correction whose save moved the corrections to
+        version, or None if this process did not record that save into this index.
+        """
+        with self._lock:
+            if index is not self._index or self._last_saved is None or self._last_saved[0] != version:
+                return None
+            return self._last_saved[1]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+            self._version = None
+            self._last_saved = None
+
+# Global cache instance
+_correction_index_cache = None
+
+def get_correction_index_cache() -> CorrectionIndexCache:
+    """Get or create the global correction index cache."""
+    global _correction_index_cache
+    if _correction_index_cache is None:
+        _correction_index_cache = CorrectionIndexCache()
+    return _correction_index_cache
@@ -0,0 +1,249 @@
+"""
+Compiled index of global OCR corrections.
+Matches a word against every learned correction in time proportional to the word's
+length instead of the number of corrections:
+- a hash map for exact matches
+- a hash map over cleaned originals (trailing '<*. ' stripped) for fuzzy matches
+- a lowercase hash map for case-insensitive matches
+- a trie over cleaned originals for prefix matches
+- optionally, a SymSpell index over lowercased cleaned originals for edit-distance
+  matches
+
+The newest correction always wins; on equal timestamps the strategy priority
+(exact, fuzzy, prefix, case-insensitive) decides, then the order in which the
+corrections were added. Edit-distance matching is a fallback for words no other
+strategy matched: the closest original wins, then the newest correction. It only
+considers words made mostly of letters and without digits, so amounts, dates and
+codes one edit apart are never rewritten into each other.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from corrections.symspell import SymSpellIndex
+
+logger = logging.getLogger(__name__)
+
+# Characters stripped from the end of a word for fuzzy and prefix matching
+CLEAN_CHARS = '<*. '
+
+# A prefix match may leave at most this many characters (exclusive) of suffix
+MAX_PREFIX_SUFFIX = 5
+
+# Strategy priorities, lower wins on equal timestamps
+PRIORITY_EXACT = 1
+PRIORITY_FUZZY = 2
+PRIORITY_PREFIX = 3
+PRIORITY_CASE_INSENSITIVE = 4
+
+# Edit-distance defaults; the distance allowed for a word is also capped at one edit
+# per MIN_CHARS_PER_EDIT characters, so short words are never fuzzily rewritten
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_CHARS_PER_EDIT = 4
+
+class CorrectionMatch(NamedTuple):
+    """Result of matching a word against the index."""
+    value: str
+    method: str
+    timestamp: datetime
+    seq: int  # Entry of the winning correction, as returned by CorrectionIndex.add
+
+class _Entry(NamedTuple):
+    corrected: str
+    timestamp: datetime
+    seq: int  # Insertion order, breaks timestamp ties
+
+class _TrieNode:
+    __slots__ = ("children", "best")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.best: Optional[_Entry] = None
+
+def is_edit_candidate(text: str) -> bool:
+    """Whether a word may be matched by edit distance: no digits and at least half letters."""
+    if any(char.isdigit() for char in text):
+        return False
+    return sum(char.isalpha() for char in text) * 2 >= len(text)
+
+def match_case(original: str, corrected: str) -> str:
+    """Apply the casing of the original word (upper, lower or title) to the correction."""
+    if original.isupper():
+        return corrected.upper()
+    if original.islower():
+        return corrected.lower()
+    if original.istitle():
+        return corrected.title()
+    return corrected
+
+def _is_better(entry: _Entry, current: Optional[_Entry]) -> bool:
+    """Strictly newer wins; on ties the earlier-added entry is kept."""
+    return current is None or entry.timestamp > current.timestamp
+
+class CorrectionIndex:
+    """Compiled correction matcher with "newest timestamp wins" semantics."""
+
+    def __init__(self, corrections: Iterable = (), max_edit_distance: int = 0,
+                 prefix_length: int = PREFIX_LENGTH, min_chars_per_edit: int = MIN_CHARS_PER_EDIT):
+        """
+        Args:
+            corrections: Objects with original_text, corrected_text and timestamp
+                attributes (e.g. models.Correction rows)
+            max_edit_distance: Largest edit distance of edit-distance matches,
+                0 disables them
+            prefix_length: Characters of each term indexed for edit-distance matching
+            min_chars_per_edit: Characters a word needs per allowed edit
+        """
+        self._exact: Dict[str, _Entry] = {}
+        self._fuzzy: Dict[str, _Entry] = {}
+        self._case_variants: Dict[str, List[str]] = {}  # lowercased original -> exact keys
+        self._prefix_root = _TrieNode()
+        self._seq = 0
+
+        self.min_chars_per_edit = min_chars_per_edit
+        self._edit_index: Optional[SymSpellIndex] = None
+        if max_edit_distance > 0:
+            self._edit_index = SymSpellIndex(max_edit_distance, max(prefix_length, max_edit_distance + 1))
+        self._edit_corrections: Dict[str, _Entry] = {}  # lowercased cleaned original -> newest entry
+        self.add_all(corrections)
+
+    def __len__(self) -> int:
+        return self._seq
+
+    def add_all(self, corrections: Iterable) -> None:
+        for correction in corrections:
+            self.add(correction.original_text, correction.corrected_text, correction.timestamp)
+
+    def add(self, original: str, corrected: str, timestamp: Optional[datetime]) -> int:
+        """Add a single correction to the index and return its entry number."""
+        if timestamp is None:
+            timestamp = datetime.min
+        entry = _Entry(corrected, timestamp, self._seq)
+        self._seq += 1
+
+        if original not in self._exact:
+            self._case_variants.setdefault(original.lower(), []).append(original)
+        if _is_better(entry, self._exact.get(original)):
+            self._exact[original] = entry
+
+        original_clean = original.rstrip(CLEAN_CHARS)
+        if not original_clean:
+            return entry.seq
+
+        if _is_better(entry, self._fuzzy.get(original_clean)):
+            self._fuzzy[original_clean] = entry
+
+        if self._edit_index is not None and is_edit_candidate(original_clean):
+            edit_key = original_clean.lower()
+            self._edit_index.add(edit_key)
+            if _is_better(entry, self._edit_corrections.get(edit_key)):
+                self._edit_corrections[edit_key] = entry
+
+        node = self._prefix_root
+        for char in original_clean:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        if _is_better(entry, node.best):
+            node.best = entry
+        return entry.seq
+
+    def _match_edit_distance(self, value_clean: str) -> Optional[CorrectionMatch]:
+        max_distance = min(self._edit_index.max_edit_distance, len(value_clean) // self.min_chars_per_edit)
+        if max_distance <= 0 or not is_edit_candidate(value_clean):
+            return None
+
+        best_entry: Optional[_Entry] = None
+        for term, _ in self._edit_index.lookup(value_clean.lower(), max_distance):
+            entry = self._edit_corrections[term]
+            if best_entry is None or entry.timestamp > best_entry.timestamp or (
+                    entry.timestamp == best_entry.timestamp and entry.seq < best_entry.seq):
+                best_entry = entry
+
+        if best_entry is None:
+            return None
+        return CorrectionMatch(value=match_case(value_clean, best_entry.corrected), method="edit_distance",
+                               timestamp=best_entry.timestamp, seq=best_entry.seq)
+
+    def match(self, value: str) -> Optional[CorrectionMatch]:
+        """Find the correction to apply to a word, if any."""
+        if not value:
+            return None
+
+        best: Optional[Tuple[datetime, int, int, str, str]] = None  # (timestamp, priority, seq, value, method)
+
+        def consider(timestamp, priority, seq, corrected, method):
+            nonlocal best
+            if (best is None or timestamp > best[0]
+                    or (timestamp == best[0] and (priority, seq) < (best[1], best[2]))):
+                best = (timestamp, priority, seq, corrected, method)
+
+        value_clean = value.rstrip(CLEAN_CHARS)
+
+        # Strategy 1: Exact match
+        entry = self._exact.get(value)
+        if entry is not None:
+            consider(entry.timestamp, PRIORITY_EXACT, entry.seq, entry.corrected, "exact")
+
+        # Strategy 2: Fuzzy match on the cleaned value
+        entry = self._fuzzy.get(value_clean)
+        if entry is not None:
+            consider(entry.timestamp, PRIORITY_FUZZY, entry.seq, entry.corrected, "fuzzy")
+
+        # Strategy 3: Prefix match, walking the trie along the cleaned value
+        min_depth = len(value) - MAX_PREFIX_SUFFIX + 1
+        node = self._prefix_root
+        for depth, char in enumerate(value_clean, start=1):
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.best is not None and depth >= min_depth:
+                entry = node.best
+                consider(entry.timestamp, PRIORITY_PREFIX, entry.seq,
+                         entry.corrected + value[depth:], "prefix")
+
+        # Strategy 4: Case-insensitive match against exact originals
+        for original in self._case_variants.get(value.lower(), ()):
+            if original != value:
+                entry = self._exact[original]
+                consider(entry.timestamp, PRIORITY_CASE_INSENSITIVE, entry.seq,
+                         entry.corrected, "case_insensitive")
+
+        if best is None:
+            # Strategy 5: Edit distance, for words nothing else matched
+            if self._edit_index is not None and value_clean:
+                return self._match_edit_distance(value_clean)
+            return None
+        return CorrectionMatch(value=best[3], method=best[4], timestamp=best[0], seq=best[2])
+
+    def apply(self, ocr_data: Dict) -> int:
+        """
+        Apply corrections in place to an OCR data dictionary.
+
+        Returns:
+            Number of words corrected
+        """
+        corrections_applied = 0
+
+        for page in ocr_data.get("pages", []):
+            for block in page.get("blocks", []):
+                for line in block.get("lines", []):
+                    for word in line.get("words", []):
+                        original_value = word.get("value", "")
+                        match = self.match(original_value)
+                        if match is None:
+                            continue
+
+                        word["value"] = match.value
+                        word["corrected"] = True
+                        word["original_value"] = original_value
+                        word["correction_method"] = match.method
+                        corrections_applied += 1
+
+        if corrections_applied > 0:
+            logger.info(f"Applied {corrections_applied} corrections to OCR data")
+
+        return corrections_applied
@@ -5,10 +5,11 @@ Implements the missing functionality to integrate manual corrections into final
 
 import json
 import logging
+import uuid
 from typing import Dict, List, Tuple, Optional, Any
 from pathlib import Path
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,10 @@ class Correction:
 from database.connector import get_db
 from database import models
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from config_manager import get_config
+from database.versions import LEXICONS, bump_version
+from postprocessing.lexicon_cache import get_lexicon_cache
 
 @dataclass
 class Correction:
@@ -88,6 +92,26 @@ class CorrectionIntegrator:
 
     # ... other methods like _apply_corrections_to_ocr remain mostly the same, but take DB objects ...
 
+# Watermark of the incremental lexicon learner
+LEXICON_WATERMARK = "correction_lexicon"
+
+def _upsert_insert(db: Session):
+    """INSERT construct with ON CONFLICT support for the session's database."""
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
+
+def _is_preferred_pattern(pattern: Tuple[str, int, Optional[datetime]],
+                          current: Tuple[str, int, Optional[datetime]]) -> bool:
+    """(corrected, count, latest) patterns: higher count, then newer, then smaller text wins."""
+    if pattern[1] != current[1]:
+        return pattern[1] > current[1]
+    if pattern[2] != current[2]:
+        return current[2] is None or (pattern[2] is not None and pattern[2] > current[2])
+    return pattern[0] < current[0]
+
 class CorrectionLearner:
     """
     Learns from correction patterns to improve future processing.
@@ -96,32 +120,82 @@ class CorrectionLearner:
     def __init__(self, db_session: Session, learning_threshold: int = 3):
         self.db = db_session
         self.learning_threshold = learning_threshold
+        # Corrections committed late with an earlier timestamp are caught by rescanning this window
+        self.watermark_overlap = timedelta(
+            seconds=get_config().get("corrections.learning.watermark_overlap_seconds", 300)
+        )
     
-    def update_correction_lexicon(self):
-        """Update correction lexicon based on recurring correction patterns in the database."""
+    def update_correction_lexicon(self, incremental: bool = False) -> int:
+        """
+        Update correction lexicon based on recurring correction patterns in the database.
+
+        One grouped aggregate finds the patterns that meet the threshold and one
+        INSERT ... ON CONFLICT (misspelled) DO UPDATE batch writes them, with frequency
+        set to the pattern's correction count. In incremental mode only the originals
+        corrected since the learning watermark are regrouped, over all their
+        corrections, so frequencies and thresholds are the same as in a full run.
+
+        Returns:
+            Number of lexicon entries inserted or updated
+        """
         try:
-            # Find correction patterns that meet the threshold
-            patterns = self.db.query(
-                models.Correction.original_text, 
-                models.Correction.corrected_text, 
-                func.count(models.Correction.id).label('count')
-            ).group_by(models.Correction.original_text, models.Correction.corrected_text)\
-            .having(func.count(models.Correction.id) >= self.learning_threshold).all()
-
-            updates_made = 0
-            for original, corrected, count in patterns:
-                lexicon_entry = self.db.query(models.Lexicon).filter(models.Lexicon.misspelled == original).first()
-                if lexicon_entry:
-                    if lexicon_entry.corrected != corrected:
-                        lexicon_entry.corrected = corrected
-                        updates_made += 1
-                else:
-                    new_entry = models.Lexicon(misspelled=original, corrected=corrected, frequency=count)
-                    self.db.add(new_entry)
-                    updates_made += 1
-            
+            correction = models.Correction
+            watermark = None
+            if incremental:
+                watermark = self.db.query(models.LearningWatermark).filter(
+                    models.LearningWatermark.name == LEXICON_WATERMARK
+                ).with_for_update().first()
+            new_watermark = self.db.query(func.max(correction.timestamp)).scalar()
+
+            count = func.count(correction.id)
+            query = self.db.query(
+                correction.original_text,
+                correction.corrected_text,
+                count.label('count'),
+                func.max(correction.timestamp).label('latest')
+            )
+            if watermark is not None and watermark.watermark is not None:
+                since = watermark.watermark - self.watermark_overlap
+                query = query.filter(correction.original_text.in_(
+                    select(correction.original_text).where(correction.timestamp > since)
+                ))
+            patterns = query.group_by(correction.original_text, correction.corrected_text)\
+                .having(count >= self.learning_threshold).all()
+
+            # An original corrected several ways learns its most frequent, then newest, correction
+            best_patterns = {}
+            for original, corrected, pattern_count, latest in patterns:
+                current = best_patterns.get(original)
+                if current is None or _is_preferred_pattern((corrected, pattern_count, latest), current):
+                    best_patterns[original] = (corrected, pattern_count, latest)
+
+            learned_entries = []
+            if best_patterns:
+                insert = _upsert_insert(self.db)
+                statement = insert(models.Lexicon)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[models.Lexicon.misspelled],
+                    set_={"corrected": statement.excluded.corrected, "frequency": statement.excluded.frequency},
+                    # Unchanged entries are neither rewritten nor returned
+                    where=(models.Lexicon.corrected != statement.excluded.corrected)
+                    | (models.Lexicon.frequency.is_distinct_from(statement.excluded.frequency))
+                ).returning(models.Lexicon.misspelled, models.Lexicon.corrected, models.Lexicon.document_type)
+                # Executed as multi-row VALUES batches
+                learned_entries = [tuple(row) for row in self.db.execute(statement, [
+                    {"id": uuid.uuid4(), "misspelled": original, "corrected": corrected,
+                     "document_type": "global", "frequency": pattern_count}
+                    for original, (corrected, pattern_count, _) in best_patterns.items()
+                ])]
+
+            updates_made = len(learned_entries)
+            lexicons_version = bump_version(self.db, LEXICONS) if updates_made > 0 else None
+            if new_watermark is not None:
+                self._set_watermark(new_watermark)
+            self.db.commit()
+
             if updates_made > 0:
-                self.db.commit()
+                # Extend this process's lexicon snapshots instead of rebuilding them
+                get_lexicon_cache().record_entries(learned_entries, lexicons_version)
                 logger.info(f"Updated correction lexicon with {updates_made} new patterns")
             
             return updates_made
@@ -131,6 +205,14 @@ class CorrectionLearner:
             logger.error(f"Failed to update correction lexicon: {e}")
             return 0
 
+    def _set_watermark(self, watermark: datetime) -> None:
+        insert = _upsert_insert(self.db)
+        statement = insert(models.LearningWatermark).values(name=LEXICON_WATERMARK, watermark=watermark)
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[models.LearningWatermark.name],
+            set_={"watermark": statement.excluded.watermark, "updated_at": func.now()}
+        ))
+
 # Global instances
 _correction_integrator: Optional[CorrectionIntegrator] = None
 _correction_learner: Optional[CorrectionLearner] = None
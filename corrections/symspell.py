@@ -0,0 +1,131 @@
+"""
+Symmetric-delete (SymSpell) index for edit-distance lookups.
+Every term is stored under the strings obtained by deleting up to max_edit_distance
+characters from its first prefix_length characters. A lookup generates the same
+deletions of the query and verifies only the terms sharing one of them, so its cost
+depends on the query length and the edit distance, not on the number of terms.
+Distances are optimal string alignment distances: insertions, deletions,
+substitutions and transpositions of adjacent characters each count as one edit.
+"""
+
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+def edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Optimal string alignment distance between a and b, or None if above max_distance."""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if a == b:
+        return 0
+    if not a or not b:
+        return max(len(a), len(b))
+
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return None
+        previous_previous, previous = previous, current
+
+    distance = previous[len(b)]
+    return distance if distance <= max_distance else None
+
+class SymSpellIndex:
+    """Terms indexed by their deletion neighbourhood; terms can be added at any time."""
+
+    def __init__(self, max_edit_distance: int = 2, prefix_length: int = 7):
+        if prefix_length <= max_edit_distance:
+            raise ValueError("prefix_length must be greater than max_edit_distance")
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self._terms: Set[str] = set()
+        self._deletes: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._terms
+
+    def add(self, term: str) -> None:
+        """Index a term; adding a known term does nothing."""
+        if term in self._terms:
+            return
+        self._terms.add(term)
+        deletes = self._deletes
+        for deleted in self._deletions(term[:self.prefix_length], self.max_edit_distance):
+            bucket = deletes.get(deleted)
+            if bucket is None:
+                deletes[deleted] = [term]
+            else:
+                bucket.append(term)
+
+    def _deletions(self, text: str, max_deletes: int) -> Set[str]:
+        """text and every string obtained by deleting up to max_deletes of its characters."""
+        found = {text}
+        frontier = found
+        for _ in range(max_deletes):
+            frontier = {
+                candidate[:position] + candidate[position + 1:]
+                for candidate in frontier
+                for position in range(len(candidate))
+            }
+            found |= frontier
+        return found
+
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        The closest terms to word, as (term, distance) pairs that all share the
+        smallest distance found, or [] if no term is within max_distance.
+        """
+        if max_distance is None or max_distance > self.max_edit_distance:
+            max_distance = self.max_edit_distance
+        if word in self._terms:
+            return [(word, 0)]
+        if max_distance <= 0 or not self._terms:
+            return []
+
+        best_distance = max_distance
+        closest: List[str] = []
+        checked: Set[str] = set()
+
+        prefix = word[:self.prefix_length]
+        queue = deque([prefix])
+        queued = {prefix}
+        while queue:
+            candidate = queue.popleft()
+            deletes = len(prefix) - len(candidate)
+
+            for term in self._deletes.get(candidate, ()):
+                if term in checked:
+                    continue
+                checked.add(term)
+                distance = edit_distance(word, term, best_distance)
+                if distance is None:
+                    continue
+                if distance < best_distance:
+                    best_distance = distance
+                    closest = [term]
+                else:
+                    closest.append(term)
+
+            if deletes < max_distance:
+                for position in range(len(candidate)):
+                    shorter = candidate[:position] + candidate[position + 1:]
+                    if shorter not in queued:
+                        queued.add(shorter)
+                        queue.append(shorter)
+
+        return [(term, best_distance) for term in closest]
@@ -0,0 +1,98 @@
+"""
+Document loader for the review UI.
+Fetches a document, its pages and all of their words in three queries, whatever the
+page count, and streams the word rows straight into the DocTR-style OCR dictionary.
+"""
+
+import logging
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from database import models
+from postprocessing.reading_order import group_words_into_lines
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class LoadedDocument:
+    """A document with its pages and reconstructed OCR data."""
+    document: models.Document
+    pages: List[models.Page]
+    ocr_data: Dict
+
+def build_ocr_page(page: models.Page, words: Sequence) -> Dict:
+    """Build the DocTR-style page structure used by the review UI from word rows."""
+    lines = group_words_into_lines(words)
+    return {
+        "page_idx": page.page_number,
+        "dimensions": page.dimensions,
+        "blocks": [
+            {
+                "lines": [
+                    {
+                        "words": [
+                            {
+                                "word_id": str(word.id),
+                                "value": word.text,
+                                "confidence": word.confidence,
+                                "geometry": word.geometry
+                            }
+                            for word in line
+                        ]
+                    }
+                    for line in lines
+                ]
+            }
+        ] if lines else []
+    }
+
+class DocumentLoader:
+    """Loads documents with a fixed number of queries."""
+
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def load(self, doc_id) -> Optional[LoadedDocument]:
+        """
+        Load a document and build its OCR data.
+
+        Returns:
+            None if the document does not exist
+        """
+        document = self.db.query(models.Document).filter(models.Document.id == doc_id).first()
+        if not document:
+            return None
+
+        pages = self.db.query(models.Page).filter(
+            models.Page.document_id == document.id
+        ).order_by(models.Page.page_number).all()
+
+        # One query for the words of every page, already in page and reading order
+        word_rows = self.db.query(
+            models.Word.page_id,
+            models.Word.id,
+            models.Word.text,
+            models.Word.confidence,
+            models.Word.geometry,
+            models.Word.line_index,
+            models.Word.word_index
+        ).join(
+            models.Page, models.Word.page_id == models.Page.id
+        ).filter(
+            models.Page.document_id == document.id
+        ).order_by(
+            models.Page.page_number, models.Word.page_id, models.Word.line_index, models.Word.word_index
+        ).all()
+
+        words_by_page = {page_id: list(rows) for page_id, rows in groupby(word_rows, key=lambda row: row.page_id)}
+
+        ocr_data = {
+            "doc_id": str(document.id),
+            "pages": [build_ocr_page(page, words_by_page.get(page.id, [])) for page in pages]
+        }
+
+        logger.debug(f"Loaded document {document.id}: {len(pages)} pages, {len(word_rows)} words")
+        return LoadedDocument(document=document, pages=pages, ocr_data=ocr_data)
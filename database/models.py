@@ -1,6 +1,6 @@
 import uuid
 from sqlalchemy import (create_engine, Column, String, Integer, Float, DateTime, 
-                        ForeignKey, JSON, Boolean, LargeBinary)
+                        ForeignKey, JSON, Boolean, LargeBinary, UniqueConstraint, BigInteger, Index)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -18,7 +18,11 @@ class Document(Base):
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     processed_at = Column(DateTime(timezone=True))
+    page_count = Column(Integer)  # Known once processing starts; pages are committed as they are recognized
     processing_error = Column(String)
+    claimed_at = Column(DateTime(timezone=True))  # Set when a worker claims the document; its fencing token
+    heartbeat_at = Column(DateTime(timezone=True))  # Refreshed by the worker holding the claim while it runs
+    content_hash = Column(String(64), index=True)  # SHA-256 of the uploaded bytes
     
     pages = relationship("Page", back_populates="document", cascade="all, delete-orphan")
     extracted_fields = relationship("ExtractedField", back_populates="document", cascade="all, delete-orphan")
@@ -32,15 +36,19 @@ class Page(Base):
     dimensions = Column(JSON) # {'width': w, 'height': h}
     
     document = relationship("Document", back_populates="pages")
-    words = relationship("Word", back_populates="page", cascade="all, delete-orphan")
+    words = relationship("Word", back_populates="page", cascade="all, delete-orphan",
+                         order_by="(Word.line_index, Word.word_index)")
 
 class Word(Base):
     __tablename__ = 'words'
+    __table_args__ = (Index('ix_words_page_reading_order', 'page_id', 'line_index', 'word_index'),)
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     page_id = Column(UUID(as_uuid=True), ForeignKey('pages.id', ondelete="CASCADE"), nullable=False)
     text = Column(String, nullable=False)
     confidence = Column(Float)
     geometry = Column(JSON, nullable=False) # bbox array
+    line_index = Column(Integer)  # Reading order computed at ingest, -1 when geometry is unusable
+    word_index = Column(Integer)  # Position within the line
     
     page = relationship("Page", back_populates="words")
     applied_corrections = relationship("AppliedCorrection", back_populates="word", cascade="all, delete-orphan")
@@ -71,13 +79,41 @@ class Correction(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     document_id = Column(UUID(as_uuid=True), nullable=True)  # Matches existing schema
     word_id = Column(UUID(as_uuid=True), nullable=True)  # Matches existing schema
-    original_text = Column(String, nullable=False)
+    original_text = Column(String, nullable=False, index=True)  # Grouped by lexicon learning
     corrected_text = Column(String, nullable=False)
     context = Column(String)  # Existing column in database
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # Scanned from the learning watermark
     # Note: page, corrected_bbox, user_id, correction_type columns will be added
     # by running SQL_FIX_CORRECTIONS_TABLE.sql as database admin
 
+class OCRCacheEntry(Base):
+    __tablename__ = 'ocr_cache_entries'
+    __table_args__ = (UniqueConstraint('content_hash', 'model_version', name='uq_ocr_cache_hash_model'),)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    content_hash = Column(String(64), nullable=False, index=True)
+    model_version = Column(String, nullable=False)
+    document_id = Column(UUID(as_uuid=True), ForeignKey('documents.id', ondelete="CASCADE"), nullable=False) # Source of the cached OCR results
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class CacheVersion(Base):
+    __tablename__ = 'cache_versions'
+    name = Column(String, primary_key=True)  # e.g. 'corrections'
+    version = Column(BigInteger, nullable=False, default=0)  # Bumped on every change, lets each process detect stale caches
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class DocumentSnapshot(Base):
+    __tablename__ = 'document_snapshots'
+    document_id = Column(UUID(as_uuid=True), ForeignKey('documents.id', ondelete="CASCADE"), primary_key=True)
+    corrections_version = Column(BigInteger, nullable=False)  # Version of the corrections applied
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed JSON of the corrected OCR data and page images
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class LearningWatermark(Base):
+    __tablename__ = 'learning_watermarks'
+    name = Column(String, primary_key=True)  # e.g. 'correction_lexicon'
+    watermark = Column(DateTime(timezone=True))  # Newest correction timestamp the learner has seen
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class Lexicon(Base):
     __tablename__ = 'lexicons'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -0,0 +1,40 @@
+"""
+Version counters for process-local caches.
+Each cached dataset (e.g. the correction index) has a row in cache_versions whose
+counter is bumped in the same transaction as the change, so every process can tell
+with a primary-key lookup whether its copy is stale.
+"""
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from database import models
+
+CORRECTIONS = "corrections"
+LEXICONS = "lexicons"
+
+def get_version(db: Session, name: str) -> int:
+    """Current version of a cached dataset (0 if it was never bumped)."""
+    version = db.query(models.CacheVersion.version).filter(models.CacheVersion.name == name).scalar()
+    return version or 0
+
+def bump_version(db: Session, name: str) -> int:
+    """
+    Increment a dataset's version without committing; the caller commits it together
+    with the change it describes.
+
+    Returns:
+        The new version
+    """
+    new_version = db.execute(
+        update(models.CacheVersion)
+        .where(models.CacheVersion.name == name)
+        .values(version=models.CacheVersion.version + 1)
+        .returning(models.CacheVersion.version)
+    ).scalar()
+
+    if new_version is None:
+        db.add(models.CacheVersion(name=name, version=1))
+        db.flush()
+        new_version = 1
+    return new_version
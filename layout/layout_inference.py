@@ -5,33 +5,91 @@ Processes OCR output with bounding boxes to identify field relationships and doc
 
 import json
 import logging
-from typing import Dict, List, Tuple, Optional, Any
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Optional, Any, Sequence, TYPE_CHECKING
 from pathlib import Path
-import torch
-from transformers import LayoutLMv3Processor, LayoutLMv3ForTokenClassification
 import numpy as np
 from PIL import Image
 
+from config_manager import get_config
+
+# torch and transformers are imported when the engine is built, not on import
+if TYPE_CHECKING:
+    import torch
+
 logger = logging.getLogger(__name__)
 
+# LayoutLMv3 position embeddings cover 512 tokens; longer pages are split into windows
+MAX_SEQUENCE_LENGTH = 512
+
+@dataclass
+class LayoutItem:
+    """One page image with its OCR words, as input to the layout model."""
+    image: Image.Image
+    words: List[str]
+    boxes: List[List[int]]  # Absolute pixel boxes [x1, y1, x2, y2]
+    doc_id: str
+
+@dataclass
+class _Window:
+    """Up to MAX_SEQUENCE_LENGTH tokens of one item."""
+    item_idx: int
+    features: Dict[str, List]
+    word_ids: List[Optional[int]]
+
 class LayoutInferenceEngine:
     """
     LayoutLMv3-based document layout understanding engine.
     Identifies field-label relationships and document structure.
     """
     
-    def __init__(self, model_name: str = "microsoft/layoutlmv3-base"):
-        """Initialize the LayoutLMv3 model and processor."""
+    def __init__(
+        self,
+        model_name: str = "microsoft/layoutlmv3-base",
+        batch_size: int = 8,
+        window_stride: int = 128,
+        quantize: bool = False,
+        compile_model: bool = False
+    ):
+        """
+        Initialize the LayoutLMv3 model and processor.
+
+        Args:
+            model_name: Hugging Face model name
+            batch_size: Token windows per forward pass
+            window_stride: Tokens shared by consecutive windows of a long page
+            quantize: Dynamically quantize the linear layers to int8
+            compile_model: Compile the forward pass with torch.compile
+        """
+        import torch
+        from transformers import LayoutLMv3Processor, LayoutLMv3ForTokenClassification
+
         self.model_name = model_name
         self.device = torch.device("cpu")  # CPU-only as per PRD
+        self.batch_size = max(1, batch_size)
+        self.window_stride = window_stride
         
         try:
             logger.info(f"Loading LayoutLMv3 model: {model_name}")
-            self.processor = LayoutLMv3Processor.from_pretrained(model_name)
+            # Words and boxes come from DocTR, the processor must not run its own OCR
+            self.processor = LayoutLMv3Processor.from_pretrained(model_name, apply_ocr=False)
             self.model = LayoutLMv3ForTokenClassification.from_pretrained(model_name)
             self.model.to(self.device)
             self.model.eval()
-            logger.info("LayoutLMv3 model loaded successfully")
+            if quantize:
+                # Weights of every nn.Linear (attention, FFN, classifier) become int8,
+                # activations are quantized per batch at run time
+                self.model = torch.ao.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            if compile_model:
+                # Windows are bucketed by length, so shapes vary between batches
+                self.model = torch.compile(self.model, dynamic=True)
+            self.quantized = quantize
+            logger.info(f"LayoutLMv3 model loaded successfully ({'int8' if quantize else 'fp32'}"
+                        f"{', compiled' if compile_model else ''})")
         except Exception as e:
             logger.error(f"Failed to load LayoutLMv3 model: {e}")
             raise
@@ -56,50 +114,155 @@ class LayoutInferenceEngine:
             
             # Extract words and bounding boxes from OCR data
             words, boxes = self._extract_words_and_boxes(ocr_data, image.size)
-            
-            if not words:
-                logger.warning(f"No words extracted from OCR data for document: {doc_id}")
-                return self._empty_layout_result(doc_id)
-            
-            # Prepare input for LayoutLMv3
-            encoding = self.processor(
-                image, 
-                words, 
-                boxes=boxes, 
-                return_tensors="pt",
-                padding=True,
-                truncation=True,
-                max_length=512
-            )
-            
-            # Move to device
-            encoding = {k: v.to(self.device) for k, v in encoding.items()}
-            
-            # Run inference
-            with torch.no_grad():
-                outputs = self.model(**encoding)
-                predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-                predicted_labels = torch.argmax(predictions, dim=-1)
-            
-            # Process results
+        except Exception as e:
+            logger.error(f"Layout inference failed for document {doc_id}: {e}")
+            return self._empty_layout_result(doc_id, error=str(e))
+
+        return self.process_batch([LayoutItem(image=image, words=words, boxes=boxes, doc_id=doc_id)])[0]
+
+    def process_batch(self, items: Sequence[LayoutItem]) -> List[Dict]:
+        """
+        Run layout inference on many pages, from one or several documents.
+
+        Pages longer than MAX_SEQUENCE_LENGTH tokens are split into overlapping windows.
+        Windows of all items are sorted by length and run in batches, so padding stays
+        small; each word takes its prediction from the window where it has the most
+        context on both sides.
+
+        Returns:
+            One layout result per item, in input order
+        """
+        import torch
+
+        results: List[Optional[Dict]] = [None] * len(items)
+        windows: List[_Window] = []
+        pixel_values: Dict[int, "torch.Tensor"] = {}
+
+        for item_idx, item in enumerate(items):
+            if not item.words:
+                logger.warning(f"No words extracted from OCR data for document: {item.doc_id}")
+                results[item_idx] = self._empty_layout_result(item.doc_id)
+                continue
+            try:
+                pixel_values[item_idx] = self.processor.image_processor(
+                    item.image, return_tensors="pt"
+                )["pixel_values"][0]
+                windows.extend(self._encode_windows(item_idx, item))
+            except Exception as e:
+                logger.error(f"Layout inference failed for document {item.doc_id}: {e}")
+                results[item_idx] = self._empty_layout_result(item.doc_id, error=str(e))
+
+        # Per item and word: (probabilities, tokens of context around the word)
+        word_predictions = {
+            item_idx: [None] * len(items[item_idx].words) for item_idx in pixel_values
+            if results[item_idx] is None
+        }
+        windows = [window for window in windows if window.item_idx in word_predictions]
+        windows.sort(key=lambda window: len(window.word_ids))
+
+        for start in range(0, len(windows), self.batch_size):
+            batch = windows[start:start + self.batch_size]
+            try:
+                probabilities = self._run_batch(batch, pixel_values)
+            except Exception as e:
+                for window in batch:
+                    item = items[window.item_idx]
+                    logger.error(f"Layout inference failed for document {item.doc_id}: {e}")
+                    results[window.item_idx] = self._empty_layout_result(item.doc_id, error=str(e))
+                    word_predictions.pop(window.item_idx, None)
+                continue
+
+            for window, window_probabilities in zip(batch, probabilities):
+                if window.item_idx in word_predictions:
+                    self._collect_word_predictions(window, window_probabilities, word_predictions[window.item_idx])
+
+        num_labels = self.model.config.num_labels
+        for item_idx, predictions_by_word in word_predictions.items():
+            item = items[item_idx]
+            # A word with no prediction (never expected) counts as "O" with zero confidence
+            word_probabilities = torch.stack([
+                prediction[0] if prediction is not None else torch.zeros(num_labels)
+                for prediction in predictions_by_word
+            ])
+            predicted_labels = torch.argmax(word_probabilities, dim=-1)
+
             layout_result = self._process_predictions(
-                words, boxes, predicted_labels[0], predictions[0], doc_id
+                item.words, item.boxes, predicted_labels, word_probabilities, item.doc_id
             )
-            
-            # Add field relationship analysis
             layout_result["field_relationships"] = self._analyze_field_relationships(
-                layout_result["entities"], image.size
+                layout_result["entities"], item.image.size
             )
-            
-            # Compute layout confidence score
-            layout_result["layout_confidence"] = self._compute_layout_confidence(predictions[0])
-            
-            logger.info(f"Layout inference completed for document: {doc_id}")
-            return layout_result
-            
-        except Exception as e:
-            logger.error(f"Layout inference failed for document {doc_id}: {e}")
-            return self._empty_layout_result(doc_id, error=str(e))
+            layout_result["layout_confidence"] = self._compute_layout_confidence(word_probabilities)
+            results[item_idx] = layout_result
+            logger.info(f"Layout inference completed for document: {item.doc_id}")
+
+        return results
+
+    def _encode_windows(self, item_idx: int, item: LayoutItem) -> List[_Window]:
+        """Tokenize an item into windows of at most MAX_SEQUENCE_LENGTH tokens."""
+        width, height = item.image.size
+        encoding = self.processor.tokenizer(
+            item.words,
+            boxes=[self._normalize_box(box, width, height) for box in item.boxes],
+            truncation=True,
+            max_length=MAX_SEQUENCE_LENGTH,
+            stride=self.window_stride,
+            return_overflowing_tokens=True,
+            padding=False
+        )
+        return [
+            _Window(
+                item_idx=item_idx,
+                features={
+                    "input_ids": encoding["input_ids"][window_idx],
+                    "attention_mask": encoding["attention_mask"][window_idx],
+                    "bbox": encoding["bbox"][window_idx]
+                },
+                word_ids=encoding.word_ids(window_idx)
+            )
+            for window_idx in range(len(encoding["input_ids"]))
+        ]
+
+    def _run_batch(self, batch: List[_Window], pixel_values: Dict[int, "torch.Tensor"]) -> "torch.Tensor":
+        """Pad a batch of windows to its longest member and return token label probabilities."""
+        import torch
+
+        encoding = self.processor.tokenizer.pad(
+            [window.features for window in batch], padding=True, return_tensors="pt"
+        )
+        encoding = dict(encoding)
+        encoding["pixel_values"] = torch.stack([pixel_values[window.item_idx] for window in batch])
+        encoding = {k: v.to(self.device) for k, v in encoding.items()}
+
+        with torch.inference_mode():
+            outputs = self.model(**encoding)
+            return torch.nn.functional.softmax(outputs.logits, dim=-1).cpu()
+
+    @staticmethod
+    def _collect_word_predictions(window: _Window, probabilities: "torch.Tensor", predictions_by_word: List) -> None:
+        """Keep, for every word, the first-token prediction with the most context."""
+        length = len(window.word_ids)
+        previous = None
+        for position, word_idx in enumerate(window.word_ids):
+            if word_idx is None or word_idx == previous:
+                previous = word_idx
+                continue
+            previous = word_idx
+            context = min(position, length - 1 - position)
+            current = predictions_by_word[word_idx]
+            if current is None or context > current[1]:
+                predictions_by_word[word_idx] = (probabilities[position], context)
+
+    @staticmethod
+    def _normalize_box(box: List[int], width: int, height: int) -> List[int]:
+        """Scale an absolute pixel box to the 0-1000 range LayoutLMv3 expects."""
+        x1, y1, x2, y2 = box
+        return [
+            min(1000, max(0, int(1000 * x1 / width))),
+            min(1000, max(0, int(1000 * y1 / height))),
+            min(1000, max(0, int(1000 * x2 / width))),
+            min(1000, max(0, int(1000 * y2 / height)))
+        ]
     
     def _extract_words_and_boxes(self, ocr_data: Dict, image_size: Tuple[int, int]) -> Tuple[List[str], List[List[int]]]:
         """Extract words and normalized bounding boxes from DocTR OCR output."""
@@ -118,8 +281,7 @@ class LayoutInferenceEngine:
                             
                         # DocTR uses relative coordinates [0, 1]
                         # Convert to absolute pixel coordinates for LayoutLMv3
-                        geometry = word.get("geometry", [[0, 0, 0, 0]])[0]
-                        x1, y1, x2, y2 = geometry
+                        x1, y1, x2, y2 = self._geometry_to_box(word.get("geometry"))
                         
                         # Convert to absolute coordinates and ensure proper format
                         abs_x1 = int(x1 * width)
@@ -135,15 +297,28 @@ class LayoutInferenceEngine:
         
         return words, boxes
     
+    @staticmethod
+    def _geometry_to_box(geometry) -> Tuple[float, float, float, float]:
+        """Relative (x1, y1, x2, y2) from DocTR [[x1, y1], [x2, y2]] or flat [x1, y1, x2, y2] geometry."""
+        if not geometry:
+            return 0.0, 0.0, 0.0, 0.0
+        if isinstance(geometry[0], (list, tuple)):
+            if len(geometry) >= 2:
+                (x1, y1), (x2, y2) = geometry[0][:2], geometry[1][:2]
+                return x1, y1, x2, y2
+            geometry = geometry[0]
+        x1, y1, x2, y2 = geometry[:4]
+        return x1, y1, x2, y2
+
     def _process_predictions(self, words: List[str], boxes: List[List[int]], 
-                           predicted_labels: torch.Tensor, predictions: torch.Tensor, 
+                           predicted_labels: "torch.Tensor", predictions: "torch.Tensor", 
                            doc_id: str) -> Dict:
         """Process LayoutLMv3 predictions into structured results."""
         entities = []
         
         # Convert predictions to numpy for easier processing
         predicted_labels_np = predicted_labels.cpu().numpy()
-        confidence_scores = torch.max(predictions, dim=-1)[0].cpu().numpy()
+        confidence_scores = predictions.max(dim=-1)[0].cpu().numpy()
         
         # Map label IDs to meaningful names (this would need to be configured based on your model)
         label_map = {
@@ -235,10 +410,10 @@ class LayoutInferenceEngine:
         """Calculate Euclidean distance between two points."""
         return np.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
     
-    def _compute_layout_confidence(self, predictions: torch.Tensor) -> float:
-        """Compute overall layout confidence score."""
-        max_confidences = torch.max(predictions, dim=-1)[0]
-        return float(torch.mean(max_confidences).item())
+    def _compute_layout_confidence(self, predictions: "torch.Tensor") -> float:
+        """Compute overall layout confidence score (mean of the per-word top probabilities)."""
+        max_confidences = predictions.max(dim=-1)[0]
+        return float(max_confidences.mean().item())
     
     def _empty_layout_result(self, doc_id: str, error: Optional[str] = None) -> Dict:
         """Return empty layout result structure."""
@@ -261,16 +436,53 @@ class LayoutInferenceEngine:
         return result
 
 
+def configure_torch_threads(intra_op_threads: int = 0, inter_op_threads: int = 0, workers: int = 1) -> int:
+    """
+    Set the torch thread counts of this process before the layout model runs.
+    With intra_op_threads 0 the cores are split evenly between the job queue workers,
+    which can run layout inference at the same time. Returns the intra-op thread count.
+    """
+    import torch
+
+    if intra_op_threads <= 0:
+        intra_op_threads = max(1, (os.cpu_count() or 1) // max(1, workers))
+    torch.set_num_threads(intra_op_threads)
+    if inter_op_threads > 0:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as e:
+            # Only allowed before the first inter-op parallel work of the process
+            logger.warning(f"Could not set torch inter-op threads: {e}")
+    return intra_op_threads
+
 # Singleton instance for reuse across requests
 _layout_engine: Optional[LayoutInferenceEngine] = None
+_layout_engine_lock = threading.Lock()
 
 def get_layout_engine() -> LayoutInferenceEngine:
-    """Get or create the global LayoutInferenceEngine instance."""
+    """Get or create the global LayoutInferenceEngine instance (thread-safe, built on first use)."""
     global _layout_engine
     if _layout_engine is None:
-        _layout_engine = LayoutInferenceEngine()
+        with _layout_engine_lock:
+            if _layout_engine is None:
+                config = get_config()
+                configure_torch_threads(
+                    intra_op_threads=config.get("layout.intra_op_threads", 0),
+                    inter_op_threads=config.get("layout.inter_op_threads", 1),
+                    workers=config.get("job_queue.workers", 4)
+                )
+                _layout_engine = LayoutInferenceEngine(
+                    batch_size=config.get("layout.batch_size", 8),
+                    window_stride=config.get("layout.window_stride", 128),
+                    quantize=config.get("layout.quantize", True),
+                    compile_model=config.get("layout.compile", False)
+                )
     return _layout_engine
 
+def warm_up() -> None:
+    """Load the LayoutLMv3 model ahead of the first request."""
+    get_layout_engine()
+
 async def process_layout(image_path: Path, ocr_data: Dict, doc_id: str) -> Dict:
     """
     Async wrapper for layout processing.
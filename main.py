@@ -2,9 +2,9 @@ import os
 import uuid
 import json
 from pathlib import Path
-import shutil
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
+import threading
 import traceback
 from datetime import datetime
 
@@ -14,26 +14,30 @@ from sqlalchemy.orm import Session
 # Add basic logging configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 
 # Database imports
 from database.connector import SessionLocal, engine, get_db
 from database import models
+from database.document_loader import DocumentLoader
 
-from ocr.doctr_ocr import process_document
 from postprocessing.normalize import normalize_text
 from postprocessing.anchors import get_anchor_extractor
 from layout.layout_inference import process_layout
 from quality.scoring import get_quality_scorer, get_document_router
 from corrections.integration import get_correction_integrator, get_correction_learner
+from corrections.correction_index import CorrectionIndex
+from corrections.correction_cache import get_correction_index_cache
+from database.versions import CORRECTIONS, bump_version
 from classification.document_classifier import get_document_classifier
 from config_manager import get_config
 from ocr.lexicon_processor import get_lexicon_processor
-
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+from processing.job_queue import get_job_queue, STATUS_QUEUED, STATUS_COMPLETED, STATUS_FAILED
+from ocr.doctr_ocr import warm_up as warm_up_ocr
+from processing.ocr_cache import OCRResultCache, get_active_model_version, save_and_hash
+from processing.document_snapshots import DocumentSnapshotStore, get_snapshot_refresher
 
 # Configuration - use absolute paths
 BASE_DIR = Path(__file__).resolve().parent
@@ -61,16 +65,50 @@ async def test_corrections_page(request: Request):
     """Test page to verify corrections are being applied."""
     return templates.TemplateResponse(request, "test_corrections.html")
 
+@app.on_event("startup")
+def create_tables():
+    """Create database tables (at startup rather than on import, so importing main stays cheap)."""
+    models.Base.metadata.create_all(bind=engine)
+
+@app.on_event("startup")
+def warm_up_models():
+    """Load the OCR models in the background so the first document does not pay for them."""
+    job_queue_config = get_config().get("job_queue", {})
+    if job_queue_config.get("run_in_web_process", True) and job_queue_config.get("warm_up_models", True):
+        threading.Thread(target=warm_up_ocr, name="ocr-warm-up", daemon=True).start()
+
+@app.on_event("startup")
+def start_job_workers():
+    """Start the background OCR workers unless they run as separate processes."""
+    if get_config().get("job_queue.run_in_web_process", True):
+        get_job_queue(OUTPUT_DIR).start()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    """Stop the background OCR workers."""
+    get_job_queue(OUTPUT_DIR).stop(timeout=5)
+
+@app.on_event("startup")
+def start_snapshot_refresher():
+    """Keep the corrected-OCR snapshots of completed documents current in the background."""
+    if get_config().get("snapshots.refresher_enabled", True):
+        get_snapshot_refresher().start()
+
+@app.on_event("shutdown")
+def stop_snapshot_refresher():
+    """Stop the snapshot refresher."""
+    get_snapshot_refresher().stop(timeout=5)
+
 @app.post("/upload", response_class=HTMLResponse)
 async def upload_and_process_document(request: Request, file: UploadFile = File(...), db: Session = Depends(get_db)):
-    """Handles file upload, saves the file, and triggers OCR processing."""
+    """Handles file upload, saves the file, and queues the document for OCR processing."""
     doc_id = uuid.uuid4()
     file_extension = Path(file.filename).suffix
     storage_path = UPLOAD_DIR / f"{doc_id}{file_extension}"
 
-    # Save the uploaded file
+    # Save the uploaded file, hashing it on the way
     with storage_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+        content_hash = save_and_hash(file.file, buffer)
 
     # Create a new document record in the database
     db_document = models.Document(
@@ -78,59 +116,66 @@ async def upload_and_process_document(request: Request, file: UploadFile = File(
         filename=file.filename, 
         content_type=file.content_type,
         storage_path=str(storage_path),
-        status='processing'
+        content_hash=content_hash,
+        status=STATUS_QUEUED
     )
     db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
-
-    try:
-        logger.info(f"Processing document: {storage_path}")
-        
-        ocr_data, image_paths = await process_document(storage_path, str(doc_id), OUTPUT_DIR)
-        logger.info(f"OCR processing completed for document: {doc_id}")
-
-        for page_idx, page_data in enumerate(ocr_data.get("pages", [])):
-            db_page = models.Page(
-                document_id=db_document.id,
-                page_number=page_idx,
-                image_path=image_paths[page_idx],
-                dimensions=page_data.get('dimensions')
-            )
-            db.add(db_page)
-            db.commit()
-            db.refresh(db_page)
-
-            words_to_insert = []
-            for block in page_data.get("blocks", []):
-                for line in block.get("lines", []):
-                    for word_info in line.get("words", []):
-                        words_to_insert.append(models.Word(
-                            page_id=db_page.id,
-                            text=word_info.get('value'),
-                            confidence=word_info.get('confidence'),
-                            geometry=word_info.get('geometry')
-                        ))
-            db.bulk_save_objects(words_to_insert)
-            db.commit()
 
+    # Identical bytes already recognized by the active model: reuse the results
+    ocr_cache = OCRResultCache(db)
+    cached_document = ocr_cache.lookup(content_hash, get_active_model_version(db))
+    if cached_document:
+        db_document.page_count, _ = ocr_cache.clone_results(cached_document, db_document)
+        db_document.status = STATUS_COMPLETED
         db_document.processed_at = datetime.utcnow()
-        db_document.status = 'completed'
         db.commit()
-
+        logger.info(f"Reused cached OCR results of {cached_document.id} for document {doc_id}")
         return templates.TemplateResponse(request, "canvas.html", {
             "doc_id": str(doc_id),
-            "message": f"Document processed successfully!",
+            "job_id": str(doc_id),
+            "message": "Document processed successfully!",
         })
-    except Exception as e:
-        error_details = traceback.format_exc()
-        logger.error(f"Failed to process document: {doc_id}")
-        logger.error(f"Error: {e}")
-        logger.error(f"Traceback:\n{error_details}")
-        db_document.status = 'failed'
-        db_document.processing_error = error_details
-        db.commit()
-        return JSONResponse(status_code=500, content={"error": f"Failed to process document: {str(e)}"})
+
+    # Otherwise a background worker picks it up
+    db.commit()
+    get_job_queue(OUTPUT_DIR).notify()
+    logger.info(f"Queued document {doc_id} for processing")
+
+    return templates.TemplateResponse(request, "canvas.html", {
+        "doc_id": str(doc_id),
+        "job_id": str(doc_id),
+        "message": "Document queued for processing",
+    })
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str, db: Session = Depends(get_db)):
+    """Poll the processing status of an uploaded document (the job id is the document id)."""
+    try:
+        doc_uuid = uuid.UUID(job_id)
+    except ValueError:
+        return JSONResponse(status_code=400, content={"error": "Invalid job ID"})
+
+    document = db.query(models.Document).filter(models.Document.id == doc_uuid).first()
+    if not document:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+
+    pages_processed = db.query(models.Page).filter(models.Page.document_id == doc_uuid).count()
+
+    error = None
+    if document.status == STATUS_FAILED and document.processing_error:
+        # Only expose the final line of the stored traceback
+        error = document.processing_error.strip().splitlines()[-1]
+
+    return JSONResponse(content={
+        "job_id": job_id,
+        "document_id": str(document.id),
+        "status": document.status,
+        "pages_processed": pages_processed,
+        "page_count": document.page_count,
+        "error": error,
+        "created_at": document.created_at.isoformat() if document.created_at else None,
+        "processed_at": document.processed_at.isoformat() if document.processed_at else None
+    })
 
 @app.get("/review/{doc_id}", response_class=HTMLResponse)
 async def get_review_ui(request: Request, doc_id: str):
@@ -150,231 +195,104 @@ def apply_corrections_to_ocr_data(ocr_data: Dict, corrections: List) -> Dict:
     - Prefix match (ZAIDI matches ZAIDI*, ZAIDI<NOUR, etc.)
     - Case-insensitive match
     
-    Latest corrections always win (timestamp DESC).
+    Latest corrections always win (timestamp DESC). Matching is done by a compiled
+    CorrectionIndex, so each word costs time proportional to its length.
     """
     if not corrections:
         return ocr_data
     
-    # Sort by timestamp DESC (latest first)
-    sorted_corrections = sorted(
-        corrections, 
-        key=lambda c: c.timestamp if c.timestamp else datetime.min,
-        reverse=True
-    )
-    
-    # Build correction mappings with TIMESTAMPS to ensure latest wins
-    exact_match_map = {}  # key -> (corrected_text, timestamp)
-    fuzzy_match_map = {}  # key -> (corrected_text, timestamp)
-    prefix_match_list = []  # (original, corrected, timestamp)
-    
-    for correction in sorted_corrections:  # Already sorted by timestamp DESC (newest first)
-        original = correction.original_text
-        corrected = correction.corrected_text
-        timestamp = correction.timestamp if correction.timestamp else datetime.min
-        
-        # Exact match - only keep if this is newer
-        if original not in exact_match_map or timestamp > exact_match_map[original][1]:
-            exact_match_map[original] = (corrected, timestamp)
-        
-        # Fuzzy match - only keep if this is newer
-        original_clean = original.rstrip('<*. ')
-        if original_clean:
-            if original_clean not in fuzzy_match_map or timestamp > fuzzy_match_map[original_clean][1]:
-                fuzzy_match_map[original_clean] = (corrected, timestamp)
-        
-        # Store ALL for prefix matching (will check timestamp when applying)
-        prefix_match_list.append((original, corrected, timestamp))
-    
-    corrections_applied = 0
-    
-    # Apply corrections - CHECK ALL STRATEGIES and pick the NEWEST one
-    for page in ocr_data.get("pages", []):
-        for block in page.get("blocks", []):
-            for line in block.get("lines", []):
-                for word in line.get("words", []):
-                    original_value = word.get("value", "")
-                    if not original_value:
-                        continue
-                    
-                    # CRITICAL: Find ALL matches and pick NEWEST by timestamp
-                    # Timestamp is MORE important than match type for learning strategy
-                    
-                    candidates = []  # (corrected_value, timestamp, method, priority)
-                    value_clean = original_value.rstrip('<*. ')
-                    
-                    # Strategy 1: Exact match (priority 1)
-                    if original_value in exact_match_map:
-                        corr_text, corr_time = exact_match_map[original_value]
-                        candidates.append((corr_text, corr_time, "exact", 1))
-                    
-                    # Strategy 2: Fuzzy match (priority 2)
-                    if value_clean in fuzzy_match_map:
-                        corr_text, corr_time = fuzzy_match_map[value_clean]
-                        candidates.append((corr_text, corr_time, "fuzzy", 2))
-                    
-                    # Strategy 3: Prefix match (priority 3)
-                    for orig, corr, corr_time in prefix_match_list:
-                        orig_clean = orig.rstrip('<*. ')
-                        if orig_clean and value_clean.startswith(orig_clean):
-                            # Don't apply prefix if we have exact match for full MRZ code
-                            # Only apply prefix for simple cases
-                            if len(original_value) - len(orig_clean) < 5:  # Short suffix ok
-                                suffix = original_value[len(orig_clean):]
-                                result = corr + suffix
-                                candidates.append((result, corr_time, "prefix", 3))
-                    
-                    # Strategy 4: Case-insensitive (priority 4)
-                    for exact_original, (exact_corrected, corr_time) in exact_match_map.items():
-                        if exact_original.lower() == original_value.lower() and exact_original != original_value:
-                            candidates.append((exact_corrected, corr_time, "case_insensitive", 4))
-                    
-                    # Pick correction: NEWEST timestamp wins
-                    # If timestamps are equal, lower priority number wins
-                    if candidates:
-                        candidates.sort(key=lambda x: (x[1], -x[3]), reverse=True)
-                        best_correction, best_time, best_method, _ = candidates[0]
-                        
-                        word["value"] = best_correction
-                        word["corrected"] = True
-                        word["original_value"] = original_value
-                        word["correction_method"] = best_method
-                        corrections_applied += 1
-    
-    if corrections_applied > 0:
-        logger.info(f"Applied {corrections_applied} corrections to OCR data")
-    
+    CorrectionIndex(corrections).apply(ocr_data)
     return ocr_data
 
+def collect_correction_words(db: Session, document_id, correction_index: CorrectionIndex, entry: int) -> List[Dict]:
+    """
+    Find the words of a document whose value comes from one correction, given by its
+    entry number in the index. For the correction just saved, these are exactly the
+    words whose displayed value changed when it was added.
+    """
+    words = db.query(models.Word.id, models.Word.text, models.Page.page_number).join(
+        models.Page, models.Word.page_id == models.Page.id
+    ).filter(models.Page.document_id == document_id).all()
+
+    changed_words = []
+    for word_id, text, page_number in words:
+        match = correction_index.match(text or "")
+        if match is None or match.seq != entry:
+            continue
+        changed_words.append({
+            "word_id": str(word_id),
+            "page_idx": page_number,
+            "value": match.value,
+            "corrected": True,
+            "original_value": text,
+            "correction_method": match.method
+        })
+    return changed_words
+
+# Sent with corrected OCR data: browsers keep it but revalidate it with its ETag on every use
+REVALIDATE_HEADERS = {"Cache-Control": "no-cache"}
+# Sent with data that has no ETag (documents still being processed, errors)
+NO_STORE_HEADERS = {"Cache-Control": "no-cache, no-store, must-revalidate", "Pragma": "no-cache", "Expires": "0"}
+# Page images: a filename is never reused for different content
+IMMUTABLE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+IMMUTABLE_SUFFIXES = {".png", ".webp", ".jpg", ".jpeg"}
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """Whether the request's If-None-Match header covers etag."""
+    if etag is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def cache_headers(etag: Optional[str]) -> Dict[str, str]:
+    return {**REVALIDATE_HEADERS, "ETag": etag} if etag else NO_STORE_HEADERS
+
 @app.get("/data/document/{doc_id}")
-async def get_document_data(doc_id: str, db: Session = Depends(get_db)):
+async def get_document_data(doc_id: str, request: Request, db: Session = Depends(get_db)):
     """Provides the necessary data for the review UI from the database."""
-    document = db.query(models.Document).filter(models.Document.id == doc_id).first()
-    if not document or not document.pages:
-        return JSONResponse(status_code=404, content={"error": "Document data not found."})
-
-    # Reconstruct the ocr_data structure from database models
-    # Group words into lines based on Y-coordinate proximity
-    def group_words_into_lines(words, y_tolerance=0.015):
-        """Group words into lines based on their Y-coordinates.
-        
-        Args:
-            words: List of Word objects from database
-            y_tolerance: Maximum Y-coordinate difference for same line (normalized 0-1)
-        """
-        if not words:
-            return []
-        
-        # Sort words by Y coordinate (top to bottom), then X (left to right)
-        # Geometry can be either [x, y] or [[x1, y1], [x2, y2]]
-        def get_coords(w):
-            if not w.geometry or len(w.geometry) < 2:
-                return (0, 0)
-            # Check if it's a bounding box [[x1,y1],[x2,y2]] or single point [x,y]
-            if isinstance(w.geometry[0], list):
-                return (w.geometry[0][1], w.geometry[0][0])  # Y, X
-            else:
-                return (w.geometry[1], w.geometry[0])  # Y is at index 1, X at index 0
-        
-        sorted_words = sorted(words, key=get_coords)
-        
-        lines = []
-        current_line = []
-        current_y = None
-        
-        for word in sorted_words:
-            if not word.geometry or len(word.geometry) < 2:
-                continue
-            
-            # Get Y coordinate
-            word_y = word.geometry[1] if not isinstance(word.geometry[0], list) else word.geometry[0][1]
-            
-            # Start new line if Y coordinate differs significantly
-            if current_y is None or abs(word_y - current_y) > y_tolerance:
-                if current_line:
-                    lines.append(current_line)
-                current_line = []
-                current_y = word_y
-            
-            current_line.append({
-                "value": word.text,
-                "confidence": word.confidence,
-                "geometry": word.geometry
-            })
-        
-        # Add the last line
-        if current_line:
-            lines.append(current_line)
-        
-        return lines
-    
-    ocr_data = {
-        "doc_id": str(document.id),
-        "pages": []
-    }
-    
-    for page in document.pages:
-        lines = group_words_into_lines(page.words)
-        page_data = {
-            "page_idx": page.page_number,
-            "dimensions": page.dimensions,
-            "blocks": [
-                {
-                    "lines": [
-                        {"words": line} for line in lines
-                    ]
-                }
-            ] if lines else []
-        }
-        ocr_data["pages"].append(page_data)
+    store = DocumentSnapshotStore(db)
+    etag = store.current_etag(doc_id)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
 
-    # Load and apply corrections (sorted by timestamp DESC - latest first)
-    # Apply ALL corrections from database, not just document-specific ones
+    # Corrected OCR data with ALL corrections from database applied, not just
+    # document-specific ones (latest wins), from the document's snapshot when current
     try:
-        # Get document-specific corrections
-        doc_corrections = db.query(models.Correction).filter(
-            models.Correction.document_id == doc_id
-        ).order_by(models.Correction.timestamp.desc()).all()
-        
-        # Get global corrections (from other documents with same text patterns)
-        global_corrections = db.query(models.Correction).filter(
-            models.Correction.document_id != doc_id
-        ).order_by(models.Correction.timestamp.desc()).all()
-        
-        # Combine: document-specific first, then global
-        all_corrections = doc_corrections + global_corrections
-        
-        if all_corrections:
-            logger.info(f"Applying {len(doc_corrections)} document + {len(global_corrections)} global corrections to {doc_id}")
-            ocr_data = apply_corrections_to_ocr_data(ocr_data, all_corrections)
+        corrected = store.load(doc_id)
+        if not corrected or not corrected.page_count:
+            return JSONResponse(status_code=404, content={"error": "Document data not found."})
+        ocr_data, image_paths = corrected.ocr_data, corrected.image_paths
+        corrections_version = corrected.corrections_version
+        etag = corrected.etag
     except Exception as e:
         logger.error(f"Error applying corrections: {e}")
         import traceback
         traceback.print_exc()
         # Continue without corrections if there's an error
-    
-    # Handle both old absolute paths and new relative paths
-    image_paths = []
-    for page in document.pages:
-        # Extract just the filename from path (handles both absolute and relative paths)
-        image_filename = Path(page.image_path).name if page.image_path else None
-        if image_filename:
-            image_paths.append(f"/data/outputs/{image_filename}")
+        db.rollback()
+        loaded = DocumentLoader(db).load(doc_id)
+        if not loaded or not loaded.pages:
+            return JSONResponse(status_code=404, content={"error": "Document data not found."})
+        ocr_data = loaded.ocr_data
+        # Handle both old absolute paths and new relative paths
+        image_paths = [f"/data/outputs/{Path(page.image_path).name}" for page in loaded.pages if page.image_path]
+        corrections_version = None
+        etag = None
     
     response_content = {
         "imageUrl": image_paths[0] if image_paths else None,
         "imagePaths": image_paths,  # All page images
-        "ocrData": ocr_data
+        "ocrData": ocr_data,
+        "correctionsVersion": corrections_version  # Base version for /update_ocr_data deltas
     }
     
-    # Add cache-busting headers to ensure fresh corrections
-    return JSONResponse(
-        content=response_content,
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0"
-        }
-    )
+    # Revalidated on every load so corrections are never stale
+    return JSONResponse(content=response_content, headers=cache_headers(etag))
     
 @app.get("/api/quality/{doc_id}")
 async def get_quality_metrics(doc_id: str, db: Session = Depends(get_db)):
@@ -490,8 +408,11 @@ async def save_correction(
             timestamp=datetime.now()
         )
         db.add(db_correction)
+        corrections_version = bump_version(db, CORRECTIONS)
         db.commit()
         db.refresh(db_correction)
+        get_correction_index_cache().record(db_correction, corrections_version)
+        get_snapshot_refresher().notify()
         
         logger.info(f"✓ CORRECTION SAVED TO DATABASE")
         logger.info(f"  Correction ID: {db_correction.id}")
@@ -511,6 +432,7 @@ async def save_correction(
             "status": "success", 
             "message": "Correction saved successfully",
             "correction_id": str(db_correction.id),
+            "corrections_version": corrections_version,
             "saved": True
         })
 
@@ -523,71 +445,50 @@ async def save_correction(
 
 @app.post("/update_ocr_data/{doc_id}")
 async def update_ocr_data(doc_id: str, request: Request, db: Session = Depends(get_db)):
-    """Update OCR data after correction is made - return fresh corrected data."""
+    """
+    Update OCR data after correction is made.
+    When the client's base_version is exactly one save behind and this process recorded
+    that save, only the words changed by that correction are returned ("delta");
+    otherwise the full corrected data ("full").
+    """
     try:
         logger.info(f"Fetching updated OCR data with corrections for {doc_id}")
         
         # Get document
-        document = db.query(models.Document).filter(models.Document.id == doc_id).first()
+        try:
+            doc_uuid = uuid.UUID(doc_id)
+        except ValueError:
+            return JSONResponse(status_code=404, content={"error": "Document not found"})
+        document = db.query(models.Document).filter(models.Document.id == doc_uuid).first()
         if not document:
             return JSONResponse(status_code=404, content={"error": "Document not found"})
         
-        # Rebuild OCR data with corrections applied
-        def group_words_into_lines(words, y_tolerance=0.015):
-            if not words:
-                return []
-            def get_coords(w):
-                if not w.geometry or len(w.geometry) < 2:
-                    return (0, 0)
-                if isinstance(w.geometry[0], list):
-                    return (w.geometry[0][1], w.geometry[0][0])
-                else:
-                    return (w.geometry[1], w.geometry[0])
-            sorted_words = sorted(words, key=get_coords)
-            lines = []
-            current_line = []
-            current_y = None
-            for word in sorted_words:
-                if not word.geometry or len(word.geometry) < 2:
-                    continue
-                word_y = word.geometry[1] if not isinstance(word.geometry[0], list) else word.geometry[0][1]
-                if current_y is None or abs(word_y - current_y) > y_tolerance:
-                    if current_line:
-                        lines.append(current_line)
-                    current_line = []
-                    current_y = word_y
-                current_line.append({"value": word.text, "confidence": word.confidence, "geometry": word.geometry})
-            if current_line:
-                lines.append(current_line)
-            return lines
-        
-        ocr_data = {"doc_id": str(document.id), "pages": []}
-        for page in document.pages:
-            lines = group_words_into_lines(page.words)
-            ocr_data["pages"].append({
-                "page_idx": page.page_number,
-                "dimensions": page.dimensions,
-                "blocks": [{"lines": [{"words": line} for line in lines]}] if lines else []
+        form = await request.form()
+        base_version = form.get("base_version")
+        correction_cache = get_correction_index_cache()
+        correction_index, corrections_version = correction_cache.get_versioned_index(db)
+        # Only a save recorded into this index identifies the correction that made the change
+        saved_entry = correction_cache.saved_entry(correction_index, corrections_version)
+        
+        if (base_version and base_version.isdigit() and corrections_version - int(base_version) == 1
+                and saved_entry is not None):
+            changed_words = collect_correction_words(db, document.id, correction_index, saved_entry)
+            logger.info(f"Sending {len(changed_words)} changed words (version {corrections_version})")
+            return JSONResponse(content={
+                "status": "success",
+                "mode": "delta",
+                "version": corrections_version,
+                "words": changed_words
             })
         
-        # Apply ALL corrections (document + global)
-        doc_corrections = db.query(models.Correction).filter(
-            models.Correction.document_id == doc_id
-        ).order_by(models.Correction.timestamp.desc()).all()
-        
-        global_corrections = db.query(models.Correction).filter(
-            models.Correction.document_id != doc_id
-        ).order_by(models.Correction.timestamp.desc()).all()
-        
-        all_corrections = doc_corrections + global_corrections
-        
-        if all_corrections:
-            logger.info(f"Applying {len(doc_corrections)} doc + {len(global_corrections)} global corrections")
-            ocr_data = apply_corrections_to_ocr_data(ocr_data, all_corrections)
+        # OCR data with ALL corrections (document + global), from the snapshot when current
+        corrected = DocumentSnapshotStore(db).load(document.id)
         
         return JSONResponse(content={
             "status": "success",
-            "ocrData": ocr_data
+            "mode": "full",
+            "version": corrected.corrections_version,
+            "ocrData": corrected.ocr_data
         })
     except Exception as e:
         logger.error(f"Error updating OCR data: {e}")
@@ -610,97 +511,42 @@ async def serve_output_image(filename: str):
     """Serve output images from the outputs directory."""
     file_path = OUTPUT_DIR / filename
     if file_path.exists() and file_path.is_file():
-        return FileResponse(file_path)
+        # Page images are named after their document and page; other outputs can be rewritten
+        headers = IMMUTABLE_HEADERS if file_path.suffix.lower() in IMMUTABLE_SUFFIXES else REVALIDATE_HEADERS
+        return FileResponse(file_path, headers=headers)
     return JSONResponse(status_code=404, content={"error": "Image not found"})
 
 @app.get("/raw_ocr/{doc_id}")
-async def get_raw_ocr(doc_id: str, db: Session = Depends(get_db)):
+async def get_raw_ocr(doc_id: str, request: Request, db: Session = Depends(get_db)):
     """Get raw OCR data for a document."""
     try:
-        document = db.query(models.Document).filter(models.Document.id == doc_id).first()
-        if not document:
-            return JSONResponse(status_code=404, content={"error": "Document not found"})
-        
-        # Helper function to group words into lines
-        def group_words_into_lines(words, y_tolerance=0.015):
-            """Group words by Y-coordinate (normalized 0-1 range)."""
-            if not words:
-                return []
-            
-            # Geometry can be either [x, y] or [[x1, y1], [x2, y2]]
-            def get_coords(w):
-                if not w.geometry or len(w.geometry) < 2:
-                    return (0, 0)
-                if isinstance(w.geometry[0], list):
-                    return (w.geometry[0][1], w.geometry[0][0])  # Y, X from bounding box
-                else:
-                    return (w.geometry[1], w.geometry[0])  # Y is at index 1, X at index 0
-            
-            sorted_words = sorted(words, key=get_coords)
-            
-            lines = []
-            current_line = []
-            current_y = None
-            
-            for word in sorted_words:
-                if not word.geometry or len(word.geometry) < 2:
-                    continue
-                # Get Y coordinate
-                word_y = word.geometry[1] if not isinstance(word.geometry[0], list) else word.geometry[0][1]
-                if current_y is None or abs(word_y - current_y) > y_tolerance:
-                    if current_line:
-                        lines.append(current_line)
-                    current_line = []
-                    current_y = word_y
-                current_line.append({"value": word.text, "confidence": word.confidence, "geometry": word.geometry})
-            if current_line:
-                lines.append(current_line)
-            return lines
-        
-        # Reconstruct OCR data from database
-        pages = db.query(models.Page).filter(models.Page.document_id == doc_id).order_by(models.Page.page_number).all()
-        ocr_data = {"pages": []}
-        
-        for page in pages:
-            words = db.query(models.Word).filter(models.Word.page_id == page.id).all()
-            lines = group_words_into_lines(words)
-            page_data = {
-                "page_idx": page.page_number,
-                "dimensions": page.dimensions,
-                "blocks": [{"lines": [{"words": line} for line in lines]}] if lines else []
-            }
-            ocr_data["pages"].append(page_data)
-        
-        # Load and apply corrections (sorted by timestamp DESC - latest first)
-        # Apply ALL corrections globally, not just document-specific
+        store = DocumentSnapshotStore(db)
+        etag = store.current_etag(doc_id)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=cache_headers(etag))
+
+        # OCR data with ALL corrections applied globally, not just document-specific
+        # (latest wins), from the document's snapshot when current
         try:
-            doc_corrections = db.query(models.Correction).filter(
-                models.Correction.document_id == doc_id
-            ).order_by(models.Correction.timestamp.desc()).all()
-            
-            global_corrections = db.query(models.Correction).filter(
-                models.Correction.document_id != doc_id
-            ).order_by(models.Correction.timestamp.desc()).all()
-            
-            all_corrections = doc_corrections + global_corrections
-            
-            if all_corrections:
-                logger.info(f"Applying {len(doc_corrections)} document + {len(global_corrections)} global corrections to raw OCR")
-                ocr_data = apply_corrections_to_ocr_data(ocr_data, all_corrections)
+            corrected = store.load(doc_id)
+            if not corrected:
+                return JSONResponse(status_code=404, content={"error": "Document not found"})
+            ocr_data = {"pages": corrected.ocr_data["pages"]}
+            etag = corrected.etag
         except Exception as e:
             logger.error(f"Error applying corrections to raw OCR: {e}")
             import traceback
             traceback.print_exc()
-        
-        # Return with cache-busting headers
-        return JSONResponse(
-            content=ocr_data,
-            headers={
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-                "Pragma": "no-cache",
-                "Expires": "0"
-            }
-        )
+            db.rollback()
+            # Reconstruct OCR data from database without corrections
+            loaded = DocumentLoader(db).load(doc_id)
+            if not loaded:
+                return JSONResponse(status_code=404, content={"error": "Document not found"})
+            ocr_data = {"pages": loaded.ocr_data["pages"]}
+            etag = None
+        
+        # Revalidated on every load so corrections are never stale
+        return JSONResponse(content=ocr_data, headers=cache_headers(etag))
     except Exception as e:
         logger.error(f"Error getting raw OCR: {e}")
         import traceback
@@ -3,9 +3,11 @@ import json
 import logging
 from pathlib import Path
 import uuid
+from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
 from database.connector import engine
 from database import models
+from database.versions import LEXICONS, bump_version
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -159,6 +161,7 @@ class Migration:
                 self.session.add(lexicon_entry)
         
         if not self.dry_run:
+            bump_version(self.session, LEXICONS)
             self.session.commit()
 
     def migrate_corrections(self):
@@ -210,16 +213,98 @@ class Migration:
         if not self.dry_run:
             self.session.commit()
 
+def run_workers(num_workers=None):
+    """Run document processing workers in this process, separate from the web tier."""
+    import time
+    from processing.job_queue import get_job_queue
+    from ocr.doctr_ocr import warm_up
+
+    # Load the models before claiming the first job
+    warm_up()
+    job_queue = get_job_queue()
+    if num_workers:
+        job_queue.num_workers = num_workers
+    job_queue.start()
+    logger.info("Workers running, press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info("Stopping workers...")
+        job_queue.stop()
+
+def backfill_reading_order(dry_run=False):
+    """Compute and store line_index/word_index for words ingested before reading order was stored."""
+    from postprocessing.reading_order import compute_reading_order
+
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    try:
+        page_ids = [page_id for (page_id,) in session.query(models.Word.page_id).filter(
+            models.Word.line_index.is_(None)
+        ).distinct()]
+        logger.info(f"Backfilling reading order for {len(page_ids)} pages")
+
+        for count, page_id in enumerate(page_ids, start=1):
+            words = session.query(models.Word.id, models.Word.geometry).filter(
+                models.Word.page_id == page_id
+            ).all()
+            reading_order = compute_reading_order([geometry for _, geometry in words])
+            session.bulk_update_mappings(models.Word, [
+                {"id": word_id, "line_index": line_index, "word_index": word_index}
+                for (word_id, _), (line_index, word_index) in zip(words, reading_order)
+            ])
+            if not dry_run and count % 100 == 0:
+                session.commit()
+                logger.info(f"  {count}/{len(page_ids)} pages")
+
+        if page_ids:
+            # Snapshots of these documents still hold the previous word order
+            document_ids = select(models.Page.document_id).where(models.Page.id.in_(page_ids))
+            session.query(models.DocumentSnapshot).filter(
+                models.DocumentSnapshot.document_id.in_(document_ids)
+            ).delete(synchronize_session=False)
+
+        if dry_run:
+            session.rollback()
+        else:
+            session.commit()
+        logger.info("Reading order backfill complete.")
+    finally:
+        session.close()
+
+def learn_lexicon(full=False):
+    """Learn lexicon entries from recurring corrections, incrementally from the last watermark unless full."""
+    from config_manager import get_config
+    from corrections.integration import CorrectionLearner
+
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    try:
+        learner = CorrectionLearner(session, learning_threshold=get_config().get_learning_threshold())
+        updates_made = learner.update_correction_lexicon(incremental=not full)
+        logger.info(f"Lexicon learning complete: {updates_made} entries inserted or updated.")
+    finally:
+        session.close()
+
 def main():
     parser = argparse.ArgumentParser(description="Migrate JSON data to the PostgreSQL database.")
-    parser.add_argument("command", choices=["migrate-json-to-db"], help="The command to execute.")
+    parser.add_argument("command", choices=["migrate-json-to-db", "run-workers", "backfill-reading-order", "learn-lexicon"], help="The command to execute.")
     parser.add_argument("--dry-run", action="store_true", help="Perform a dry run without committing changes.")
     parser.add_argument("--resume", action="store_true", help="Resume a previously interrupted migration.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of OCR worker threads (run-workers).")
+    parser.add_argument("--full", action="store_true", help="Regroup every correction instead of those since the watermark (learn-lexicon).")
     args = parser.parse_args()
 
     if args.command == "migrate-json-to-db":
         migration = Migration(dry_run=args.dry_run, resume=args.resume)
         migration.run()
+    elif args.command == "run-workers":
+        run_workers(args.workers)
+    elif args.command == "backfill-reading-order":
+        backfill_reading_order(dry_run=args.dry_run)
+    elif args.command == "learn-lexicon":
+        learn_lexicon(full=args.full)
 
 if __name__ == "__main__":
     main()
@@ -9,6 +9,7 @@ from pathlib import Path
 from datetime import datetime
 from database.connector import get_db
 from database import models
+from database.versions import CORRECTIONS, bump_version
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -151,7 +152,9 @@ def migrate_corrections():
                 error_count += 1
                 continue
         
-        # Commit all changes
+        # Commit all changes; the version bump makes running servers rebuild their correction index
+        if migrated_count:
+            bump_version(db, CORRECTIONS)
         db.commit()
         logger.info(f"\n=== Migration Summary ===")
         logger.info(f"Total files processed: {len(json_files)}")
@@ -0,0 +1,143 @@
+"""
+Dynamic batching for DocTR inference.
+Collects pages from concurrent documents and runs them through the predictor in a
+single forward pass, then routes each document's pages back to its caller.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _BatchRequest:
+    """Pages submitted by a single caller, resolved with that caller's export dict."""
+    pages: List[np.ndarray]
+    future: Future = field(default_factory=Future)
+
+class BatchingPredictor:
+    """
+    Batching inference server around a DocTR predictor.
+
+    A background thread waits for the first request, then keeps collecting requests
+    until either max_batch_pages pages are gathered or max_wait_ms has elapsed. A
+    request's pages are never split across batches; a request larger than
+    max_batch_pages is run on its own. Up to max_concurrent_batches batches run at
+    once (e.g. one per OCR worker process); while all are busy, new requests keep
+    accumulating into the next batch. Requests cancelled before their batch starts
+    are dropped from it.
+    """
+
+    def __init__(self,
+                 run_batch: Callable[[List[np.ndarray]], Dict],
+                 max_batch_pages: int = 8,
+                 max_wait_ms: float = 50.0,
+                 max_concurrent_batches: int = 1):
+        """
+        Args:
+            run_batch: Runs the predictor on a list of page arrays and returns the export dict
+            max_batch_pages: Maximum number of pages per forward pass
+            max_wait_ms: Maximum time to wait for more requests once one is pending
+            max_concurrent_batches: Number of batches that may be in flight at the same time
+        """
+        self.run_batch = run_batch
+        self.max_batch_pages = max(1, max_batch_pages)
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self._requests: "queue.Queue[_BatchRequest]" = queue.Queue()
+        self._carry_over: Optional[_BatchRequest] = None
+        self._slots = threading.Semaphore(self.max_concurrent_batches)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_batches,
+            thread_name_prefix="doctr-batch"
+        )
+        self._thread = threading.Thread(target=self._serve, name="doctr-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, pages: List[np.ndarray]) -> Future:
+        """Queue pages for recognition; the future resolves to a DocTR export dict."""
+        request = _BatchRequest(pages=list(pages))
+        if not request.pages:
+            request.future.set_result({"pages": []})
+        else:
+            self._requests.put(request)
+        return request.future
+
+    async def predict(self, pages: List[np.ndarray]) -> Dict:
+        """Awaitable variant of submit()."""
+        return await asyncio.wrap_future(self.submit(pages))
+
+    def _collect_batch(self) -> List[_BatchRequest]:
+        """Block until a batch is ready according to the size and wait limits."""
+        if self._carry_over is not None:
+            first, self._carry_over = self._carry_over, None
+        else:
+            first = self._requests.get()
+
+        batch = [first]
+        batch_pages = len(first.pages)
+        deadline = time.monotonic() + self.max_wait
+
+        while batch_pages < self.max_batch_pages:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if batch_pages + len(request.pages) > self.max_batch_pages:
+                # Keep documents whole; this one starts the next batch
+                self._carry_over = request
+                break
+            batch.append(request)
+            batch_pages += len(request.pages)
+
+        return batch
+
+    def _serve(self) -> None:
+        while True:
+            # Wait for a free slot first so requests keep accumulating meanwhile
+            self._slots.acquire()
+            batch = self._collect_batch()
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch: List[_BatchRequest]) -> None:
+        try:
+            # Claim each future so a caller cancelling from now on cannot resolve it under us
+            batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+            if not batch:
+                return
+            all_pages = [page for request in batch for page in request.pages]
+
+            try:
+                start = time.perf_counter()
+                result = self.run_batch(all_pages)
+                elapsed = time.perf_counter() - start
+                logger.info(f"Recognized batch of {len(all_pages)} pages from "
+                            f"{len(batch)} documents in {elapsed:.2f}s")
+            except Exception as e:
+                logger.error(f"Batched OCR inference failed: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                return
+
+            # Route each caller's slice of pages back, renumbered from 0
+            result_pages = result.get("pages", [])
+            offset = 0
+            for request in batch:
+                request_pages = result_pages[offset:offset + len(request.pages)]
+                offset += len(request.pages)
+                for page_idx, page in enumerate(request_pages):
+                    page["page_idx"] = page_idx
+                request.future.set_result({"pages": request_pages})
+        finally:
+            self._slots.release()
@@ -1,15 +1,248 @@
 import os
+import asyncio
 from pathlib import Path
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 from PIL import Image
-from doctr.io import DocumentFile
-from doctr.models import ocr_predictor
 
-# Initialize the OCR predictor once
-# This will download the model weights on the first run
-predictor = ocr_predictor(pretrained=True, detect_orientation=True)
+from config_manager import get_config
+from ocr.batching import BatchingPredictor
+from ocr.process_pool import OCRProcessPool
+
+_batching_config = get_config().get("ocr.batching", {})
+_pool_config = get_config().get("ocr.process_pool", {})
+_backend = get_config().get("ocr.backend", "pytorch")
+_onnx_config = get_config().get("ocr.onnx", {})
+_page_image_config = get_config().get("ocr.page_images", {})
+
+# Same rasterization scale as DocumentFile.from_pdf
+PDF_RENDER_SCALE = 2
+
+def build_predictor(det_bs: int = 2, backend: Optional[str] = None, quantize: Optional[bool] = None):
+    """
+    Build the DocTR OCR predictor (downloads the model weights on the first run).
+    With the "onnx" backend the detection and recognition models run on ONNX Runtime.
+    """
+    # Imported here so that importing this module does not load torch and DocTR
+    import torch
+    from doctr.models import ocr_predictor
+
+    predictor = ocr_predictor(pretrained=True, detect_orientation=True, det_bs=det_bs)
+
+    if (backend or _backend) == "onnx":
+        from ocr.onnx_backend import use_onnx_runtime
+        use_onnx_runtime(
+            predictor,
+            cache_dir=Path(_onnx_config.get("cache_dir", "models/onnx")),
+            quantize=_onnx_config.get("quantize", False) if quantize is None else quantize,
+            intra_op_threads=_onnx_config.get("intra_op_threads", 0) or torch.get_num_threads()
+        )
+    return predictor
+
+def _detection_batch_size() -> int:
+    # When batching is enabled the detection batch size matches the server's batch size,
+    # so pages collected from several documents share one forward pass.
+    if _batching_config.get("enabled", True):
+        return _batching_config.get("max_batch_pages", 8)
+    return 2
+
+# Models are built on first use (or by warm_up), never at import time
+_predictor = None
+_ocr_pool: Optional[OCRProcessPool] = None
+_batching_predictor: Optional[BatchingPredictor] = None
+_image_writer: Optional[ThreadPoolExecutor] = None
+_init_lock = threading.Lock()
+
+def get_predictor():
+    """Get or create the in-process DocTR predictor (used when the process pool is disabled)."""
+    global _predictor
+    if _predictor is None:
+        with _init_lock:
+            if _predictor is None:
+                _predictor = build_predictor(_detection_batch_size())
+    return _predictor
+
+def get_ocr_pool() -> OCRProcessPool:
+    """Get or create the global OCR process pool."""
+    global _ocr_pool
+    with _init_lock:
+        if _ocr_pool is None:
+            _ocr_pool = OCRProcessPool(
+                num_workers=_pool_config.get("workers", 2),
+                torch_threads_per_worker=_pool_config.get("torch_threads_per_worker", 0),
+                det_bs=_detection_batch_size()
+            )
+    return _ocr_pool
+
+def _run_recognition(pages: List[np.ndarray]) -> Dict:
+    """Run the predictor on page arrays, in the process pool when it is enabled."""
+    if _pool_config.get("enabled", True):
+        return get_ocr_pool().run_batch(pages)
+    return get_predictor()(pages).export()
+
+def get_batching_predictor() -> BatchingPredictor:
+    """Get or create the global BatchingPredictor around the DocTR predictor."""
+    global _batching_predictor
+    with _init_lock:
+        if _batching_predictor is None:
+            # One batch in flight per pool worker keeps every worker busy. Each job queue
+            # worker waits on one window at a time, so batches only combine documents when
+            # there are more job queue workers than slots (see benchmark_ocr_batching.py)
+            concurrency = _pool_config.get("workers", 2) if _pool_config.get("enabled", True) else 1
+            _batching_predictor = BatchingPredictor(
+                run_batch=_run_recognition,
+                max_batch_pages=_batching_config.get("max_batch_pages", 8),
+                max_wait_ms=_batching_config.get("max_wait_ms", 50),
+                max_concurrent_batches=concurrency
+            )
+    return _batching_predictor
+
+def get_image_writer() -> ThreadPoolExecutor:
+    """Get or create the thread pool that downscales and encodes page images."""
+    global _image_writer
+    with _init_lock:
+        if _image_writer is None:
+            _image_writer = ThreadPoolExecutor(
+                max_workers=_page_image_config.get("writer_threads", 4),
+                thread_name_prefix="page-images"
+            )
+    return _image_writer
+
+def _page_image_format() -> Tuple[str, Dict]:
+    """File extension and Pillow save options of the configured page image format."""
+    if _page_image_config.get("format", "png").lower() == "webp":
+        return "webp", {
+            "quality": _page_image_config.get("webp_quality", 80),
+            "method": _page_image_config.get("webp_method", 0)
+        }
+    # Level 1 compresses almost as well as the default (6) in a fraction of the time
+    return "png", {"compress_level": _page_image_config.get("png_compress_level", 1)}
+
+def _save_page_image(page_array: np.ndarray, doc_id: str, output_dir: Path, page_idx: int) -> Optional[str]:
+    """Save a downscaled image of one page and return its filename (None if it failed)."""
+    logger = logging.getLogger(__name__)
+    extension, save_options = _page_image_format()
+    try:
+        page_img = Image.fromarray(page_array)
+        max_dim = _page_image_config.get("max_dim", 1024)
+        if max(page_img.width, page_img.height) > max_dim:
+            page_img.thumbnail((max_dim, max_dim))
+
+        image_path = output_dir / f"{doc_id}_page_{page_idx}.{extension}"
+        page_img.save(image_path, **save_options)
+        logger.info(f"Saved page {page_idx + 1} image: {image_path.name}")
+        # Store only the filename, not the full path
+        return image_path.name
+    except Exception as e:
+        logger.error(f"Failed to save page {page_idx + 1} image: {e}")
+        return None
+
+async def _save_page_images(doc: List[np.ndarray], doc_id: str, output_dir: Path, first_page_idx: int = 0) -> Tuple[List[str], float]:
+    """
+    Save every page image in the image writer pool (Pillow releases the GIL while
+    resizing and encoding). Returns the filenames and the elapsed seconds.
+    """
+    loop = asyncio.get_running_loop()
+    writer = get_image_writer()
+    start = time.perf_counter()
+    filenames = await asyncio.gather(*(
+        loop.run_in_executor(writer, _save_page_image, page_array, doc_id, output_dir, page_idx)
+        for page_idx, page_array in enumerate(doc, start=first_page_idx)
+    ))
+    return [filename for filename in filenames if filename], time.perf_counter() - start
+
+def warm_up() -> None:
+    """
+    Load the OCR models ahead of the first document: start the pool workers (each
+    builds its own predictor) or build the in-process predictor.
+    """
+    logger = logging.getLogger(__name__)
+    if _pool_config.get("enabled", True):
+        get_ocr_pool().start()
+    else:
+        get_predictor()
+    logger.info("OCR models warmed up")
+
+def _read_document(file_path: Path):
+    """Rasterize a PDF or load an image into page arrays."""
+    from doctr.io import DocumentFile
+
+    if is_pdf(file_path):
+        return DocumentFile.from_pdf(file_path)
+    return DocumentFile.from_images([file_path])
+
+def is_pdf(file_path: Path) -> bool:
+    return file_path.suffix.lower() in (".pdf",)
+
+def count_pdf_pages(file_path: Path) -> int:
+    """Number of pages of a PDF, without rasterizing it."""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(str(file_path))
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+def render_pdf_pages(file_path: Path, start: int, stop: int) -> List[np.ndarray]:
+    """Rasterize pages [start, stop) of a PDF exactly like DocumentFile.from_pdf does."""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(str(file_path))
+    try:
+        return [
+            pdf[page_idx].render(scale=PDF_RENDER_SCALE, rev_byteorder=True).to_numpy()
+            for page_idx in range(start, min(stop, len(pdf)))
+        ]
+    finally:
+        pdf.close()
+
+def iter_page_windows(file_path: Path, window_pages: int) -> Iterator[Tuple[int, List[np.ndarray]]]:
+    """
+    Yield (first page index, page arrays) for consecutive windows of a document, so only
+    one window of rasterized pages is held in memory at a time.
+    """
+    if not is_pdf(file_path):
+        yield 0, _read_document(file_path)
+        return
+
+    page_count = count_pdf_pages(file_path)
+    for start in range(0, page_count, max(1, window_pages)):
+        yield start, render_pdf_pages(file_path, start, start + window_pages)
+
+async def recognize_pages(pages: List[np.ndarray], doc_id: str, output_dir: Path, first_page_idx: int = 0) -> (dict, list):
+    """
+    Run OCR on already rasterized pages and save their images.
+    The images are written concurrently with recognition, so encoding them only adds
+    to the wall time when it takes longer than recognition itself.
+    """
+    logger = logging.getLogger(__name__)
+    start = time.perf_counter()
+    images = asyncio.ensure_future(_save_page_images(pages, doc_id, output_dir, first_page_idx))
+
+    try:
+        if _batching_config.get("enabled", True):
+            # Share the forward pass with pages from concurrent uploads
+            ocr_dict = await get_batching_predictor().predict(pages)
+        else:
+            ocr_dict = await asyncio.to_thread(_run_recognition, pages)
+        recognition_seconds = time.perf_counter() - start
+    finally:
+        image_paths, image_seconds = await images
+
+    wall_seconds = time.perf_counter() - start
+    logger.info(
+        f"Document {doc_id} pages {first_page_idx + 1}-{first_page_idx + len(pages)}: "
+        f"recognition {recognition_seconds * 1000:.0f} ms, images {image_seconds * 1000:.0f} ms (concurrent), "
+        f"waited for images {max(0.0, wall_seconds - recognition_seconds) * 1000:.0f} ms, wall {wall_seconds * 1000:.0f} ms"
+    )
+    return ocr_dict, image_paths
 
 async def process_document(file_path: Path, doc_id: str, output_dir: Path) -> (dict, list):
     """
@@ -17,36 +250,16 @@ async def process_document(file_path: Path, doc_id: str, output_dir: Path) -> (d
     - Runs OCR.
     - Returns the OCR data as a dictionary.
     - Saves page images and returns their paths.
+
+    Rasterization runs in a thread, page images are encoded in the image writer pool
+    and recognition runs in the OCR process pool, so the event loop is never blocked.
     """
     logger = logging.getLogger(__name__)
-    image_paths = []
 
     try:
-        if file_path.suffix.lower() in (".pdf",):
-            doc = DocumentFile.from_pdf(file_path)
-        else:
-            doc = DocumentFile.from_images([file_path])
+        doc = await asyncio.to_thread(_read_document, file_path)
     except Exception as e:
         logger.error(f"DocTR failed to read the document: {e}")
         raise
 
-    if len(doc) > 0:
-        for page_idx, page_array in enumerate(doc):
-            try:
-                page_img = Image.fromarray(page_array)
-                max_dim = 1024
-                if max(page_img.width, page_img.height) > max_dim:
-                    page_img.thumbnail((max_dim, max_dim))
-                
-                image_path = output_dir / f"{doc_id}_page_{page_idx}.png"
-                page_img.save(image_path)
-                # Store only the filename, not the full path
-                image_paths.append(image_path.name)
-                logger.info(f"Saved page {page_idx + 1} image: {image_path.name}")
-            except Exception as e:
-                logger.error(f"Failed to save page {page_idx + 1} image: {e}")
-
-    result = predictor(doc)
-    ocr_dict = result.export()
-
-    return ocr_dict, image_paths
\ No newline at end of file
+    return await recognize_pages(doc, doc_id, output_dir)
@@ -1,76 +1,150 @@
-import json
+"""
+Word-level application of learned lexicon corrections to DocTR output.
+The lexicon comes from the process-wide versioned snapshot (postprocessing.lexicon_cache),
+so it is reloaded only when the lexicons change. Corrections are applied copy-on-write:
+only the words that change, and the lines, blocks and pages containing them, are copied;
+everything else is shared with the input.
+"""
+
 import logging
-from typing import Dict, List, Tuple
-from database.connector import get_db
-from database import models
+from typing import Dict, List, Mapping, Optional, Tuple
+
 from sqlalchemy.orm import Session
 
+from corrections.correction_index import match_case
+from database.connector import SessionLocal
+from postprocessing.lexicon_cache import LexiconCache, LexiconSnapshot, get_lexicon_cache, normalize_for_comparison
+
 logger = logging.getLogger(__name__)
 
+# (page, block, line, word) indices of a word in the OCR data
+WordPath = Tuple[int, int, int, int]
+
 class LexiconProcessor:
     """Processes OCR output by applying learned lexicon corrections."""
-    
-    def __init__(self, db_session: Session):
-        self.db = db_session
-        self.lexicon_cache = {}
-    
-    def apply_lexicon_corrections(self, ocr_data: Dict, document_type: str = "document") -> Tuple[Dict, List[str]]:
+
+    def __init__(self, lexicon_cache: Optional[LexiconCache] = None):
+        # No session is kept: each call uses the caller's session or opens its own
+        self.lexicon_cache = lexicon_cache or get_lexicon_cache()
+
+    def apply_lexicon_corrections(self, ocr_data: Dict, document_type: str = "document",
+                                  db: Optional[Session] = None) -> Tuple[Dict, List[str]]:
         """
         Apply lexicon corrections to OCR data at word level.
+
+        The returned data shares every unmodified page, block, line and word with
+        ocr_data, so neither should be mutated in place afterwards. When nothing is
+        corrected, ocr_data itself is returned.
         """
         logger.info(f"🔧 Starting lexicon correction application for document type: {document_type}")
-        
+
         try:
-            lexicon = self._load_lexicon(document_type)
-            if not lexicon:
+            snapshot = self._get_snapshot(document_type, db)
+            if not snapshot.lexicon:
                 return ocr_data, []
-            
-            corrected_data = json.loads(json.dumps(ocr_data))
+
+            replacements: Dict[WordPath, Dict] = {}
             applied_corrections = []
-            
-            for page in corrected_data.get("pages", []):
-                for block in page.get("blocks", []):
-                    for line in block.get("lines", []):
-                        for word in line.get("words", []):
+            # Scanned documents repeat the same values; look each one up once
+            seen: Dict[str, Optional[str]] = {}
+
+            for page_idx, page in enumerate(ocr_data.get("pages", [])):
+                for block_idx, block in enumerate(page.get("blocks", [])):
+                    for line_idx, line in enumerate(block.get("lines", [])):
+                        for word_idx, word in enumerate(line.get("words", [])):
                             original_value = word.get("value", "").strip()
                             if not original_value:
                                 continue
-                            
-                            corrected_value = self._find_correction(original_value, lexicon)
-                            
+
+                            if original_value in seen:
+                                corrected_value = seen[original_value]
+                            else:
+                                corrected_value = self._find_correction(original_value, snapshot)
+                                seen[original_value] = corrected_value
+
                             if corrected_value and corrected_value != original_value:
-                                word["original_value"] = original_value
-                                word["value"] = corrected_value
-                                word["auto_corrected"] = True
+                                replacements[(page_idx, block_idx, line_idx, word_idx)] = {
+                                    **word,
+                                    "original_value": original_value,
+                                    "value": corrected_value,
+                                    "auto_corrected": True
+                                }
                                 applied_corrections.append(f"'{original_value}' -> '{corrected_value}'")
-            
-            return corrected_data, applied_corrections
-            
+
+            if not replacements:
+                return ocr_data, []
+            return self._copy_on_write(ocr_data, replacements), applied_corrections
+
         except Exception as e:
             logger.error(f"Error applying lexicon corrections: {e}")
             return ocr_data, []
-    
-    def _load_lexicon(self, document_type: str) -> Dict[str, str]:
-        """Load lexicon data from the database."""
-        if document_type in self.lexicon_cache:
-            return self.lexicon_cache[document_type]
-
-        lexicon_entries = self.db.query(models.Lexicon).filter(
-            (models.Lexicon.document_type == 'global') | (models.Lexicon.document_type == document_type)
-        ).all()
-        
-        lexicon = {entry.misspelled: entry.corrected for entry in lexicon_entries}
-        self.lexicon_cache[document_type] = lexicon
-        return lexicon
-
-    # ... (keep _find_correction, _normalize_for_comparison, _preserve_case)
+
+    def _get_snapshot(self, document_type: str, db: Optional[Session] = None) -> LexiconSnapshot:
+        if db is not None:
+            return self.lexicon_cache.get_snapshot(db, document_type)
+        with SessionLocal() as session:
+            return self.lexicon_cache.get_snapshot(session, document_type)
+
+    def _load_lexicon(self, document_type: str, db: Optional[Session] = None) -> Mapping[str, str]:
+        """Lexicon (misspelled -> corrected) that applies to the document type."""
+        return self._get_snapshot(document_type, db).lexicon
+
+    def _find_correction(self, value: str, snapshot: LexiconSnapshot) -> Optional[str]:
+        """
+        Correction for a whole word value: an exact lexicon match first, then a match
+        ignoring case, then the closest misspelling within edit distance, with the
+        correction cased like the value.
+        """
+        corrected = snapshot.lexicon.get(value)
+        if corrected is not None:
+            return corrected
+
+        corrected = snapshot.normalized.get(self._normalize_for_comparison(value))
+        if corrected is not None:
+            return self._preserve_case(value, corrected)
+        return snapshot.fuzzy_correction(value)
+
+    def _normalize_for_comparison(self, value: str) -> str:
+        return normalize_for_comparison(value)
+
+    def _preserve_case(self, original: str, corrected: str) -> str:
+        return match_case(original, corrected)
+
+    def _copy_on_write(self, ocr_data: Dict, replacements: Dict[WordPath, Dict]) -> Dict:
+        """Copy of ocr_data with the replaced words, copying only the containers on their path."""
+        pages = list(ocr_data["pages"])
+        copied = set()
+        for (page_idx, block_idx, line_idx, word_idx), word in replacements.items():
+            page_key = (page_idx,)
+            if page_key not in copied:
+                pages[page_idx] = {**pages[page_idx], "blocks": list(pages[page_idx]["blocks"])}
+                copied.add(page_key)
+            blocks = pages[page_idx]["blocks"]
+
+            block_key = (page_idx, block_idx)
+            if block_key not in copied:
+                blocks[block_idx] = {**blocks[block_idx], "lines": list(blocks[block_idx]["lines"])}
+                copied.add(block_key)
+            lines = blocks[block_idx]["lines"]
+
+            line_key = (page_idx, block_idx, line_idx)
+            if line_key not in copied:
+                lines[line_idx] = {**lines[line_idx], "words": list(lines[line_idx]["words"])}
+                copied.add(line_key)
+            lines[line_idx]["words"][word_idx] = word
+
+        return {**ocr_data, "pages": pages}
 
 # Global processor instance
 _lexicon_processor = None
 
-def get_lexicon_processor(db: Session):
-    """Get or create global LexiconProcessor instance."""
+def get_lexicon_processor(db: Optional[Session] = None) -> LexiconProcessor:
+    """
+    Get or create global LexiconProcessor instance.
+    The processor holds no session; db is accepted for existing callers and ignored.
+    Pass a session to apply_lexicon_corrections instead.
+    """
     global _lexicon_processor
     if _lexicon_processor is None:
-        _lexicon_processor = LexiconProcessor(db)
+        _lexicon_processor = LexiconProcessor()
     return _lexicon_processor
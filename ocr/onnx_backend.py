@@ -0,0 +1,163 @@
+"""
+ONNX Runtime inference backend for DocTR.
+Exports the detection and recognition models of a DocTR predictor to ONNX (optionally
+with dynamic int8 quantization), caches the files on disk per model version, and swaps
+the PyTorch models inside the predictor for ONNX Runtime sessions. DocTR's own pre- and
+post-processing is kept, so the predictor's export format does not change.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path("models/onnx")
+
+def model_version(predictor) -> str:
+    """Identify the exported weights: DocTR release, architectures and weight URLs."""
+    import doctr
+
+    parts = [f"doctr-{doctr.__version__}"]
+    for model in (predictor.det_predictor.model, predictor.reco_predictor.model):
+        parts.append(model.__class__.__name__.lower())
+        url = (getattr(model, "cfg", None) or {}).get("url")
+        if url:
+            parts.append(hashlib.sha1(url.encode()).hexdigest()[:8])
+    return "_".join(parts)
+
+def _export(model, destination: Path, quantize: bool) -> Path:
+    """Export a DocTR model to ONNX (and quantize it), writing atomically to destination."""
+    import torch
+    from doctr.models.utils import export_model_to_onnx
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    input_shape = model.cfg["input_shape"]
+    dummy_input = torch.rand((1, *input_shape), dtype=torch.float32)
+
+    with tempfile.TemporaryDirectory(dir=destination.parent) as tmp_dir:
+        exported = Path(export_model_to_onnx(model, str(Path(tmp_dir) / destination.stem), dummy_input))
+        # export_model_to_onnx switches the model to its exportable (logits) output
+        model.exportable = False
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantized = Path(tmp_dir) / f"{destination.stem}_int8.onnx"
+            quantize_dynamic(str(exported), str(quantized), weight_type=QuantType.QInt8)
+            exported = quantized
+
+        # Atomic so concurrent pool workers never load a half-written file
+        os.replace(exported, destination)
+
+    logger.info(f"Exported {model.__class__.__name__} to {destination}")
+    return destination
+
+def _create_session(path: Path, intra_op_threads: int):
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if intra_op_threads > 0:
+        options.intra_op_num_threads = intra_op_threads
+    return ort.InferenceSession(str(path), sess_options=options, providers=["CPUExecutionProvider"])
+
+def _build_wrappers():
+    """Define the torch.nn.Module wrappers (torch is only imported when the backend is used)."""
+    import torch
+    from torch import nn
+
+    class _OnnxModel(nn.Module):
+        """Stands in for a DocTR model inside its predictor, running the forward pass with ONNX Runtime."""
+
+        def __init__(self, source, session):
+            super().__init__()
+            # DocTR predictors read the device and dtype from the model's first parameter
+            self.device_anchor = nn.Parameter(torch.zeros(1), requires_grad=False)
+            self.session = session
+            self.input_name = session.get_inputs()[0].name
+            # The source model provides the post-processor and configuration attributes
+            object.__setattr__(self, "_source", source)
+
+        def __getattr__(self, name):
+            try:
+                return super().__getattr__(name)
+            except AttributeError:
+                return getattr(object.__getattribute__(self, "_source"), name)
+
+        def _logits(self, x) -> np.ndarray:
+            return self.session.run(None, {self.input_name: x.detach().cpu().numpy().astype(np.float32)})[0]
+
+    class OnnxDetectionModel(_OnnxModel):
+        def forward(self, x, target=None, return_model_output: bool = False, return_preds: bool = False, **kwargs) -> Dict:
+            prob_map = torch.sigmoid(torch.from_numpy(self._logits(x)))
+            out: Dict = {}
+            if return_model_output:
+                out["out_map"] = prob_map
+            if target is None or return_preds:
+                out["preds"] = [
+                    dict(zip(self._source.class_names, preds))
+                    for preds in self._source.postprocessor(prob_map.permute((0, 2, 3, 1)).numpy())
+                ]
+            return out
+
+    class OnnxRecognitionModel(_OnnxModel):
+        def forward(self, x, target=None, return_model_output: bool = False, return_preds: bool = False, **kwargs) -> Dict:
+            logits = torch.from_numpy(self._logits(x))
+            out: Dict = {}
+            if return_model_output:
+                out["out_map"] = logits
+            if target is None or return_preds:
+                out["preds"] = self._source.postprocessor(logits)
+            return out
+
+    return OnnxDetectionModel, OnnxRecognitionModel
+
+def use_onnx_runtime(
+    predictor,
+    cache_dir: Optional[Path] = None,
+    quantize: bool = False,
+    intra_op_threads: int = 0
+):
+    """
+    Replace the detection and recognition models of a DocTR OCR predictor with
+    ONNX Runtime sessions. Exports are reused from cache_dir/<model version>/.
+
+    Args:
+        predictor: Predictor returned by doctr.models.ocr_predictor
+        cache_dir: Root directory of the ONNX export cache
+        quantize: Use dynamically int8-quantized models
+        intra_op_threads: ONNX Runtime intra-op threads (0 = let ONNX Runtime decide)
+
+    Returns:
+        The same predictor, now running on ONNX Runtime
+    """
+    OnnxDetectionModel, OnnxRecognitionModel = _build_wrappers()
+
+    version_dir = Path(cache_dir or DEFAULT_CACHE_DIR) / model_version(predictor)
+    suffix = "_int8" if quantize else ""
+
+    det_model = predictor.det_predictor.model
+    reco_model = predictor.reco_predictor.model
+
+    det_path = version_dir / f"detection{suffix}.onnx"
+    if not det_path.exists():
+        if det_model.__class__.__name__ == "FAST":
+            # FAST must be reparameterized (branches fused) before export
+            from doctr.models.detection.fast import reparameterize
+            det_model = reparameterize(det_model)
+        _export(det_model, det_path, quantize)
+    reco_path = version_dir / f"recognition{suffix}.onnx"
+    if not reco_path.exists():
+        _export(reco_model, reco_path, quantize)
+
+    predictor.det_predictor.model = OnnxDetectionModel(det_model, _create_session(det_path, intra_op_threads))
+    predictor.reco_predictor.model = OnnxRecognitionModel(reco_model, _create_session(reco_path, intra_op_threads))
+
+    logger.info(f"DocTR predictor running on ONNX Runtime ({'int8' if quantize else 'fp32'}, {version_dir})")
+    return predictor
@@ -0,0 +1,163 @@
+"""
+Process pool for DocTR inference.
+Each worker process loads the predictor once at startup and runs with a fixed share
+of torch intra-op threads. Page arrays are handed to the workers through shared
+memory instead of being pickled; only the small export dict travels back. If a worker
+dies (for example killed for memory on a large window), the broken pool is replaced
+and the batch is retried once in the new one.
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (shape, dtype string, byte offset) of each page inside the shared memory block
+PageLayout = List[Tuple[Tuple[int, ...], str, int]]
+
+# Predictor owned by the current pool worker process
+_worker_predictor = None
+# Barrier shared by all workers of the pool, used once by start()
+_worker_barrier = None
+
+def _init_worker(torch_threads: int, det_bs: int, barrier) -> None:
+    """Pool initializer: pin the torch thread count and load the model once."""
+    global _worker_predictor, _worker_barrier
+    _worker_barrier = barrier
+    import torch
+    from ocr.doctr_ocr import build_predictor
+
+    torch.set_num_threads(torch_threads)
+    _worker_predictor = build_predictor(det_bs=det_bs)
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to a block owned by the parent. Spawned workers share the parent's resource
+    tracker, so the block must not be unregistered here: that would drop the parent's
+    registration, which its unlink() and a cleanup after a crash both rely on.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+def _recognize_shared_pages(shm_name: str, layout: PageLayout) -> Dict:
+    """Worker task: run the predictor on pages read directly from shared memory."""
+    shm = _attach_shared_memory(shm_name)
+    pages = []
+    try:
+        pages = [
+            np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for shape, dtype, offset in layout
+        ]
+        return _worker_predictor(pages).export()
+    finally:
+        # Views into the buffer must be released before the block can be closed
+        del pages
+        try:
+            shm.close()
+        except BufferError:
+            # The frames of a predictor error still reference the pages; raising here
+            # would hide that error. The parent unlinks the block either way.
+            pass
+
+def _wait_for_all_workers() -> None:
+    """
+    Warm-up task: blocks its worker until every worker runs one, so each of the
+    num_workers tasks is held by a different, fully initialized process.
+    """
+    _worker_barrier.wait()
+
+class OCRProcessPool:
+    """Runs DocTR recognition in dedicated worker processes."""
+
+    def __init__(self, num_workers: int = 2, torch_threads_per_worker: int = 0, det_bs: int = 2):
+        """
+        Args:
+            num_workers: Number of worker processes
+            torch_threads_per_worker: Intra-op threads per worker, 0 splits the cores evenly
+            det_bs: Detection batch size of each worker's predictor
+        """
+        self.num_workers = max(1, num_workers)
+        if torch_threads_per_worker <= 0:
+            torch_threads_per_worker = max(1, (os.cpu_count() or 1) // self.num_workers)
+        self.torch_threads_per_worker = torch_threads_per_worker
+        self.det_bs = det_bs
+
+        self._lock = threading.Lock()
+        self._executor = self._create_executor()
+        logger.info(f"OCR process pool: {self.num_workers} workers x "
+                    f"{self.torch_threads_per_worker} torch threads")
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # Spawn, not fork: forking a process that already runs torch threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.torch_threads_per_worker, self.det_bs, context.Barrier(self.num_workers))
+        )
+
+    def _replace_broken_executor(self, broken: ProcessPoolExecutor) -> None:
+        """Replace the executor if it is still the broken one; concurrent callers replace it once."""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = self._create_executor()
+                logger.warning("OCR worker process died, replaced the process pool")
+        broken.shutdown(wait=False)
+
+    def start(self) -> None:
+        """
+        Start all worker processes so the models are loaded before the first document.
+        The executor starts processes on demand and an idle worker may take several
+        submitted tasks, so the warm-up tasks hold their worker until all have arrived.
+        """
+        executor = self._executor
+        futures = [executor.submit(_wait_for_all_workers) for _ in range(self.num_workers)]
+        for future in futures:
+            future.result()
+
+    def run_batch(self, pages: List[np.ndarray]) -> Dict:
+        """
+        Recognize pages in a worker process and return the DocTR export dict.
+        A batch lost to a dead worker, its own or another batch's, is retried once in
+        a new pool; BrokenProcessPool is raised if that worker dies too.
+        """
+        pages = [np.ascontiguousarray(page) for page in pages]
+        total_bytes = sum(page.nbytes for page in pages)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, total_bytes))
+
+        try:
+            layout: PageLayout = []
+            offset = 0
+            for page in pages:
+                target = np.ndarray(page.shape, dtype=page.dtype, buffer=shm.buf, offset=offset)
+                target[...] = page
+                del target
+                layout.append((page.shape, page.dtype.str, offset))
+                offset += page.nbytes
+
+            for attempt in range(2):
+                executor = self._executor
+                try:
+                    return executor.submit(_recognize_shared_pages, shm.name, layout).result()
+                except BrokenProcessPool:
+                    self._replace_broken_executor(executor)
+                    if attempt:
+                        raise
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=True)
@@ -6,6 +6,7 @@ Implements spatial reasoning to find values closest to field labels (e.g., find
 import re
 import json
 import logging
+import math
 from typing import Dict, List, Tuple, Optional, Any
 from pathlib import Path
 import numpy as np
@@ -24,6 +25,129 @@ class AnchorMatch:
     value_bbox: List[float]
     distance: float
 
+# Side of a grid cell of the per-page word index (relative coordinates)
+GRID_CELL_SIZE = 0.05
+
+# Confidence bonus per search direction (some directions are more reliable)
+DIRECTION_BONUS = {
+    "right": 0.2,
+    "below": 0.15,
+    "below_right": 0.1,
+    "above": 0.05
+}
+
+def _geometry_to_bbox(geometry) -> Optional[List[float]]:
+    """
+    [x1, y1, x2, y2] from a word geometry: DocTR's [[x1, y1], [x2, y2]] or the flat
+    [[x1, y1, x2, y2]]. None if it has neither shape.
+    """
+    if not geometry or not isinstance(geometry[0], (list, tuple)):
+        return None
+    if len(geometry) >= 2 and len(geometry[0]) == 2 and len(geometry[1]) == 2:
+        (x1, y1), (x2, y2) = geometry[0], geometry[1]
+        return [x1, y1, x2, y2]
+    if len(geometry[0]) == 4:
+        return list(geometry[0])
+    return None
+
+@dataclass
+class PageArrays:
+    """Column arrays of the words of one page, in list order."""
+    positions: np.ndarray  # (M,) positions in the PositionedWords list
+    boxes: np.ndarray  # (M, 4) [x1, y1, x2, y2]
+    centers: np.ndarray  # (M, 2) [x, y]
+    confidences: np.ndarray  # (M,)
+    text_codes: np.ndarray  # (M,) index of each word's text in texts
+    texts: List[str]  # Distinct texts of the page
+    text_index: Dict[str, int]  # Text -> code
+
+@dataclass
+class ScoredAnchor:
+    """One anchor and search direction, scored against the words near the anchors of its page."""
+    anchor_word: Dict
+    direction: str
+    page: PageArrays
+    selected: np.ndarray  # (M,) candidate in this direction with a matching value
+    distances: np.ndarray  # (M,)
+    confidences: np.ndarray  # (M,)
+
+class PositionedWords(list):
+    """
+    Words with their positions (dicts with text, bbox, page and confidence). Each
+    page's boxes are kept as arrays for vectorized candidate scoring, and a uniform
+    grid over the word centers of each page turns the search around an anchor into a
+    range query over a few cells. The list must not be modified after construction.
+    """
+
+    def __init__(self, words=(), cell_size: float = GRID_CELL_SIZE):
+        super().__init__(words)
+        self.cell_size = cell_size
+        self._grids: Optional[Dict[int, Dict[Tuple[int, int], List[int]]]] = None
+
+        # float64 so distances and thresholds compare exactly like the scalar code
+        boxes = np.asarray([word["bbox"] for word in self], dtype=np.float64).reshape(len(self), -1)[:, :4] \
+            if self else np.empty((0, 4), dtype=np.float64)
+        self.center_array = np.column_stack(((boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2))
+        confidences = np.asarray([word.get("confidence", 0) for word in self], dtype=np.float64)
+        page_numbers = np.asarray([word.get("page", 0) for word in self], dtype=np.int64)
+        self._centers: Optional[List[Tuple[float, float]]] = None
+
+        self.pages: Dict[int, PageArrays] = {}
+        for page in np.unique(page_numbers).tolist():
+            positions = np.flatnonzero(page_numbers == page)
+            text_index: Dict[str, int] = {}
+            text_codes = np.fromiter(
+                (text_index.setdefault(self[position]["text"], len(text_index)) for position in positions.tolist()),
+                dtype=np.int64, count=len(positions)
+            )
+            self.pages[page] = PageArrays(
+                positions=positions,
+                boxes=boxes[positions],
+                centers=self.center_array[positions],
+                confidences=confidences[positions],
+                text_codes=text_codes,
+                texts=list(text_index),
+                text_index=text_index
+            )
+
+    @property
+    def centers(self) -> List[Tuple[float, float]]:
+        """Word centers as (x, y) tuples, for the scalar directional search."""
+        if self._centers is None:
+            self._centers = [tuple(center) for center in self.center_array.tolist()]
+        return self._centers
+
+    @property
+    def grids(self) -> Dict[int, Dict[Tuple[int, int], List[int]]]:
+        """Per-page grid of word positions by cell, built on first use."""
+        if self._grids is None:
+            grids: Dict[int, Dict[Tuple[int, int], List[int]]] = {}
+            for position, (word, center) in enumerate(zip(self, self.centers)):
+                page_grid = grids.setdefault(word.get("page", 0), {})
+                page_grid.setdefault(self._cell(*center), []).append(position)
+            self._grids = grids
+        return self._grids
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def query(self, page: int, x_min: float, x_max: float, y_min: float, y_max: float) -> List[int]:
+        """
+        Positions, in list order, of the words of a page whose center may lie in the
+        given range. Callers apply their exact bounds to the returned words.
+        """
+        grid = self.grids.get(page)
+        if not grid:
+            return []
+        cell_x_min, cell_y_min = self._cell(x_min, y_min)
+        cell_x_max, cell_y_max = self._cell(x_max, y_max)
+        positions = []
+        for cell_x in range(cell_x_min, cell_x_max + 1):
+            for cell_y in range(cell_y_min, cell_y_max + 1):
+                positions.extend(grid.get((cell_x, cell_y), ()))
+        positions.sort()
+        return positions
+
 class AnchorExtractor:
     """
     Extracts field values using spatial anchor-based reasoning.
@@ -104,6 +228,32 @@ class AnchorExtractor:
             "below_right": 0.2, # Combined threshold
             "above": 0.1       # 10% of document height
         }
+
+        # One compiled alternation per field for the anchor patterns and one for the
+        # value patterns (field_anchors must not be changed after construction)
+        self._compiled_patterns: Dict[Tuple[str, Tuple[str, ...]], "re.Pattern"] = {}
+        self.anchor_regexes = {
+            field_name: self._compile_patterns(config["patterns"], field_name)
+            for field_name, config in self.field_anchors.items()
+        }
+        self.value_regexes = {
+            field_name: self._compile_patterns(config["value_patterns"], f"{field_name}_value")
+            for field_name, config in self.field_anchors.items()
+        }
+
+    def _compile_patterns(self, patterns: List[str], group_prefix: str = "pattern") -> "re.Pattern":
+        """
+        Compile patterns into one case-insensitive alternation with a named group per
+        pattern (<prefix>_<index>). It matches a text exactly when one of the patterns
+        would match it with re.search.
+        """
+        key = (group_prefix, tuple(patterns))
+        if key not in self._compiled_patterns:
+            self._compiled_patterns[key] = re.compile(
+                "|".join(f"(?P<{group_prefix}_{index}>{pattern})" for index, pattern in enumerate(patterns)),
+                re.IGNORECASE
+            )
+        return self._compiled_patterns[key]
     
     def extract_anchored_fields(self, ocr_data: Dict, image_size: Tuple[int, int] = (1000, 1000)) -> Dict[str, Any]:
         """
@@ -129,13 +279,15 @@ class AnchorExtractor:
             # Find anchors and extract values
             extracted_fields = {}
             anchor_matches = []
+            anchors_by_field = self._classify_anchor_words(words)
             
             for field_name, field_config in self.field_anchors.items():
-                matches = self._find_anchored_values(words, field_name, field_config)
+                # Use the best match (highest confidence, first one on ties)
+                best_match = self._find_best_anchored_value(
+                    words, field_name, field_config, anchors_by_field.get(field_name, [])
+                )
                 
-                if matches:
-                    # Use the best match (highest confidence)
-                    best_match = max(matches, key=lambda m: m.confidence)
+                if best_match:
                     extracted_fields[field_name] = best_match.value_text
                     extracted_fields[f"{field_name}_confidence"] = best_match.confidence
                     extracted_fields[f"{field_name}_anchor"] = best_match.anchor_text
@@ -159,8 +311,8 @@ class AnchorExtractor:
             logger.error(f"Anchor-based extraction failed: {e}")
             return {}
     
-    def _extract_words_with_positions(self, ocr_data: Dict) -> List[Dict]:
-        """Extract words with their text and bounding box positions."""
+    def _extract_words_with_positions(self, ocr_data: Dict) -> PositionedWords:
+        """Extract words with their text and bounding box positions, indexed per page."""
         words = []
         
         for page_idx, page in enumerate(ocr_data.get("pages", [])):
@@ -168,121 +320,294 @@ class AnchorExtractor:
                 for line in block.get("lines", []):
                     for word in line.get("words", []):
                         text = word.get("value", "").strip()
-                        geometry = word.get("geometry", [[0, 0, 0, 0]])[0]
+                        bbox = _geometry_to_bbox(word.get("geometry", [[0, 0, 0, 0]]))
                         
-                        if text and len(geometry) == 4:
+                        if text and bbox is not None:
                             words.append({
                                 "text": text,
-                                "bbox": geometry,  # [x1, y1, x2, y2] in relative coordinates
+                                "bbox": bbox,  # [x1, y1, x2, y2] in relative coordinates
                                 "page": page_idx,
                                 "confidence": word.get("confidence", 0.0)
                             })
         
-        return words
+        return PositionedWords(words)
     
-    def _find_anchored_values(self, words: List[Dict], field_name: str, field_config: Dict) -> List[AnchorMatch]:
-        """Find values anchored to field labels."""
+    def _find_anchored_values(self, words: List[Dict], field_name: str, field_config: Dict,
+                              anchor_words: Optional[List[Dict]] = None) -> List[AnchorMatch]:
+        """Find values anchored to field labels (anchor_words: the field's anchors, if already known)."""
+        if not isinstance(words, PositionedWords):
+            words = PositionedWords(words)
+
         matches = []
-        
+        for group in self._score_anchor_pairs(words, field_name, field_config, anchor_words):
+            selected = np.flatnonzero(group.selected)
+            # Closest first; stable, so candidates at equal distance keep document order
+            selected = selected[np.argsort(group.distances[selected], kind="stable")]
+            for index, distance, confidence in zip(
+                selected.tolist(), group.distances[selected].tolist(), group.confidences[selected].tolist()
+            ):
+                matches.append(self._anchor_match(words, field_name, group, index, distance, confidence))
+        return matches
+
+    def _find_best_anchored_value(self, words: PositionedWords, field_name: str, field_config: Dict,
+                                  anchor_words: Optional[List[Dict]] = None) -> Optional[AnchorMatch]:
+        """
+        The highest-confidence match of _find_anchored_values (the first one on ties),
+        picked with argmax over the scored pairs without building the other matches.
+        """
+        groups = self._score_anchor_pairs(words, field_name, field_config, anchor_words)
+        best = -np.inf
+        for group in groups:
+            if group.selected.any():
+                best = max(best, float(group.confidences[group.selected].max()))
+        if best == -np.inf:
+            return None
+
+        for group in groups:
+            ties = np.flatnonzero(group.selected & (group.confidences == best))
+            if len(ties):
+                # First in the match order: closest, then earliest in the document
+                index = int(ties[np.argmin(group.distances[ties])])
+                return self._anchor_match(
+                    words, field_name, group, index, float(group.distances[index]), float(group.confidences[index])
+                )
+        return None
+
+    def _anchor_match(self, words: PositionedWords, field_name: str, group: "ScoredAnchor",
+                      index: int, distance: float, confidence: float) -> AnchorMatch:
+        value_word = words[int(group.page.positions[index])]
+        return AnchorMatch(
+            field_name=field_name,
+            anchor_text=group.anchor_word["text"],
+            value_text=value_word["text"],
+            confidence=confidence,
+            anchor_bbox=group.anchor_word["bbox"],
+            value_bbox=value_word["bbox"],
+            distance=distance
+        )
+
+    def _score_anchor_pairs(self, words: PositionedWords, field_name: str, field_config: Dict,
+                            anchor_words: Optional[List[Dict]] = None) -> List["ScoredAnchor"]:
+        """
+        Score the (anchor, word) pairs of a field. For each page, the grid narrows the
+        words to those within the largest search threshold of some anchor; the direction
+        masks, distances and confidences of all its anchors against those words are then
+        computed as (anchors x words) arrays in one pass per search direction.
+
+        Returns:
+            One ScoredAnchor per anchor and search direction, in anchor then direction order
+        """
         # Find anchor words
-        anchor_words = self._find_anchor_words(words, field_config["patterns"])
+        if anchor_words is None:
+            anchor_words = self._find_anchor_words(words, field_config["patterns"])
         
         if not anchor_words:
-            return matches
-            
-        # For each anchor, search for values in specified directions
-        for anchor_word in anchor_words:
+            return []
+
+        value_regex = self._compile_patterns(field_config["value_patterns"], f"{field_name}_value")
+        # Value check results per distinct token text
+        value_matches: Dict[str, bool] = {}
+
+        # Words further than this from an anchor's center are in none of its directions
+        reach = max((self.distance_thresholds.get(direction, 0.2) for direction in field_config["search_directions"]),
+                    default=0.0)
+
+        anchors_by_page: Dict[int, List[int]] = {}
+        for anchor_idx, anchor_word in enumerate(anchor_words):
+            anchors_by_page.setdefault(anchor_word.get("page", 0), []).append(anchor_idx)
+
+        groups_by_anchor: Dict[int, List[ScoredAnchor]] = {}
+        for page_number, anchor_indices in anchors_by_page.items():
+            page = words.pages.get(page_number)
+            if page is None:
+                continue
+            page_anchors = [anchor_words[anchor_idx] for anchor_idx in anchor_indices]
+            page = self._words_near_anchors(words, page_number, page, page_anchors, reach)
+            if not len(page.positions):
+                continue
+
+            for text in page.texts:
+                if text not in value_matches:
+                    value_matches[text] = value_regex.search(text) is not None
+            value_mask = np.fromiter(
+                (value_matches[text] for text in page.texts), dtype=bool, count=len(page.texts)
+            )[page.text_codes]
+
+            # Anchors as column vectors, page words as row vectors
+            anchor_boxes = np.asarray([anchor["bbox"][:4] for anchor in page_anchors], dtype=np.float64)
+            anchor_x = ((anchor_boxes[:, 0] + anchor_boxes[:, 2]) / 2)[:, None]
+            anchor_y = ((anchor_boxes[:, 1] + anchor_boxes[:, 3]) / 2)[:, None]
+            anchor_confidences = np.asarray(
+                [anchor.get("confidence", 0) for anchor in page_anchors], dtype=np.float64
+            )[:, None]
+            anchor_codes = np.asarray(
+                [page.text_index.get(anchor["text"], -1) for anchor in page_anchors], dtype=np.int64
+            )[:, None]
+            centers_x = page.centers[:, 0][None, :]
+            centers_y = page.centers[:, 1][None, :]
+
+            # Same exclusion as comparing the word dicts: the anchor and identical copies of it
+            is_anchor = (
+                (page.boxes[None, :, :] == anchor_boxes[:, None, :]).all(axis=2)
+                & (page.confidences[None, :] == anchor_confidences)
+                & (page.text_codes[None, :] == anchor_codes)
+            )
+            eligible = value_mask[None, :] & ~is_anchor
+
+            distances = np.sqrt((anchor_x - centers_x) ** 2 + (anchor_y - centers_y) ** 2)
+            # Same terms, in the same order, as _calculate_anchor_confidence
+            partial_confidences = (
+                0.5
+                + np.maximum(0, 0.3 - distances)
+                + (anchor_confidences + page.confidences[None, :]) / 2 * 0.2
+            )
+
             for direction in field_config["search_directions"]:
-                candidate_words = self._find_words_in_direction(
-                    words, anchor_word, direction
-                )
-                
-                # Check candidates against value patterns
-                for candidate in candidate_words:
-                    if self._matches_value_patterns(candidate["text"], field_config["value_patterns"]):
-                        distance = self._calculate_distance(anchor_word["bbox"], candidate["bbox"])
-                        confidence = self._calculate_anchor_confidence(
-                            anchor_word, candidate, distance, direction
-                        )
-                        
-                        match = AnchorMatch(
-                            field_name=field_name,
-                            anchor_text=anchor_word["text"],
-                            value_text=candidate["text"],
-                            confidence=confidence,
-                            anchor_bbox=anchor_word["bbox"],
-                            value_bbox=candidate["bbox"],
-                            distance=distance
-                        )
-                        matches.append(match)
-        
-        return matches
+                threshold = self.distance_thresholds.get(direction, 0.2)
+                if direction == "right":
+                    in_direction = ((centers_x > anchor_x) &
+                                    (np.abs(centers_y - anchor_y) < threshold) &
+                                    (centers_x - anchor_x < threshold))
+                elif direction == "below":
+                    in_direction = ((centers_y > anchor_y) &
+                                    (np.abs(centers_x - anchor_x) < threshold) &
+                                    (centers_y - anchor_y < threshold))
+                elif direction == "below_right":
+                    in_direction = (centers_x > anchor_x) & (centers_y > anchor_y) & (distances < threshold)
+                elif direction == "above":
+                    in_direction = ((centers_y < anchor_y) &
+                                    (np.abs(centers_x - anchor_x) < threshold) &
+                                    (anchor_y - centers_y < threshold))
+                else:
+                    continue
+
+                selected = in_direction & eligible
+                confidences = np.minimum(1.0, partial_confidences + DIRECTION_BONUS.get(direction, 0))
+                for row, anchor_idx in enumerate(anchor_indices):
+                    groups_by_anchor.setdefault(anchor_idx, []).append(ScoredAnchor(
+                        anchor_word=anchor_words[anchor_idx],
+                        direction=direction,
+                        page=page,
+                        selected=selected[row],
+                        distances=distances[row],
+                        confidences=confidences[row]
+                    ))
+
+        return [group for anchor_idx in range(len(anchor_words)) for group in groups_by_anchor.get(anchor_idx, [])]
     
+    def _words_near_anchors(self, words: PositionedWords, page_number: int, page: PageArrays,
+                            anchors: List[Dict], reach: float) -> PageArrays:
+        """The words of a page whose center may be within reach of an anchor's center, in list order."""
+        positions = set()
+        for anchor in anchors:
+            bbox = anchor["bbox"]
+            center_x, center_y = (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+            positions.update(words.query(page_number, center_x - reach, center_x + reach,
+                                         center_y - reach, center_y + reach))
+        if len(positions) == len(page.positions):
+            return page
+
+        rows = np.searchsorted(page.positions, np.fromiter(sorted(positions), dtype=np.int64, count=len(positions)))
+        return PageArrays(
+            positions=page.positions[rows],
+            boxes=page.boxes[rows],
+            centers=page.centers[rows],
+            confidences=page.confidences[rows],
+            text_codes=page.text_codes[rows],
+            texts=page.texts,
+            text_index=page.text_index
+        )
+
     def _find_anchor_words(self, words: List[Dict], patterns: List[str]) -> List[Dict]:
         """Find words that match anchor patterns."""
-        anchor_words = []
-        
+        regex = self._compile_patterns(patterns)
+        return [word for word in words if regex.search(word["text"].lower())]
+
+    def _classify_anchor_words(self, words: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Find the anchor words of every field in one pass over the words. A word can
+        anchor several fields; each distinct text is classified once.
+        """
+        anchors_by_field: Dict[str, List[Dict]] = {field_name: [] for field_name in self.anchor_regexes}
+        fields_by_text: Dict[str, Tuple[str, ...]] = {}
+
         for word in words:
             text = word["text"].lower()
-            for pattern in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    anchor_words.append(word)
-                    break  # Don't double-count the same word
-                    
-        return anchor_words
+            fields = fields_by_text.get(text)
+            if fields is None:
+                fields = tuple(
+                    field_name for field_name, regex in self.anchor_regexes.items() if regex.search(text)
+                )
+                fields_by_text[text] = fields
+            for field_name in fields:
+                anchors_by_field[field_name].append(word)
+
+        return anchors_by_field
     
     def _find_words_in_direction(self, words: List[Dict], anchor_word: Dict, direction: str) -> List[Dict]:
-        """Find words in a specific direction from an anchor."""
+        """Find words in a specific direction from an anchor, on the anchor's page."""
+        if not isinstance(words, PositionedWords):
+            words = PositionedWords(words)
+        return [word for word, _ in self._find_candidates_in_direction(words, anchor_word, direction)]
+
+    def _find_candidates_in_direction(self, words: PositionedWords, anchor_word: Dict,
+                                      direction: str) -> List[Tuple[Dict, float]]:
+        """(word, distance) pairs in a direction from an anchor, closest first."""
         anchor_bbox = anchor_word["bbox"]
         anchor_center_x = (anchor_bbox[0] + anchor_bbox[2]) / 2
         anchor_center_y = (anchor_bbox[1] + anchor_bbox[3]) / 2
-        
-        candidates = []
         threshold = self.distance_thresholds.get(direction, 0.2)
-        
-        for word in words:
+
+        # Range of word centers that can satisfy each direction's condition
+        bounds = {
+            "right": (anchor_center_x, anchor_center_x + threshold,
+                      anchor_center_y - threshold, anchor_center_y + threshold),
+            "below": (anchor_center_x - threshold, anchor_center_x + threshold,
+                      anchor_center_y, anchor_center_y + threshold),
+            "below_right": (anchor_center_x, anchor_center_x + threshold,
+                            anchor_center_y, anchor_center_y + threshold),
+            "above": (anchor_center_x - threshold, anchor_center_x + threshold,
+                      anchor_center_y - threshold, anchor_center_y)
+        }.get(direction)
+        if bounds is None:
+            return []
+
+        candidates = []
+        for position in words.query(anchor_word.get("page", 0), *bounds):
+            word = words[position]
             if word == anchor_word:
                 continue
-                
-            word_bbox = word["bbox"]
-            word_center_x = (word_bbox[0] + word_bbox[2]) / 2
-            word_center_y = (word_bbox[1] + word_bbox[3]) / 2
+
+            word_center_x, word_center_y = words.centers[position]
             
             # Check if word is in the specified direction within threshold
             if direction == "right":
-                if (word_center_x > anchor_center_x and 
-                    abs(word_center_y - anchor_center_y) < threshold and
-                    word_center_x - anchor_center_x < threshold):
-                    candidates.append(word)
-                    
+                in_direction = (word_center_x > anchor_center_x and
+                                abs(word_center_y - anchor_center_y) < threshold and
+                                word_center_x - anchor_center_x < threshold)
             elif direction == "below":
-                if (word_center_y > anchor_center_y and
-                    abs(word_center_x - anchor_center_x) < threshold and
-                    word_center_y - anchor_center_y < threshold):
-                    candidates.append(word)
-                    
+                in_direction = (word_center_y > anchor_center_y and
+                                abs(word_center_x - anchor_center_x) < threshold and
+                                word_center_y - anchor_center_y < threshold)
             elif direction == "below_right":
-                if (word_center_x > anchor_center_x and word_center_y > anchor_center_y and
-                    self._calculate_distance(anchor_bbox, word_bbox) < threshold):
-                    candidates.append(word)
-                    
-            elif direction == "above":
-                if (word_center_y < anchor_center_y and
-                    abs(word_center_x - anchor_center_x) < threshold and
-                    anchor_center_y - word_center_y < threshold):
-                    candidates.append(word)
+                in_direction = (word_center_x > anchor_center_x and word_center_y > anchor_center_y and
+                                self._calculate_distance(anchor_bbox, word["bbox"]) < threshold)
+            else:  # above
+                in_direction = (word_center_y < anchor_center_y and
+                                abs(word_center_x - anchor_center_x) < threshold and
+                                anchor_center_y - word_center_y < threshold)
+
+            if in_direction:
+                candidates.append((word, self._calculate_distance(anchor_bbox, word["bbox"])))
         
-        # Sort by distance from anchor
-        candidates.sort(key=lambda w: self._calculate_distance(anchor_bbox, w["bbox"]))
+        # Sort by distance from anchor (stable, so ties keep document order)
+        candidates.sort(key=lambda candidate: candidate[1])
         
         return candidates
     
     def _matches_value_patterns(self, text: str, patterns: List[str]) -> bool:
         """Check if text matches any of the value patterns."""
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        return False
+        return self._compile_patterns(patterns).search(text) is not None
     
     def _calculate_distance(self, bbox1: List[float], bbox2: List[float]) -> float:
         """Calculate normalized distance between two bounding boxes."""
@@ -303,12 +628,7 @@ class AnchorExtractor:
         ocr_confidence_bonus = (anchor_word.get("confidence", 0) + value_word.get("confidence", 0)) / 2 * 0.2
         
         # Direction preference bonus (some directions are more reliable)
-        direction_bonus = {
-            "right": 0.2,
-            "below": 0.15,
-            "below_right": 0.1,
-            "above": 0.05
-        }.get(direction, 0)
+        direction_bonus = DIRECTION_BONUS.get(direction, 0)
         
         total_confidence = base_confidence + distance_bonus + ocr_confidence_bonus + direction_bonus
         return min(1.0, total_confidence)
@@ -0,0 +1,206 @@
+"""
+Process-wide cache of compiled lexicons.
+One immutable snapshot per document type holds the lexicon entries that apply to it
+(its own and the global ones), their LexiconMatcher and, optionally, a SymSpell index
+over their misspellings for edit-distance lookups. Snapshots are rebuilt when the
+'lexicons' version counter moves, which costs one primary-key lookup per call. Entries
+learned by this process derive the next snapshots in memory instead, extending the
+SymSpell index rather than rebuilding it.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config_manager import get_config
+from corrections.correction_index import (CLEAN_CHARS, MAX_EDIT_DISTANCE, MIN_CHARS_PER_EDIT, PREFIX_LENGTH,
+                                          is_edit_candidate, match_case)
+from corrections.symspell import SymSpellIndex
+from database import models
+from database.versions import LEXICONS, get_version
+from postprocessing.lexicon_matcher import LexiconMatcher, fold_case
+
+logger = logging.getLogger(__name__)
+
+def normalize_for_comparison(text: str) -> str:
+    """Key used to match a word against the lexicon regardless of case and surrounding spaces."""
+    return fold_case(text.strip())
+
+def _fuzzy_key(text: str) -> Optional[str]:
+    """Key of a word in the SymSpell index, or None if it may not be matched by edit distance."""
+    key = text.rstrip(CLEAN_CHARS).lower()
+    if not key or not is_edit_candidate(key):
+        return None
+    return key
+
+@dataclass(frozen=True)
+class FuzzyLexicon:
+    """
+    Edit-distance lookups over the misspellings of one snapshot. The SymSpell index is
+    append-only and shared with the snapshots derived from this one; terms added for
+    them are ignored here because they are not in this snapshot's terms.
+    """
+    index: SymSpellIndex
+    terms: Mapping[str, str]  # fuzzy key -> misspelled it was built from
+    min_chars_per_edit: int
+
+    @classmethod
+    def build(cls, misspellings: Iterable[str], max_edit_distance: int = MAX_EDIT_DISTANCE,
+              prefix_length: int = PREFIX_LENGTH, min_chars_per_edit: int = MIN_CHARS_PER_EDIT) -> "FuzzyLexicon":
+        fuzzy = cls(SymSpellIndex(max_edit_distance, max(prefix_length, max_edit_distance + 1)), {}, min_chars_per_edit)
+        fuzzy._add(fuzzy.terms, misspellings)
+        return fuzzy
+
+    def _add(self, terms: Dict[str, str], misspellings: Iterable[str]) -> None:
+        for misspelled in misspellings:
+            key = _fuzzy_key(misspelled)
+            if key is None:
+                continue
+            self.index.add(key)
+            # Misspellings with the same key resolve to the smallest, as in a full build
+            current = terms.get(key)
+            if current is None or misspelled < current:
+                terms[key] = misspelled
+
+    def extended(self, misspellings: Iterable[str]) -> "FuzzyLexicon":
+        """A FuzzyLexicon with the added misspellings, sharing this one's index."""
+        terms = dict(self.terms)
+        self._add(terms, misspellings)
+        return FuzzyLexicon(self.index, terms, self.min_chars_per_edit)
+
+    def lookup(self, value: str) -> Optional[str]:
+        """
+        The misspelling closest to value, or None. A word gets one edit per
+        min_chars_per_edit characters and must pass is_edit_candidate, so amounts,
+        dates, codes and short tokens are never matched.
+        """
+        key = _fuzzy_key(value)
+        if key is None:
+            return None
+        max_distance = min(self.index.max_edit_distance, len(key) // self.min_chars_per_edit)
+        if max_distance <= 0:
+            return None
+
+        best: Optional[str] = None
+        for term, _ in self.index.lookup(key, max_distance):
+            misspelled = self.terms.get(term)
+            if misspelled is not None and (best is None or misspelled < best):
+                best = misspelled
+        return best
+
+@dataclass(frozen=True)
+class LexiconSnapshot:
+    """The lexicon of one document type at one version. Never modified after it is built."""
+    document_type: str
+    version: int
+    lexicon: Mapping[str, str]  # misspelled -> corrected
+    normalized: Mapping[str, str]  # case-folded misspelled -> corrected
+    matcher: LexiconMatcher
+    fuzzy: Optional[FuzzyLexicon] = None  # None when edit-distance matching is disabled
+
+    def fuzzy_correction(self, value: str) -> Optional[str]:
+        """Correction of the closest misspelling within edit distance, cased like value."""
+        if self.fuzzy is None:
+            return None
+        misspelled = self.fuzzy.lookup(value)
+        if misspelled is None:
+            return None
+        return match_case(value.rstrip(CLEAN_CHARS), self.lexicon[misspelled])
+
+def _build_snapshot(document_type: str, version: int, lexicon: Mapping[str, str],
+                    fuzzy: Optional[FuzzyLexicon]) -> LexiconSnapshot:
+    normalized: Dict[str, str] = {}
+    # Sorted, so the case-insensitive keys resolve the same way on every build
+    entries = sorted(lexicon.items())
+    for misspelled, corrected in entries:
+        normalized.setdefault(normalize_for_comparison(misspelled), corrected)
+    return LexiconSnapshot(
+        document_type=document_type,
+        version=version,
+        lexicon=lexicon,
+        normalized=normalized,
+        matcher=LexiconMatcher(entries),
+        fuzzy=fuzzy
+    )
+
+def _new_fuzzy_lexicon(misspellings: Iterable[str]) -> Optional[FuzzyLexicon]:
+    fuzzy_config = get_config().get("corrections.fuzzy", {})
+    if not fuzzy_config.get("lexicon_enabled", True):
+        return None
+    return FuzzyLexicon.build(
+        misspellings,
+        max_edit_distance=fuzzy_config.get("max_edit_distance", MAX_EDIT_DISTANCE),
+        prefix_length=fuzzy_config.get("prefix_length", PREFIX_LENGTH),
+        min_chars_per_edit=fuzzy_config.get("min_chars_per_edit", MIN_CHARS_PER_EDIT)
+    )
+
+class LexiconCache:
+    """Holds a LexiconSnapshot per document type."""
+
+    def __init__(self):
+        self._snapshots: Dict[str, LexiconSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def get_snapshot(self, db: Session, document_type: str) -> LexiconSnapshot:
+        """Return the document type's snapshot, rebuilding it if the lexicons changed."""
+        current_version = get_version(db, LEXICONS)
+        snapshot = self._snapshots.get(document_type)
+        if snapshot is not None and snapshot.version == current_version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshots.get(document_type)
+            if snapshot is None or snapshot.version != current_version:
+                snapshot = self._build(db, document_type, current_version)
+                # Replaced, never mutated: callers holding the old snapshot keep a consistent view
+                self._snapshots[document_type] = snapshot
+            return snapshot
+
+    def _build(self, db: Session, document_type: str, version: int) -> LexiconSnapshot:
+        entries = db.query(
+            models.Lexicon.misspelled,
+            models.Lexicon.corrected
+        ).filter(
+            (models.Lexicon.document_type == 'global') | (models.Lexicon.document_type == document_type)
+        ).all()
+
+        # misspelled is unique, so no two entries compete for a word
+        lexicon = {misspelled: corrected for misspelled, corrected in entries}
+        snapshot = _build_snapshot(document_type, version, lexicon, _new_fuzzy_lexicon(lexicon))
+        logger.info(f"Built lexicon for '{document_type}' from {len(lexicon)} entries (version {version})")
+        return snapshot
+
+    def record_entries(self, entries: Iterable[Tuple[str, str, str]], new_version: int) -> None:
+        """
+        Derive the snapshots of new_version from committed (misspelled, corrected,
+        document_type) entries instead of reloading them. Snapshots that are not at
+        new_version - 1 missed a change made by another process and are rebuilt on
+        their next use.
+        """
+        entries = list(entries)
+        with self._lock:
+            for document_type, snapshot in list(self._snapshots.items()):
+                if snapshot.version != new_version - 1:
+                    continue
+                applicable = [(misspelled, corrected) for misspelled, corrected, entry_type in entries
+                              if entry_type in ('global', document_type)]
+                lexicon = {**snapshot.lexicon, **dict(applicable)}
+                fuzzy = snapshot.fuzzy.extended(misspelled for misspelled, _ in applicable) if snapshot.fuzzy else None
+                self._snapshots[document_type] = _build_snapshot(document_type, new_version, lexicon, fuzzy)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshots = {}
+
+# Global cache instance
+_lexicon_cache = None
+
+def get_lexicon_cache() -> LexiconCache:
+    """Get or create the global lexicon cache."""
+    global _lexicon_cache
+    if _lexicon_cache is None:
+        _lexicon_cache = LexiconCache()
+    return _lexicon_cache
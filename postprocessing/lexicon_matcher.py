@@ -0,0 +1,153 @@
+"""
+Compiled lexicon matcher.
+An Aho-Corasick automaton over the case-folded misspellings of a lexicon finds every
+whole-word occurrence in one linear pass over the text, whatever the lexicon size,
+and replaces them leftmost-longest without rescanning.
+"""
+
+import logging
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def fold_case(text: str) -> str:
+    """
+    Lower-case text one character at a time, keeping characters whose lower-case form
+    is longer than one character, so the folded text has the length (and indices) of
+    the original.
+    """
+    return "".join(char if len(lowered := char.lower()) != 1 else lowered for char in text)
+
+def _is_word_char(char: str) -> bool:
+    # Same definition as \w in Python's re module for str patterns
+    return char.isalnum() or char == "_"
+
+class LexiconMatcher:
+    """Finds and replaces lexicon entries as whole words, case-insensitively."""
+
+    def __init__(self, entries: Iterable[Tuple[str, str]] = ()):
+        """
+        Args:
+            entries: (misspelled, corrected) pairs; when two misspellings fold to the
+                same key, the first one wins
+        """
+        # Trie as parallel lists: transitions, failure links and the entry ending here
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._entry: List[Optional[int]] = [None]
+        # Nearest node on the failure chain (excluding itself) where an entry ends
+        self._output_link: List[int] = [0]
+        self.entries: List[Tuple[str, str]] = []
+
+        for misspelled, corrected in entries:
+            self._add(misspelled, corrected)
+        self._build_links()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _add(self, misspelled: str, corrected: str) -> None:
+        key = fold_case(misspelled)
+        if not key:
+            return
+        node = 0
+        for char in key:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._entry.append(None)
+                self._output_link.append(0)
+            node = next_node
+        if self._entry[node] is None:
+            self._entry[node] = len(self.entries)
+            self.entries.append((misspelled, corrected))
+
+    def _build_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                fail = self._fail[child]
+                self._output_link[child] = fail if self._entry[fail] is not None else self._output_link[fail]
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Whole-word matches as (start, end, entry index), leftmost-longest and
+        non-overlapping. Word boundaries follow the regex \\b: the characters on each
+        side of a boundary differ in being word characters.
+        """
+        if not self.entries or not text:
+            return []
+
+        folded = fold_case(text)
+        length = len(text)
+        # Longest boundary-valid entry starting at each position: (end, entry index)
+        longest: Dict[int, Tuple[int, int]] = {}
+
+        goto, fail, entry, output_link = self._goto, self._fail, self._entry, self._output_link
+        node = 0
+        for position, char in enumerate(folded):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match_node = node if entry[node] is not None else output_link[node]
+            if not match_node:
+                continue
+            end = position + 1
+            after_is_word = end < length and _is_word_char(text[end])
+            # The boundary after the match depends on its last character only
+            if _is_word_char(text[position]) == after_is_word:
+                continue
+            while match_node:
+                entry_index = entry[match_node]
+                start = end - len(self.entries[entry_index][0])
+                before_is_word = start > 0 and _is_word_char(text[start - 1])
+                if _is_word_char(text[start]) != before_is_word:
+                    current = longest.get(start)
+                    if current is None or end > current[0]:
+                        longest[start] = (end, entry_index)
+                match_node = output_link[match_node]
+
+        matches = []
+        covered_until = 0
+        for start in sorted(longest):
+            if start < covered_until:
+                continue
+            end, entry_index = longest[start]
+            matches.append((start, end, entry_index))
+            covered_until = end
+        return matches
+
+    def replace(self, text: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        Replace every match with its correction in one pass.
+
+        Returns:
+            The corrected text and the (misspelled, corrected) entries applied, in
+            order of their first occurrence
+        """
+        matches = self.find(text)
+        if not matches:
+            return text, []
+
+        parts = []
+        applied: Dict[int, None] = {}
+        previous_end = 0
+        for start, end, entry_index in matches:
+            parts.append(text[previous_end:start])
+            parts.append(self.entries[entry_index][1])
+            applied.setdefault(entry_index)
+            previous_end = end
+        parts.append(text[previous_end:])
+        return "".join(parts), [self.entries[entry_index] for entry_index in applied]
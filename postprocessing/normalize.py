@@ -62,34 +62,36 @@ def normalize_text(text: str, document_type: str = "document") -> dict:
 
     return extracted_data
 
-from database.connector import get_db
+from database.connector import SessionLocal, get_db
 from database import models
 from sqlalchemy.orm import Session
+from typing import Optional
+from .lexicon_cache import get_lexicon_cache
 
-def apply_lexicon_corrections(text: str, document_type: str, db: Session) -> tuple:
+def apply_lexicon_corrections(text: str, document_type: str, db: Optional[Session] = None) -> tuple:
     """
     Apply learned lexicon corrections to text before processing, using the database.
+    The lexicon is compiled once per document type and lexicon version, and all
+    entries are replaced (whole words, case-insensitive) in one pass over the text.
+    Without a session, one is opened for the lookup.
     Returns tuple of (corrected_text, corrections_applied)
     """
     corrections_applied = []
     
     try:
-        # Load lexicon from the database
-        lexicon_entries = db.query(models.Lexicon).filter(
-            (models.Lexicon.document_type == 'global') | (models.Lexicon.document_type == document_type)
-        ).all()
-        lexicon = {entry.misspelled: entry.corrected for entry in lexicon_entries}
+        if db is None:
+            with SessionLocal() as session:
+                snapshot = get_lexicon_cache().get_snapshot(session, document_type)
+        else:
+            snapshot = get_lexicon_cache().get_snapshot(db, document_type)
 
-        if not lexicon:
+        if not snapshot.lexicon:
             return text, corrections_applied
 
         # Apply corrections
-        corrected_text = text
-        for original, corrected in lexicon.items():
-            pattern = r'\b' + re.escape(original) + r'\b'
-            if re.search(pattern, corrected_text, flags=re.IGNORECASE):
-                corrected_text = re.sub(pattern, corrected, corrected_text, flags=re.IGNORECASE)
-                corrections_applied.append(f"'{original}' → '{corrected}'")
+        corrected_text, applied = snapshot.matcher.replace(text)
+        for original, corrected in applied:
+            corrections_applied.append(f"'{original}' → '{corrected}'")
         
         return corrected_text, corrections_applied
         
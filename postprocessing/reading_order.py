@@ -0,0 +1,126 @@
+"""
+Reading order of OCR words.
+Groups the words of a page into lines top-to-bottom and orders them left-to-right,
+vectorized with NumPy over the page's coordinate array. The order is computed once at
+ingest and stored as Word.line_index / Word.word_index, so reads are an ordered query.
+"""
+
+import logging
+from itertools import groupby
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Maximum Y difference (normalized 0-1) between a word and the first word of its line
+LINE_Y_TOLERANCE = 0.015
+
+# line_index stored for words without usable geometry; they are never displayed
+UNPLACED_LINE_INDEX = -1
+
+def word_anchor(geometry) -> Optional[Tuple[float, float]]:
+    """
+    Anchor point (y, x) of a word.
+    Geometry can be either [x, y] or [[x1, y1], [x2, y2]]; the anchor of a bounding
+    box is its top-left corner. Returns None when the geometry is unusable.
+    """
+    if not geometry or len(geometry) < 2:
+        return None
+    first = geometry[0]
+    if isinstance(first, (list, tuple)):
+        return first[1], first[0]
+    return geometry[1], geometry[0]
+
+def _line_starts(ys: np.ndarray, y_tolerance: float) -> np.ndarray:
+    """
+    Sorted positions in ys (ascending) where a line starts: the first word, then each
+    first word more than y_tolerance below the start of the line before it.
+    """
+    count = len(ys)
+    positions = np.arange(count)
+    # next_start[i]: the first word more than y_tolerance below word i, where the next
+    # line starts if word i starts one
+    next_start = np.searchsorted(ys, ys + y_tolerance, side="right")
+    # Refined with the exact comparison so the result does not depend on rounding of
+    # ys + y_tolerance; equal ys compare alike, so each step moves over a whole run
+    while True:
+        last = np.maximum(next_start - 1, positions)
+        too_far = (next_start - 1 > positions) & (np.abs(ys[last] - ys) > y_tolerance)
+        first_out = np.minimum(next_start, count - 1)
+        too_short = (next_start < count) & ~(np.abs(ys[first_out] - ys) > y_tolerance)
+        if not too_far.any() and not too_short.any():
+            break
+        next_start = np.where(too_far, np.maximum(np.searchsorted(ys, ys[last], side="left"), positions + 1),
+                              next_start)
+        next_start = np.where(too_short, np.searchsorted(ys, ys[first_out], side="right"), next_start)
+
+    # Follow next_start from the first word by pointer doubling: after each pass starts
+    # holds the first 2^k line starts and jump leads 2^k lines ahead (count ends the page)
+    jump = np.append(next_start, count)
+    starts = np.zeros(1, dtype=np.int64)
+    while starts[-1] < count:
+        starts = np.concatenate((starts, jump[starts]))
+        jump = jump[jump]
+    return starts[starts < count]
+
+def compute_reading_order(geometries: Sequence, y_tolerance: float = LINE_Y_TOLERANCE) -> List[Tuple[int, int]]:
+    """
+    Compute (line_index, word_index) for every word of a page.
+
+    Words are sorted by (y, x) with ties kept in input order, and a new line starts at
+    the first word more than y_tolerance below the first word of the current line.
+    Words without usable geometry get (UNPLACED_LINE_INDEX, 0).
+    """
+    order = [(UNPLACED_LINE_INDEX, 0)] * len(geometries)
+
+    positions = []
+    anchors = []
+    for position, geometry in enumerate(geometries):
+        anchor = word_anchor(geometry)
+        if anchor is not None:
+            positions.append(position)
+            anchors.append(anchor)
+    if not anchors:
+        return order
+
+    coords = np.asarray(anchors, dtype=np.float64)
+    # lexsort is stable: sort by y, then x, equal keys keep their input order
+    sorted_idx = np.lexsort((coords[:, 1], coords[:, 0]))
+    ys = coords[sorted_idx, 0]
+
+    count = len(ys)
+    line_starts = _line_starts(ys, y_tolerance)
+
+    line_ids = np.zeros(count, dtype=np.int64)
+    line_ids[line_starts[1:]] = 1
+    line_ids = np.cumsum(line_ids)
+    word_ids = np.arange(count) - line_starts[line_ids]
+
+    for sorted_position, line_index, word_index in zip(sorted_idx.tolist(), line_ids.tolist(), word_ids.tolist()):
+        order[positions[sorted_position]] = (line_index, word_index)
+    return order
+
+def group_words_into_lines(words: Sequence, y_tolerance: float = LINE_Y_TOLERANCE) -> List[List]:
+    """
+    Group Word rows into lines in reading order.
+
+    Pages ingested with a stored reading order are expected to arrive ordered by
+    (line_index, word_index) and are only split into lines. Older rows without a
+    stored order are ordered here from their geometry.
+    """
+    if not words:
+        return []
+
+    if all(word.line_index is not None for word in words):
+        placed = [word for word in words if word.line_index != UNPLACED_LINE_INDEX]
+        return [list(line) for _, line in groupby(placed, key=lambda word: word.line_index)]
+
+    order = compute_reading_order([word.geometry for word in words], y_tolerance)
+    placed = sorted(
+        (key, position) for position, key in enumerate(order) if key[0] != UNPLACED_LINE_INDEX
+    )
+    return [
+        [words[position] for _, position in line]
+        for _, line in groupby(placed, key=lambda item: item[0][0])
+    ]
@@ -0,0 +1 @@
+# Document processing pipeline package
@@ -0,0 +1,260 @@
+"""
+Persisted corrected-OCR snapshots.
+The review UI shows a document's words with every global correction applied. Building
+that view loads all of the document's words and matches each one against the
+correction index, so the result is stored per document as zlib-compressed JSON,
+tagged with the corrections version it was built from. Reads with
+the current version decode the stored snapshot; stale snapshots are rebuilt on read and,
+ahead of reads, by a background refresher.
+
+Only completed documents are stored: pages of documents still being processed keep
+arriving, so their view is built on every read.
+"""
+
+import json
+import logging
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config_manager import get_config
+from corrections.correction_cache import get_correction_index_cache
+from database.connector import SessionLocal
+from database.document_loader import DocumentLoader
+from database import models
+from database.versions import CORRECTIONS, get_version
+from processing.job_queue import STATUS_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CorrectedDocument:
+    """The corrected OCR data of a document and the corrections version it reflects."""
+    ocr_data: Dict
+    image_paths: List[str]  # Page image URLs
+    page_count: int
+    corrections_version: int
+    etag: Optional[str] = None  # Strong ETag of this data, None while the document can still change
+
+def document_etag(document: models.Document, corrections_version: int) -> Optional[str]:
+    """
+    Strong ETag of a completed document's corrected OCR data: its words only change when
+    it is processed again, the corrections through the version.
+    """
+    if document.status != STATUS_COMPLETED:
+        return None
+    processed = document.processed_at.strftime("%Y%m%d%H%M%S%f") if document.processed_at else "0"
+    return f'"{document.id}-{processed}-{corrections_version}"'
+
+def _encode(corrected: CorrectedDocument) -> bytes:
+    payload = {"ocrData": corrected.ocr_data, "imagePaths": corrected.image_paths, "pageCount": corrected.page_count}
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 1)
+
+def _decode(snapshot: models.DocumentSnapshot, etag: Optional[str]) -> CorrectedDocument:
+    payload = json.loads(zlib.decompress(snapshot.data))
+    return CorrectedDocument(
+        ocr_data=payload["ocrData"],
+        image_paths=payload["imagePaths"],
+        page_count=payload["pageCount"],
+        corrections_version=snapshot.corrections_version,
+        etag=etag
+    )
+
+class DocumentSnapshotStore:
+    """Reads, builds and stores corrected-OCR snapshots."""
+
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def load(self, doc_id) -> Optional[CorrectedDocument]:
+        """
+        Corrected OCR data of a document, from its snapshot if that is current.
+
+        Returns:
+            None if the document does not exist
+        """
+        document = self._get_document(doc_id)
+        if document is None:
+            return None
+        snapshot = self.db.get(models.DocumentSnapshot, document.id)
+        if snapshot is not None and snapshot.corrections_version == get_version(self.db, CORRECTIONS):
+            return _decode(snapshot, document_etag(document, snapshot.corrections_version))
+        return self.refresh(document.id, snapshot)
+
+    def current_etag(self, doc_id) -> Optional[str]:
+        """ETag the document's corrected OCR data has now, without building it."""
+        document = self._get_document(doc_id)
+        if document is None:
+            return None
+        return document_etag(document, get_version(self.db, CORRECTIONS))
+
+    def _get_document(self, doc_id) -> Optional[models.Document]:
+        try:
+            document_id = doc_id if isinstance(doc_id, UUID) else UUID(str(doc_id))
+        except ValueError:
+            return None
+        return self.db.get(models.Document, document_id)
+
+    def refresh(self, document_id: UUID, snapshot: Optional[models.DocumentSnapshot] = None) -> Optional[CorrectedDocument]:
+        """Build a document's corrected OCR data and store it if the document is completed."""
+        return self._refresh(document_id, snapshot)[0]
+
+    def _refresh(self, document_id: UUID,
+                 snapshot: Optional[models.DocumentSnapshot]) -> Tuple[Optional[CorrectedDocument], bool]:
+        """refresh(), also returning whether a snapshot was stored."""
+        loaded = DocumentLoader(self.db).load(document_id)
+        if not loaded:
+            return None, False
+
+        correction_index, corrections_version = get_correction_index_cache().get_versioned_index(self.db)
+        if len(correction_index):
+            correction_index.apply(loaded.ocr_data)
+
+        corrected = CorrectedDocument(
+            ocr_data=loaded.ocr_data,
+            # Handles both old absolute paths and new relative paths
+            image_paths=[f"/data/outputs/{Path(page.image_path).name}" for page in loaded.pages if page.image_path],
+            page_count=len(loaded.pages),
+            corrections_version=corrections_version,
+            etag=document_etag(loaded.document, corrections_version)
+        )
+        if loaded.document.status == STATUS_COMPLETED and loaded.pages:
+            self._save(document_id, corrected, snapshot)
+            return corrected, True
+        if snapshot is not None:
+            # The document is being reprocessed
+            self.db.delete(snapshot)
+            self.db.commit()
+        return corrected, False
+
+    def _save(self, document_id: UUID, corrected: CorrectedDocument,
+              snapshot: Optional[models.DocumentSnapshot]) -> None:
+        if snapshot is None:
+            snapshot = models.DocumentSnapshot(document_id=document_id)
+            self.db.add(snapshot)
+        snapshot.corrections_version = corrected.corrections_version
+        snapshot.data = _encode(corrected)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Another request stored the same document's snapshot first
+            self.db.rollback()
+
+class SnapshotRefresher:
+    """
+    Background thread that rebuilds stale snapshots, and builds missing ones for
+    completed documents, so review UI opens find them current.
+    """
+
+    def __init__(self, interval: float = 30.0, batch_size: int = 20):
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Documents whose refresh failed, skipped until the corrections version changes
+        self._failed: Set[UUID] = set()
+        self._failed_version: Optional[int] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="snapshot-refresher", daemon=True)
+        self._thread.start()
+        logger.info("Started document snapshot refresher")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notify(self) -> None:
+        """Wake the refresher because the corrections changed."""
+        self._wakeup.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            refreshed = self.refresh_batch()
+            # Keep going while there is a backlog, otherwise wait for a change
+            if refreshed < self.batch_size:
+                self._wakeup.wait(self.interval)
+                self._wakeup.clear()
+
+    def refresh_batch(self) -> int:
+        """
+        Refresh up to batch_size stale or missing snapshots. A document whose refresh
+        fails is skipped until the corrections change, so it cannot hold up the others.
+
+        Returns:
+            Number of snapshots stored
+        """
+        db = SessionLocal()
+        try:
+            corrections_version = get_version(db, CORRECTIONS)
+            if corrections_version != self._failed_version:
+                self._failed.clear()
+                self._failed_version = corrections_version
+
+            # Least recently refreshed first
+            stale = db.query(models.DocumentSnapshot).filter(
+                models.DocumentSnapshot.corrections_version != corrections_version,
+                models.DocumentSnapshot.document_id.notin_(self._failed)
+            ).order_by(models.DocumentSnapshot.updated_at).limit(self.batch_size).all()
+
+            missing_ids = []
+            if len(stale) < self.batch_size:
+                # Only documents with stored pages, the others cannot get a snapshot
+                missing_ids = [document_id for (document_id,) in db.query(models.Document.id).outerjoin(
+                    models.DocumentSnapshot, models.DocumentSnapshot.document_id == models.Document.id
+                ).filter(
+                    models.Document.status == STATUS_COMPLETED,
+                    models.DocumentSnapshot.document_id.is_(None),
+                    models.Document.id.notin_(self._failed),
+                    exists().where(models.Page.document_id == models.Document.id)
+                ).order_by(models.Document.created_at.desc()).limit(self.batch_size - len(stale)).all()]
+
+            store = DocumentSnapshotStore(db)
+            work = [(snapshot.document_id, snapshot) for snapshot in stale]
+            work += [(document_id, None) for document_id in missing_ids]
+            stored = 0
+            for document_id, snapshot in work:
+                try:
+                    stored += store._refresh(document_id, snapshot)[1]
+                except Exception as e:
+                    db.rollback()
+                    self._failed.add(document_id)
+                    logger.error(f"Failed to refresh the snapshot of document {document_id}: {e}")
+
+            if stored:
+                logger.info(f"Refreshed {stored} document snapshots (corrections {corrections_version})")
+            return stored
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to refresh document snapshots: {e}")
+            return 0
+        finally:
+            db.close()
+
+# Global refresher instance
+_snapshot_refresher = None
+
+def get_snapshot_refresher() -> SnapshotRefresher:
+    """Get or create the global SnapshotRefresher instance."""
+    global _snapshot_refresher
+    if _snapshot_refresher is None:
+        config = get_config()
+        _snapshot_refresher = SnapshotRefresher(
+            interval=config.get("snapshots.refresh_interval_seconds", 30.0),
+            batch_size=config.get("snapshots.refresh_batch_size", 20)
+        )
+    return _snapshot_refresher
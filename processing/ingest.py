@@ -0,0 +1,137 @@
+"""
+Persistence of OCR results.
+Writes the pages and words produced by DocTR for a document into the database in a
+single transaction, using PostgreSQL COPY for words when available and multi-row
+INSERTs otherwise. Row ids are generated client-side so no round trip is needed to
+learn a page's id before inserting its words.
+"""
+
+import io
+import json
+import logging
+import uuid
+from typing import Dict, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from database import models
+from postprocessing.reading_order import compute_reading_order
+
+logger = logging.getLogger(__name__)
+
+WORD_COLUMNS = ("id", "page_id", "text", "confidence", "geometry", "line_index", "word_index")
+
+def build_ingest_rows(document_id: uuid.UUID, ocr_data: Dict, image_paths: List[str],
+                      first_page_number: int = 0) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Flatten a DocTR export into page and word rows with pre-generated ids and reading order.
+    first_page_number offsets the page numbers when ocr_data holds a window of a larger document.
+    """
+    page_rows = []
+    word_rows = []
+
+    for page_idx, page_data in enumerate(ocr_data.get("pages", [])):
+        page_id = uuid.uuid4()
+        page_rows.append({
+            "id": page_id,
+            "document_id": document_id,
+            "page_number": first_page_number + page_idx,
+            "image_path": image_paths[page_idx],
+            "dimensions": page_data.get('dimensions')
+        })
+
+        page_word_rows = []
+        for block in page_data.get("blocks", []):
+            for line in block.get("lines", []):
+                for word_info in line.get("words", []):
+                    page_word_rows.append({
+                        "id": uuid.uuid4(),
+                        "page_id": page_id,
+                        "text": word_info.get('value'),
+                        "confidence": word_info.get('confidence'),
+                        "geometry": word_info.get('geometry')
+                    })
+
+        reading_order = compute_reading_order([row["geometry"] for row in page_word_rows])
+        for row, (line_index, word_index) in zip(page_word_rows, reading_order):
+            row["line_index"] = line_index
+            row["word_index"] = word_index
+        word_rows.extend(page_word_rows)
+
+    return page_rows, word_rows
+
+def _copy_text_value(value) -> str:
+    """Encode a value for PostgreSQL COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, (list, tuple, dict)):
+        value = json.dumps(value)
+    return (str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r"))
+
+def _copy_words(db: Session, word_rows: List[Dict]) -> bool:
+    """
+    Stream word rows into the words table with COPY on the session's connection.
+
+    Returns:
+        False if the driver does not support COPY, so the caller can fall back
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+
+    dbapi_connection = db.connection().connection
+    cursor = dbapi_connection.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        cursor.close()
+        return False
+
+    buffer = io.StringIO()
+    for row in word_rows:
+        buffer.write("\t".join(_copy_text_value(row[column]) for column in WORD_COLUMNS))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    try:
+        cursor.copy_expert(f"COPY words ({', '.join(WORD_COLUMNS)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+    return True
+
+def insert_rows(db: Session, page_rows: List[Dict], word_rows: List[Dict]) -> None:
+    """Insert prepared page and word rows without committing."""
+    if page_rows:
+        db.execute(insert(models.Page.__table__).values(page_rows))
+
+    if word_rows and not _copy_words(db, word_rows):
+        db.execute(insert(models.Word.__table__), word_rows)
+
+def store_ocr_results(db: Session, document: models.Document, ocr_data: Dict, image_paths: List[str],
+                      first_page_number: int = 0) -> int:
+    """
+    Store the pages and words of a processed document.
+    The rows are written but not committed; the caller commits them together with the
+    document's status change.
+
+    Args:
+        db: Database session
+        document: Document the OCR results belong to
+        ocr_data: DocTR export dictionary
+        image_paths: Page image filenames, one per page
+        first_page_number: Page number of the first page in ocr_data
+
+    Returns:
+        Number of pages stored
+    """
+    page_rows, word_rows = build_ingest_rows(document.id, ocr_data, image_paths, first_page_number)
+    insert_rows(db, page_rows, word_rows)
+    # A corrected-OCR snapshot of earlier results no longer matches the words
+    db.query(models.DocumentSnapshot).filter(
+        models.DocumentSnapshot.document_id == document.id
+    ).delete(synchronize_session=False)
+
+    logger.info(f"Stored {len(page_rows)} pages and {len(word_rows)} words for document {document.id}")
+    return len(page_rows)
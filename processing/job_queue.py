@@ -0,0 +1,288 @@
+"""
+Background job queue for document processing.
+Uploads are recorded as queued documents; a pool of worker threads claims them from
+the database, runs OCR and advances Document.status through
+queued -> processing -> completed/failed. A heartbeat thread refreshes
+Document.heartbeat_at while a worker runs a document; a document left processing past
+the claim timeout, by a worker that crashed or was killed, is claimed again from scratch.
+
+The claimed_at value a worker sets when it claims a document is its fencing token:
+every commit of the worker is conditional on claimed_at still holding that value, so
+a worker whose document was claimed again (for example after a long stall) cannot
+store pages or complete it; it stops at its next commit.
+
+In streaming mode, PDFs are rasterized, recognized and committed a few pages at a time,
+so memory stays bounded and the first pages can be reviewed while the rest is processed.
+"""
+
+import asyncio
+import logging
+import threading
+import traceback
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, update
+
+from config_manager import get_config
+from database.connector import SessionLocal
+from database import models
+from ocr.doctr_ocr import count_pdf_pages, is_pdf, iter_page_windows, process_document, recognize_pages
+from processing.ingest import store_ocr_results
+from processing.ocr_cache import OCRResultCache, get_active_model_version
+
+logger = logging.getLogger(__name__)
+
+# Document.status values used by the job queue
+STATUS_QUEUED = "queued"
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+class ClaimLostError(Exception):
+    """The document was claimed again by another worker."""
+
+class DocumentClaim:
+    """A worker's claim on a document, fenced by the claimed_at value it set."""
+
+    def __init__(self, document_id: UUID, claimed_at: datetime):
+        self.document_id = document_id
+        self.claimed_at = claimed_at
+        self.lost = threading.Event()
+
+    def touch(self, db) -> bool:
+        """Refresh the heartbeat in db's transaction; False if the claim is no longer ours."""
+        result = db.execute(
+            update(models.Document)
+            .where(models.Document.id == self.document_id, models.Document.claimed_at == self.claimed_at)
+            .values(heartbeat_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def commit(self, db) -> None:
+        """Commit db's transaction if the claim is still ours, otherwise roll it back and raise ClaimLostError."""
+        if self.lost.is_set() or not self.touch(db):
+            db.rollback()
+            self.lost.set()
+            raise ClaimLostError(f"Document {self.document_id} was claimed by another worker")
+        db.commit()
+
+class DocumentJobQueue:
+    """
+    Database-backed queue of documents waiting for OCR.
+
+    Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+    workers, in the web process or in separate worker processes, can share the queue.
+    """
+
+    def __init__(self, output_dir: Path, num_workers: int = 2, poll_interval: float = 2.0,
+                 streaming: bool = True, window_pages: int = 4, claim_timeout: float = 1800.0):
+        self.output_dir = Path(output_dir)
+        self.num_workers = max(1, num_workers)
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        # Several heartbeats fit in the timeout, so one slow database round trip is not fatal
+        self.heartbeat_interval = claim_timeout / 4
+        self.streaming = streaming
+        self.window_pages = max(1, window_pages)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        if self._threads:
+            return
+        self._stop.clear()
+        for worker_idx in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                name=f"ocr-worker-{worker_idx}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.num_workers} document processing workers")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker threads after their current job."""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wake idle workers because a new job was queued."""
+        self._wakeup.set()
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            claim = self._claim_next_job()
+            if claim is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self.run_job(claim)
+
+    def _claim_next_job(self) -> Optional[DocumentClaim]:
+        """
+        Atomically move the oldest queued document to 'processing', or take over the
+        oldest one whose claim timed out.
+        """
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            last_seen = func.coalesce(models.Document.heartbeat_at, models.Document.claimed_at)
+            abandoned = (models.Document.status == STATUS_PROCESSING) & or_(
+                # Claimed before claimed_at existed
+                models.Document.claimed_at.is_(None),
+                last_seen < now - timedelta(seconds=self.claim_timeout)
+            )
+            stmt = (
+                select(models.Document)
+                .where((models.Document.status == STATUS_QUEUED) | abandoned)
+                .order_by(models.Document.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            document = db.execute(stmt).scalars().first()
+            if document is None:
+                db.rollback()
+                return None
+
+            if document.status == STATUS_PROCESSING:
+                logger.warning(f"Reclaiming document {document.id}: its worker stopped making progress")
+                # Start over, as after a failure
+                db.query(models.Page).filter(models.Page.document_id == document.id).delete(synchronize_session=False)
+            document.status = STATUS_PROCESSING
+            # A new token: the previous worker's conditional commits stop matching
+            document.claimed_at = now
+            document.heartbeat_at = None
+            db.commit()
+            return DocumentClaim(document.id, now)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to claim queued document: {e}")
+            return None
+        finally:
+            db.close()
+
+    def run_job(self, claim: DocumentClaim) -> None:
+        """Run OCR for a claimed document and store the results while the claim holds."""
+        doc_id = claim.document_id
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(claim, stop_heartbeat),
+                                     name=f"ocr-heartbeat-{doc_id}", daemon=True)
+        heartbeat.start()
+        db = SessionLocal()
+        try:
+            document = db.get(models.Document, doc_id)
+            if document is None:
+                logger.warning(f"Queued document {doc_id} no longer exists")
+                return
+
+            try:
+                model_version = get_active_model_version(db)
+                file_path = Path(document.storage_path)
+                logger.info(f"Processing document: {document.storage_path}")
+
+                if self.streaming:
+                    self._process_streaming(db, document, file_path, claim)
+                else:
+                    ocr_data, image_paths = asyncio.run(
+                        process_document(file_path, str(doc_id), self.output_dir)
+                    )
+                    document.page_count = store_ocr_results(db, document, ocr_data, image_paths)
+                logger.info(f"OCR processing completed for document: {doc_id}")
+
+                document.processed_at = datetime.utcnow()
+                document.status = STATUS_COMPLETED
+                claim.commit(db)
+            except ClaimLostError:
+                logger.warning(f"Stopped processing document {doc_id}: it was claimed by another worker")
+            except Exception as e:
+                error_details = traceback.format_exc()
+                logger.error(f"Failed to process document: {doc_id}")
+                logger.error(f"Error: {e}")
+                logger.error(f"Traceback:\n{error_details}")
+                db.rollback()
+                # Drop pages committed by earlier windows so a retry starts clean
+                db.query(models.Page).filter(models.Page.document_id == doc_id).delete(synchronize_session=False)
+                document.status = STATUS_FAILED
+                document.processing_error = error_details
+                try:
+                    claim.commit(db)
+                except ClaimLostError:
+                    logger.warning(f"Document {doc_id} was claimed by another worker, not marking it failed")
+            else:
+                # The document is already committed as completed: caching is best effort
+                if document.content_hash:
+                    try:
+                        OCRResultCache(db).store(document.content_hash, model_version, document.id)
+                    except Exception as e:
+                        db.rollback()
+                        logger.warning(f"Failed to cache the OCR results of document {doc_id}: {e}")
+        finally:
+            stop_heartbeat.set()
+            db.close()
+
+    def _heartbeat(self, claim: DocumentClaim, stop: threading.Event) -> None:
+        """Refresh the claim's heartbeat until stopped or until the claim is lost."""
+        while not stop.wait(self.heartbeat_interval):
+            db = SessionLocal()
+            try:
+                if not claim.touch(db):
+                    db.rollback()
+                    claim.lost.set()
+                    return
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Failed to refresh the claim on document {claim.document_id}: {e}")
+            finally:
+                db.close()
+
+    def _process_streaming(self, db, document: models.Document, file_path: Path, claim: DocumentClaim) -> None:
+        """Rasterize, recognize and commit the document one page window at a time."""
+        if is_pdf(file_path):
+            document.page_count = count_pdf_pages(file_path)
+            claim.commit(db)
+
+        pages_stored = 0
+        for first_page_idx, pages in iter_page_windows(file_path, self.window_pages):
+            if claim.lost.is_set():
+                raise ClaimLostError(f"Document {document.id} was claimed by another worker")
+            ocr_data, image_paths = asyncio.run(
+                recognize_pages(pages, str(document.id), self.output_dir, first_page_idx)
+            )
+            # Release the rasterized window before the next one is rendered
+            del pages
+            pages_stored += store_ocr_results(db, document, ocr_data, image_paths, first_page_idx)
+            claim.commit(db)
+            logger.info(f"Document {document.id}: {pages_stored}/{document.page_count or pages_stored} pages stored")
+
+        document.page_count = pages_stored
+
+# Global job queue instance
+_job_queue: Optional[DocumentJobQueue] = None
+
+def get_job_queue(output_dir: Optional[Path] = None) -> DocumentJobQueue:
+    """Get or create the global DocumentJobQueue instance."""
+    global _job_queue
+    if _job_queue is None:
+        config = get_config()
+        if output_dir is None:
+            output_dir = Path(__file__).resolve().parent.parent / "data" / "outputs"
+        _job_queue = DocumentJobQueue(
+            output_dir=output_dir,
+            num_workers=config.get("job_queue.workers", 4),
+            poll_interval=config.get("job_queue.poll_interval_seconds", 2.0),
+            streaming=config.get("ocr.streaming.enabled", True),
+            window_pages=config.get("ocr.streaming.window_pages", 4),
+            claim_timeout=config.get("job_queue.claim_timeout_seconds", 1800.0)
+        )
+    return _job_queue
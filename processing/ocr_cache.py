@@ -0,0 +1,145 @@
+"""
+Content-hash cache of OCR results.
+Duplicate uploads (email re-sends, retries after a failure) reuse the pages and words
+of a document already recognized from the same bytes with the same model, run on the
+same inference backend: ONNX Runtime and int8 quantization change the recognized text.
+"""
+
+import hashlib
+import logging
+import uuid
+from typing import BinaryIO, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config_manager import get_config
+from database import models
+from processing.ingest import insert_rows
+
+logger = logging.getLogger(__name__)
+
+# Model version used when no fine-tuned model has been deployed
+PRETRAINED_MODEL_VERSION = "doctr-pretrained"
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def save_and_hash(source: BinaryIO, destination: BinaryIO, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """Copy an upload to disk while computing its SHA-256 in the same pass."""
+    hasher = hashlib.sha256()
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        destination.write(chunk)
+    return hasher.hexdigest()
+
+def get_inference_backend() -> str:
+    """Configured inference backend of the OCR predictor: "pytorch", "onnx" or "onnx-int8"."""
+    config = get_config()
+    backend = config.get("ocr.backend", "pytorch")
+    if backend == "onnx" and config.get("ocr.onnx.quantize", False):
+        return "onnx-int8"
+    return backend
+
+def model_version_for(model_name: str) -> str:
+    """Cache model version of a model run on the configured inference backend."""
+    return f"{model_name}@{get_inference_backend()}"
+
+def get_active_model_version(db: Session) -> str:
+    """Identify the OCR model and inference backend currently used for recognition."""
+    active_model = db.query(models.DeployedModel.model_name).filter(
+        models.DeployedModel.is_active == True
+    ).first()
+    return model_version_for(active_model[0] if active_model else PRETRAINED_MODEL_VERSION)
+
+class OCRResultCache:
+    """Persistent OCR results cache keyed by (content hash, model version)."""
+
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def lookup(self, content_hash: str, model_version: str) -> Optional[models.Document]:
+        """Return the completed document holding OCR results for these bytes, if any."""
+        return self.db.query(models.Document).join(
+            models.OCRCacheEntry, models.OCRCacheEntry.document_id == models.Document.id
+        ).filter(
+            models.OCRCacheEntry.content_hash == content_hash,
+            models.OCRCacheEntry.model_version == model_version,
+            models.Document.status == 'completed'
+        ).first()
+
+    def store(self, content_hash: str, model_version: str, document_id: uuid.UUID) -> None:
+        """Record a freshly processed document as the cache entry for its content."""
+        self.db.add(models.OCRCacheEntry(
+            content_hash=content_hash,
+            model_version=model_version,
+            document_id=document_id
+        ))
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # A duplicate upload finished first and its entry serves the same results
+            self.db.rollback()
+
+    def clone_results(self, source: models.Document, target: models.Document) -> Tuple[int, int]:
+        """
+        Copy the pages and words of a cached document to a new document.
+        Page images are immutable, so the copies point to the same image files.
+
+        Returns:
+            Number of pages and words copied
+        """
+        # The target document row must exist before its pages reference it
+        self.db.flush()
+
+        page_rows = []
+        page_id_map = {}
+        for page in source.pages:
+            new_page_id = uuid.uuid4()
+            page_id_map[page.id] = new_page_id
+            page_rows.append({
+                "id": new_page_id,
+                "document_id": target.id,
+                "page_number": page.page_number,
+                "image_path": page.image_path,
+                "dimensions": page.dimensions
+            })
+
+        if not page_rows:
+            return 0, 0
+
+        source_words = self.db.query(
+            models.Word.page_id, models.Word.text, models.Word.confidence, models.Word.geometry,
+            models.Word.line_index, models.Word.word_index
+        ).filter(models.Word.page_id.in_(list(page_id_map.keys()))).all()
+
+        word_rows = [
+            {
+                "id": uuid.uuid4(),
+                "page_id": page_id_map[page_id],
+                "text": text,
+                "confidence": confidence,
+                "geometry": geometry,
+                "line_index": line_index,
+                "word_index": word_index
+            }
+            for page_id, text, confidence, geometry, line_index, word_index in source_words
+        ]
+
+        insert_rows(self.db, page_rows, word_rows)
+
+        logger.info(f"Cloned {len(page_rows)} pages and {len(word_rows)} words "
+                    f"from cached document {source.id} to {target.id}")
+        return len(page_rows), len(word_rows)
+
+    def evict_stale(self, model_version: str) -> int:
+        """Drop cache entries produced by any model or backend other than the active one."""
+        evicted = self.db.query(models.OCRCacheEntry).filter(
+            models.OCRCacheEntry.model_version != model_version
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        if evicted:
+            logger.info(f"Evicted {evicted} OCR cache entries after switching to model {model_version}")
+        return evicted
@@ -35,14 +35,40 @@ document.addEventListener('DOMContentLoaded', () => {
     let startLeftWidth = 0;
     let currentPageIndex = 0;
     let pageScrollPositions = {}; // Store scroll positions for each page
+    let correctionsVersion = null; // Corrections version the displayed data reflects
 
     // --- History for Undo/Redo ---
     let history = [];
     let historyIndex = -1;
 
+    // --- Wait for background OCR processing ---
+    async function waitForProcessing() {
+        // Uploads return immediately; poll the job until the worker has finished OCR
+        while (true) {
+            const response = await fetch(`/api/jobs/${docId}`);
+            if (!response.ok) {
+                return; // Unknown job (e.g. legacy document) - try loading directly
+            }
+            const job = await response.json();
+            if (job.status === 'failed') {
+                throw new Error(job.error || 'Document processing failed');
+            }
+            if (job.status !== 'queued' && job.status !== 'processing') {
+                return job;
+            }
+            if (job.status === 'processing' && job.pages_processed > 0) {
+                return job; // Pages are committed as they are recognized: review the first ones now
+            }
+            pagesContainer.innerHTML = `<p>Processing document (${job.status})... ${job.pages_processed} page(s) ready</p>`;
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+
     // --- Initialize Application ---
     async function initializeApp() {
         try {
+            const job = await waitForProcessing();
+
             console.log("Loading document data...");
             
             // Load OCR data and raw OCR data in parallel
@@ -64,6 +90,7 @@ document.addEventListener('DOMContentLoaded', () => {
             }
 
             ocrData = ocrResult.ocrData;
+            correctionsVersion = ocrResult.correctionsVersion;
             console.log("OCR data loaded:", ocrData);
 
             // Load raw OCR data if available
@@ -87,11 +114,53 @@ document.addEventListener('DOMContentLoaded', () => {
             initializeResizer();
             populatePagesList();
 
+            if (job && job.status === 'processing') {
+                watchStreamingPages(ocrResult.imageUrl);
+            }
+
         } catch (error) {
             console.error('Error initializing app:', error);
             pagesContainer.innerHTML = `<p style="color: red;">Failed to load document data: ${error.message}</p>`;
         }
     }
+    // --- Streamed documents: append pages as the worker commits them ---
+    async function watchStreamingPages(baseImageUrl) {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 2000));
+            const response = await fetch(`/api/jobs/${docId}`);
+            if (!response.ok) return;
+            const job = await response.json();
+            if (job.status === 'failed') {
+                saveStatus.textContent = `Processing failed: ${job.error || 'unknown error'}`;
+                return;
+            }
+
+            if (job.pages_processed > ocrData.pages.length) {
+                const [dataResponse, rawResponse] = await Promise.all([
+                    fetch(`/data/document/${docId}`),
+                    fetch(`/raw_ocr/${docId}`)
+                ]);
+                if (dataResponse.ok) {
+                    const result = await dataResponse.json();
+                    for (let pageIndex = ocrData.pages.length; pageIndex < result.ocrData.pages.length; pageIndex++) {
+                        ocrData.pages.push(result.ocrData.pages[pageIndex]);
+                        await createPageViewer(pageIndex, baseImageUrl);
+                    }
+                    if (rawResponse.ok) {
+                        rawOcrData = await rawResponse.json();
+                    }
+                    populatePagesList();
+                    displayRawText();
+                    updateTextStats();
+                    updatePageIndicator();
+                    console.log(`Streaming: ${ocrData.pages.length}/${job.page_count || '?'} pages loaded`);
+                }
+            }
+
+            if (job.status !== 'processing') return;
+        }
+    }
+
     // --- Panel Resizer ---
     function initializeResizer() {
         if (!resizer || !leftPanel || !rightPanel) return;
@@ -247,8 +316,9 @@ document.addEventListener('DOMContentLoaded', () => {
 
         // Load page image - try specific page first, fallback to page 0
         const pageImage = new Image();
-        const specificImageUrl = baseImageUrl.replace('_page_0.png', `_page_${pageIndex}.png`);
-        const fallbackImageUrl = baseImageUrl; // Always _page_0.png
+        // Page images share the extension of page 0 (.png or .webp, see ocr.page_images)
+        const specificImageUrl = baseImageUrl.replace(/_page_0\.(\w+)$/, `_page_${pageIndex}.$1`);
+        const fallbackImageUrl = baseImageUrl; // Always page 0
         
         return new Promise((resolve, reject) => {
             const tryLoadImage = (imageUrl, isFallback = false) => {
@@ -831,7 +901,10 @@ document.addEventListener('DOMContentLoaded', () => {
             const data = await correctionResponse.json();
             console.log('Correction save response:', data);
             
-            // Then update OCR data
+            // Then fetch the words this correction changed elsewhere in the document
+            if (data.corrections_version !== undefined && correctionsVersion !== null) {
+                ocrUpdateData.append('base_version', correctionsVersion);
+            }
             const ocrUpdateResponse = await fetch(`/update_ocr_data/${docId}`, { method: 'POST', body: ocrUpdateData });
             console.log(`OCR update response status: ${ocrUpdateResponse.status}`);
             
@@ -839,6 +912,7 @@ document.addEventListener('DOMContentLoaded', () => {
             if (ocrUpdateResponse.ok) {
                 ocrUpdateResult = await ocrUpdateResponse.json();
                 console.log('OCR update response:', ocrUpdateResult);
+                applyOcrUpdate(ocrUpdateResult);
             } else {
                 console.warn('OCR update failed but continuing...');
             }
@@ -891,6 +965,46 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    // --- Apply /update_ocr_data responses ---
+    function applyOcrUpdate(result) {
+        if (!result || result.status !== 'success') return;
+
+        let changedWords = result.words;
+        if (result.mode === 'full') {
+            // Version gap (another save happened in between): take every word from the full data
+            changedWords = [];
+            result.ocrData.pages.forEach(page => {
+                page.blocks.forEach(block => {
+                    block.lines.forEach(line => {
+                        line.words.forEach(word => changedWords.push(word));
+                    });
+                });
+            });
+        }
+        correctionsVersion = result.version;
+
+        const wordsById = new Map();
+        pages.forEach(page => page.words.forEach(word => {
+            if (word.word_id) wordsById.set(word.word_id, word);
+        }));
+
+        let updated = 0;
+        changedWords.forEach(change => {
+            const word = wordsById.get(change.word_id);
+            if (!word || word.manually_corrected) return;
+            if (word.value !== change.value) updated++;
+            word.value = change.value;
+            if (change.corrected) {
+                word.corrected = true;
+                word.original_value = change.original_value;
+                word.correction_method = change.correction_method;
+            }
+        });
+
+        console.log(`Applied ${result.mode} OCR update: ${updated} words changed (version ${correctionsVersion})`);
+        if (updated > 0) redrawAllPages();
+    }
+
     // --- Undo/Redo Logic ---
     function addToHistory(action) {
         // Clear redo history
@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Imports of the app and its database stay inside the fixtures: test modules that do not
+# use them must still collect without those dependencies
+
+@pytest.fixture
+def Session(monkeypatch):
+    """
+    Session factory for one in-memory database with the version counters seeded. The
+    snapshot refresher's sessions and, through the client fixture, the app's requests
+    all share it.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from corrections.correction_cache import get_correction_index_cache
+    from database import models
+    from database.versions import CORRECTIONS, LEXICONS
+    from processing import document_snapshots
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([models.CacheVersion(name=CORRECTIONS, version=0), models.CacheVersion(name=LEXICONS, version=0)])
+        db.commit()
+
+    monkeypatch.setattr(document_snapshots, "SessionLocal", Session)
+    get_correction_index_cache().invalidate()
+    yield Session
+    get_correction_index_cache().invalidate()
+
+@pytest.fixture
+def db(Session):
+    """A session on the Session fixture's database."""
+    with Session() as db:
+        yield db
+
+@pytest.fixture
+def client(Session):
+    from fastapi.testclient import TestClient
+
+    from database.connector import get_db
+    from main import app
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Not used as a context manager: the startup events (OCR warm-up, refresher) do not run
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+@pytest.fixture
+def add_document():
+    """
+    Returns add_document(db, status, words, pages, **columns): adds a document with the
+    given number of pages, the first holding words, and returns its id. columns set other
+    Document fields.
+    """
+    from database import models
+
+    def add_document(db, status="completed", words=("Totai", "100.00"), pages=1, **columns):
+        document = models.Document(filename="invoice.pdf", status=status, page_count=pages, **columns)
+        db.add(document)
+        db.flush()
+        for page_number in range(pages):
+            page = models.Page(document_id=document.id, page_number=page_number,
+                               image_path=f"data/outputs/x_page_{page_number}.png")
+            db.add(page)
+            db.flush()
+            if page_number == 0:
+                for index, text in enumerate(words):
+                    db.add(models.Word(page_id=page.id, text=text, confidence=0.9,
+                                       geometry=[[0.1, 0.1], [0.2, 0.2]], line_index=0, word_index=index))
+        db.commit()
+        return document.id
+
+    return add_document
@@ -0,0 +1,189 @@
+import json
+import os
+import random
+import re
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from postprocessing.anchors import AnchorExtractor, AnchorMatch, PositionedWords
+
+DIRECTIONS = ["right", "below", "below_right", "above"]
+
+# Trimmed stored DocTR outputs, with the flat [[x1, y1, x2, y2]] word geometry the extractor
+# reads, and the results of the scalar extractor (before the grid, the compiled patterns
+# and the vectorized scoring) on each of them. Its candidates were restricted to the
+# anchor's page, the one intended change, before capturing the results.
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "anchors"
+EXPECTED = json.loads((FIXTURES_DIR / "expected.json").read_text())
+
+def make_words(rng, count, pages=3):
+    words = []
+    for _ in range(count):
+        x, y = rng.random(), rng.random()
+        width, height = rng.uniform(0.01, 0.1), rng.uniform(0.005, 0.03)
+        words.append({
+            "text": rng.choice(["Total", "Date", "INV-001", "12/05/2024", "ACME Corp", "to"]),
+            "bbox": [x, y, min(1.0, x + width), min(1.0, y + height)],
+            "page": rng.randrange(pages),
+            "confidence": rng.random()
+        })
+    return words
+
+def scan_in_direction(extractor, words, anchor_word, direction):
+    """Reference: check every word of the anchor's page, as the extractor did before the grid."""
+    def center(bbox):
+        return (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+
+    anchor_x, anchor_y = center(anchor_word["bbox"])
+    threshold = extractor.distance_thresholds[direction]
+    candidates = []
+    for word in words:
+        if word == anchor_word or word["page"] != anchor_word["page"]:
+            continue
+        x, y = center(word["bbox"])
+        distance = np.sqrt((x - anchor_x) ** 2 + (y - anchor_y) ** 2)
+        if direction == "right":
+            selected = x > anchor_x and abs(y - anchor_y) < threshold and x - anchor_x < threshold
+        elif direction == "below":
+            selected = y > anchor_y and abs(x - anchor_x) < threshold and y - anchor_y < threshold
+        elif direction == "below_right":
+            selected = x > anchor_x and y > anchor_y and distance < threshold
+        else:
+            selected = y < anchor_y and abs(x - anchor_x) < threshold and anchor_y - y < threshold
+        if selected:
+            candidates.append((word, distance))
+    candidates.sort(key=lambda candidate: candidate[1])
+    return [word for word, _ in candidates]
+
+@pytest.mark.parametrize("seed", range(10))
+def test_grid_search_matches_full_scan(seed):
+    rng = random.Random(seed)
+    extractor = AnchorExtractor()
+    words = PositionedWords(make_words(rng, 600))
+
+    for anchor_word in rng.sample(list(words), 25):
+        for direction in DIRECTIONS:
+            expected = scan_in_direction(extractor, words, anchor_word, direction)
+            assert extractor._find_words_in_direction(words, anchor_word, direction) == expected
+
+def test_candidates_stay_on_the_anchor_page():
+    extractor = AnchorExtractor()
+    anchor = {"text": "Total", "bbox": [0.1, 0.5, 0.2, 0.52], "page": 0, "confidence": 0.9}
+    same_page = {"text": "100.00", "bbox": [0.25, 0.5, 0.3, 0.52], "page": 0, "confidence": 0.9}
+    other_page = {"text": "999.00", "bbox": [0.22, 0.5, 0.27, 0.52], "page": 1, "confidence": 0.9}
+    words = PositionedWords([anchor, other_page, same_page])
+
+    assert extractor._find_words_in_direction(words, anchor, "right") == [same_page]
+
+def score_per_candidate(extractor, words, field_name, field_config):
+    """Reference: match every pattern with re.search and score the candidates one pair at a time."""
+    def search(patterns, text):
+        return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+
+    matches = []
+    for anchor_word in words:
+        if not search(field_config["patterns"], anchor_word["text"].lower()):
+            continue
+        for direction in field_config["search_directions"]:
+            for candidate in scan_in_direction(extractor, words, anchor_word, direction):
+                if not search(field_config["value_patterns"], candidate["text"]):
+                    continue
+                distance = extractor._calculate_distance(anchor_word["bbox"], candidate["bbox"])
+                matches.append(AnchorMatch(
+                    field_name=field_name,
+                    anchor_text=anchor_word["text"],
+                    value_text=candidate["text"],
+                    confidence=extractor._calculate_anchor_confidence(anchor_word, candidate, distance, direction),
+                    anchor_bbox=anchor_word["bbox"],
+                    value_bbox=candidate["bbox"],
+                    distance=distance
+                ))
+    return matches
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scoring_near_anchors_matches_per_candidate_scoring(seed):
+    """Scoring only the words the grid finds near the anchors must not lose matches."""
+    rng = random.Random(seed)
+    words = PositionedWords(make_words(rng, 400))
+    extractor = AnchorExtractor()
+
+    def rounded(match):
+        # The vectorized distances can differ from math.sqrt in the last bit
+        if match is None:
+            return None
+        return replace(match, distance=round(match.distance, 12), confidence=round(match.confidence, 12))
+
+    for field_name, field_config in extractor.field_anchors.items():
+        expected = score_per_candidate(extractor, words, field_name, field_config)
+        assert [rounded(match) for match in extractor._find_anchored_values(words, field_name, field_config)] == \
+            [rounded(match) for match in expected]
+        # The first of the highest confidence matches wins
+        assert rounded(extractor._find_best_anchored_value(words, field_name, field_config)) == \
+            rounded(max(expected, key=lambda match: match.confidence) if expected else None)
+
+def test_words_are_read_from_nested_and_flat_geometry():
+    extractor = AnchorExtractor()
+    ocr_data = {"pages": [{"blocks": [{"lines": [{"words": [
+        {"value": "Total", "confidence": 0.9, "geometry": [[0.1, 0.5], [0.2, 0.52]]},
+        {"value": "100.00", "confidence": 0.8, "geometry": [[0.25, 0.5, 0.3, 0.52]]},
+        {"value": "broken", "confidence": 0.8, "geometry": [[0.25, 0.5, 0.3]]},
+    ]}]}]}]}
+
+    words = extractor._extract_words_with_positions(ocr_data)
+
+    assert [(word["text"], word["bbox"]) for word in words] == [
+        ("Total", [0.1, 0.5, 0.2, 0.52]),
+        ("100.00", [0.25, 0.5, 0.3, 0.52]),
+    ]
+    assert extractor.extract_anchored_fields(ocr_data)["amount"] == "100.00"
+
+def as_doctr_geometry(ocr_data):
+    """Copy of ocr_data with [[x1, y1, x2, y2]] word geometry rewritten as DocTR's [[x1, y1], [x2, y2]]."""
+    ocr_data = json.loads(json.dumps(ocr_data))
+    for page in ocr_data["pages"]:
+        for block in page["blocks"]:
+            for line in block["lines"]:
+                for word in line["words"]:
+                    x1, y1, x2, y2 = word["geometry"][0]
+                    word["geometry"] = [[x1, y1], [x2, y2]]
+    return ocr_data
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_doctr_geometry_gives_the_flat_geometry_results(name):
+    ocr_data = json.loads((FIXTURES_DIR / f"{name}.json").read_text())
+    extractor = AnchorExtractor()
+
+    assert extractor.extract_anchored_fields(as_doctr_geometry(ocr_data)) == extractor.extract_anchored_fields(ocr_data)
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_fixture_documents_match_the_baseline_extractor(name):
+    """
+    Pattern matching, grid search and scoring must give the AnchorMatch results and
+    fields the scalar extractor gave on the same documents.
+    """
+    ocr_data = json.loads((FIXTURES_DIR / f"{name}.json").read_text())
+    expected = EXPECTED[name]
+    extractor = AnchorExtractor()
+
+    words = extractor._extract_words_with_positions(ocr_data)
+    anchors_by_field = extractor._classify_anchor_words(words)
+    for field_name, config in extractor.field_anchors.items():
+        matches = extractor._find_anchored_values(words, field_name, config, anchors_by_field[field_name])
+        expected_matches = expected["matches"][field_name]
+        assert [(match.anchor_text, match.value_text) for match in matches] == \
+            [(anchor_text, value_text) for anchor_text, value_text, _, _ in expected_matches], field_name
+        # The vectorized distances can differ from math.sqrt in the last bit
+        assert [(match.confidence, match.distance) for match in matches] == \
+            pytest.approx([(confidence, distance) for _, _, confidence, distance in expected_matches], abs=1e-12)
+
+    fields = extractor.extract_anchored_fields(ocr_data)
+    assert fields.keys() == expected["fields"].keys()
+    for key, value in expected["fields"].items():
+        assert fields[key] == (pytest.approx(value, abs=1e-12) if isinstance(value, float) else value), key
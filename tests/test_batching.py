@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+np = pytest.importorskip("numpy")
+from ocr.batching import BatchingPredictor
+
+def page(value):
+    return np.full((1, 1, 3), value, dtype=np.uint8)
+
+def test_cancelled_caller_does_not_stall_the_rest_of_its_batch():
+    started, release = threading.Event(), threading.Event()
+    batches = []
+
+    def run_batch(pages):
+        batches.append([int(p[0, 0, 0]) for p in pages])
+        started.set()
+        release.wait(5)
+        return {"pages": [{"value": int(p[0, 0, 0])} for p in pages]}
+
+    predictor = BatchingPredictor(run_batch, max_batch_pages=8, max_wait_ms=200)
+
+    async def scenario():
+        busy = predictor.submit([page(0)])
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        # Both requests wait for the busy slot and are collected into the same batch
+        cancelled = asyncio.ensure_future(predictor.predict([page(1)]))
+        kept = asyncio.ensure_future(predictor.predict([page(2)]))
+        await asyncio.sleep(0.05)
+        cancelled.cancel()
+        release.set()
+        result = await asyncio.wait_for(kept, 5)
+        busy.result(5)
+        return result
+
+    assert asyncio.run(scenario()) == {"pages": [{"value": 2, "page_idx": 0}]}
+    assert batches == [[0], [2]]
+
+def test_running_batch_ignores_late_cancellation():
+    started, release = threading.Event(), threading.Event()
+
+    def run_batch(pages):
+        started.set()
+        release.wait(5)
+        return {"pages": [{} for _ in pages]}
+
+    predictor = BatchingPredictor(run_batch, max_batch_pages=8, max_wait_ms=0)
+    first, second = predictor.submit([page(1)]), predictor.submit([page(2)])
+    assert started.wait(5)
+
+    assert not first.cancel()
+    release.set()
+    assert first.result(5) == {"pages": [{"page_idx": 0}]}
+    assert second.result(5) == {"pages": [{"page_idx": 0}]}
@@ -0,0 +1,85 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from corrections.correction_cache import CorrectionIndexCache
+from database import models
+from database.versions import CORRECTIONS, bump_version
+
+@pytest.fixture(autouse=True)
+def document(Session, add_document):
+    # Each session on the shared database stands for a different process
+    with Session() as db:
+        return add_document(db)
+
+def save_correction(db, original, corrected, minutes=0):
+    """Commit a correction as /save_correction does, returning it and the new version."""
+    document = db.query(models.Document).first()
+    correction = models.Correction(document_id=document.id, original_text=original, corrected_text=corrected,
+                                   timestamp=datetime(2025, 1, 1) + timedelta(minutes=minutes))
+    db.add(correction)
+    version = bump_version(db, CORRECTIONS)
+    db.commit()
+    return correction, version
+
+def test_save_in_this_process_extends_the_index(Session):
+    cache = CorrectionIndexCache()
+    with Session() as db:
+        assert cache.get_versioned_index(db)[1] == 0
+        index = cache.get_index(db)
+
+        correction, version = save_correction(db, "Totai", "Total")
+        cache.record(correction, version)
+
+        assert cache.get_versioned_index(db) == (index, 1)
+        assert index.match("Totai").value == "Total"
+
+def test_version_bumped_by_another_process_rebuilds_the_index(Session):
+    web, other_process = CorrectionIndexCache(), Session()
+    with Session() as db:
+        save_correction(db, "Totai", "Total")
+        first, version = web.get_versioned_index(db)
+        assert version == 1
+
+        # Saved elsewhere: this process never sees record() for it
+        save_correction(other_process, "Arnount", "Amount", minutes=1)
+
+        rebuilt, version = web.get_versioned_index(db)
+        assert version == 2
+        assert rebuilt is not first
+        assert rebuilt.match("Arnount").value == "Amount"
+        assert rebuilt.match("Totai").value == "Total"
+        assert first.match("Arnount") is None
+    other_process.close()
+
+def test_local_save_after_a_remote_one_leaves_the_index_stale(Session):
+    web, other_process = CorrectionIndexCache(), Session()
+    with Session() as db:
+        first = web.get_index(db)
+        save_correction(other_process, "Arnount", "Amount")
+        correction, version = save_correction(db, "Totai", "Total", minutes=1)
+
+        # Version 2 is not one past the cached 0, so the save is not applied in place
+        web.record(correction, version)
+        assert first.match("Totai") is None
+
+        rebuilt, version = web.get_versioned_index(db)
+        assert version == 2
+        assert rebuilt.match("Totai").value == "Total"
+        assert rebuilt.match("Arnount").value == "Amount"
+    other_process.close()
+
+def test_stale_index_is_served_while_another_thread_rebuilds(Session):
+    cache = CorrectionIndexCache()
+    with Session() as db:
+        stale = cache.get_index(db)
+        save_correction(db, "Totai", "Total")
+
+        with cache._build_lock:
+            assert cache.get_versioned_index(db) == (stale, 0)
+        assert cache.get_versioned_index(db)[1] == 1
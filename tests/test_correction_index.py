@@ -0,0 +1,108 @@
+import copy
+import os
+import random
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from corrections.correction_index import CorrectionIndex
+from benchmark_correction_engine import legacy_apply_corrections, make_corrections, make_document
+
+@pytest.mark.parametrize("seed", range(40))
+def test_index_matches_legacy_engine(seed):
+    """The compiled index must produce exactly the output of the previous loop."""
+    rng = random.Random(seed)
+    corrections = make_corrections(rng.randint(1, 150), rng, alphabet="ABab", max_len=5)
+    document = make_document(400, corrections, rng, alphabet="ABab", max_len=5)
+
+    expected = legacy_apply_corrections(copy.deepcopy(document), corrections)
+    actual = copy.deepcopy(document)
+    CorrectionIndex(corrections).apply(actual)
+
+    assert actual == expected
+
+def test_newest_correction_wins_across_strategies():
+    corrections = [
+        SimpleNamespace(original_text="ZAIDI", corrected_text="OLD", timestamp=datetime(2025, 1, 1)),
+        SimpleNamespace(original_text="ZAIDI*", corrected_text="NEW", timestamp=datetime(2025, 1, 2)),
+    ]
+    index = CorrectionIndex(corrections)
+
+    match = index.match("ZAIDI")
+    assert (match.value, match.method) == ("NEW", "fuzzy")
+
+    match = index.match("ZAIDI<NO")
+    assert (match.value, match.method) == ("NEW<NO", "prefix")
+
+@pytest.mark.parametrize("seed", range(20))
+def test_symspell_lookup_matches_brute_force(seed):
+    from corrections.symspell import SymSpellIndex, edit_distance
+
+    rng = random.Random(seed)
+    terms = {"".join(rng.choice("abc<") for _ in range(rng.randint(1, 12))) for _ in range(200)}
+    index = SymSpellIndex(max_edit_distance=2, prefix_length=rng.choice([3, 7]))
+    for term in terms:
+        index.add(term)
+
+    for _ in range(50):
+        word = "".join(rng.choice("abc<") for _ in range(rng.randint(1, 12)))
+        max_distance = rng.randint(0, 2)
+        distances = {term: edit_distance(word, term, max_distance) for term in terms}
+        within = {term: distance for term, distance in distances.items() if distance is not None}
+        expected = []
+        if within:
+            closest = min(within.values())
+            expected = sorted((term, distance) for term, distance in within.items() if distance == closest)
+        assert sorted(index.lookup(word, max_distance)) == expected
+
+def test_edit_distance_is_a_fallback():
+    corrections = [
+        SimpleNamespace(original_text="TOTAI", corrected_text="TOTAL", timestamp=datetime(2025, 1, 1)),
+        SimpleNamespace(original_text="AMOUNT DUE", corrected_text="Amount due", timestamp=datetime(2025, 1, 2)),
+    ]
+    index = CorrectionIndex(corrections, max_edit_distance=2)
+
+    assert index.match("TOTAI").method == "exact"
+    assert (index.match("TOTAJ").value, index.match("TOTAJ").method) == ("TOTAL", "edit_distance")
+    # Ten characters allow two edits, four allow one, three none
+    assert index.match("AMOUNT DVF").value == "AMOUNT DUE"
+    assert index.match("TOT") is None
+    assert CorrectionIndex(corrections).match("TOTAJ") is None
+
+def test_edit_distance_keeps_the_casing_of_the_word():
+    corrections = [SimpleNamespace(original_text="recieved", corrected_text="received", timestamp=datetime(2025, 1, 1))]
+    index = CorrectionIndex(corrections, max_edit_distance=2)
+
+    assert index.match("recieve").value == "received"
+    assert index.match("RECIEVE").value == "RECEIVED"
+    assert index.match("Recieve").value == "Received"
+
+def test_edit_distance_skips_numbers_and_punctuation():
+    corrections = [
+        SimpleNamespace(original_text="1000.00", corrected_text="1,000.00", timestamp=datetime(2025, 1, 1)),
+        SimpleNamespace(original_text="2023-01-16", corrected_text="2023-01-16", timestamp=datetime(2025, 1, 1)),
+        SimpleNamespace(original_text="--//--", corrected_text="", timestamp=datetime(2025, 1, 1)),
+        SimpleNamespace(original_text="TOTAL", corrected_text="Total", timestamp=datetime(2025, 1, 1)),
+    ]
+    index = CorrectionIndex(corrections, max_edit_distance=2)
+
+    assert index.match("1000.50") is None
+    assert index.match("2024-01-15") is None
+    assert index.match("--//-.") is None
+    assert index.match("T0TAL") is None
+    assert index.match("TOTAI").value == "TOTAL"
+
+def test_newest_correction_wins_among_closest_terms():
+    corrections = [
+        SimpleNamespace(original_text="INVOICE", corrected_text="OLD", timestamp=datetime(2025, 1, 1)),
+        SimpleNamespace(original_text="INVOICF", corrected_text="NEW", timestamp=datetime(2025, 1, 2)),
+    ]
+    index = CorrectionIndex(corrections, max_edit_distance=2)
+
+    assert index.match("INVOICX").value == "NEW"
+    assert index.match("lNVOICE").value == "OLD"
@@ -0,0 +1,72 @@
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import models
+from database.versions import LEXICONS, get_version
+from corrections.integration import CorrectionLearner
+from postprocessing.lexicon_cache import LexiconCache
+
+START = datetime(2025, 1, 1)
+
+def add_corrections(db, pairs, minutes):
+    for original, corrected in pairs:
+        db.add(models.Correction(document_id=uuid.uuid4(), original_text=original, corrected_text=corrected,
+                                 timestamp=START + timedelta(minutes=minutes)))
+    db.commit()
+
+def lexicon(db):
+    return {(entry.misspelled, entry.corrected, entry.frequency) for entry in db.query(models.Lexicon)}
+
+def test_upsert_learns_most_frequent_correction_with_its_count(db):
+    db.add(models.Lexicon(misspelled="Totai", corrected="Tota1", document_type="invoice", frequency=1))
+    db.commit()
+    add_corrections(db, [("Totai", "Total")] * 3 + [("Totai", "Tota1")] * 2 + [("Dte", "Date")] * 2 + [("x", "y")], 0)
+
+    assert CorrectionLearner(db, learning_threshold=2).update_correction_lexicon() == 2
+    assert lexicon(db) == {("Totai", "Total", 3), ("Dte", "Date", 2)}
+    assert db.query(models.Lexicon.document_type).filter(models.Lexicon.misspelled == "Totai").scalar() == "invoice"
+    assert get_version(db, LEXICONS) == 1
+
+    # Nothing changed: no rows written, no version bump
+    assert CorrectionLearner(db, learning_threshold=2).update_correction_lexicon() == 0
+    assert get_version(db, LEXICONS) == 1
+
+def test_incremental_runs_match_a_full_run(db):
+    learner = CorrectionLearner(db, learning_threshold=3)
+    learner.watermark_overlap = timedelta(0)
+    add_corrections(db, [("Invoce", "Invoice")] * 2 + [("Amuont", "Amount")] * 3, 0)
+    assert learner.update_correction_lexicon(incremental=True) == 1
+
+    # The third 'Invoce' correction reaches the threshold together with the two older ones
+    add_corrections(db, [("Invoce", "Invoice"), ("Amuont", "Amount")], 10)
+    assert learner.update_correction_lexicon(incremental=True) == 2
+    incremental = lexicon(db)
+
+    assert incremental == {("Invoce", "Invoice", 3), ("Amuont", "Amount", 4)}
+    assert learner.update_correction_lexicon() == 0
+    assert lexicon(db) == incremental
+
+def test_learned_entries_extend_the_cached_snapshots(db, monkeypatch):
+    cache = LexiconCache()
+    monkeypatch.setattr("corrections.integration.get_lexicon_cache", lambda: cache)
+    db.add(models.Lexicon(misspelled="Totai", corrected="Total", document_type="invoice", frequency=1))
+    db.commit()
+    invoice = cache.get_snapshot(db, "invoice")
+    cache.get_snapshot(db, "receipt")
+
+    add_corrections(db, [("Amuont", "Amount")], 0)
+    assert CorrectionLearner(db, learning_threshold=1).update_correction_lexicon() == 1
+
+    derived = cache._snapshots["invoice"]
+    assert derived.version == 1 and derived.lexicon == {"Totai": "Total", "Amuont": "Amount"}
+    # The SymSpell index is extended, not rebuilt, and older snapshots keep their own terms
+    assert derived.fuzzy.index is invoice.fuzzy.index
+    assert derived.fuzzy_correction("AMUONTS") == "AMOUNT"
+    assert invoice.fuzzy_correction("AMUONTS") is None
+    assert cache._snapshots["receipt"].lexicon == {"Amuont": "Amount"}
+    assert cache.get_snapshot(db, "invoice") is derived
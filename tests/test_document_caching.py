@@ -0,0 +1,63 @@
+import pytest
+
+ENDPOINTS = ["/data/document/{}", "/raw_ocr/{}"]
+
+@pytest.fixture
+def completed(Session, add_document):
+    with Session() as db:
+        return str(add_document(db, words=("Totai",)))
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_matching_etag_gets_304(client, completed, endpoint):
+    url = endpoint.format(completed)
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    revalidated = client.get(url, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.content == b""
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+@pytest.mark.parametrize("header", ["W/{etag}", '"other", {etag}', '"other",W/{etag} ', "*"])
+def test_if_none_match_forms(client, completed, endpoint, header):
+    url = endpoint.format(completed)
+    etag = client.get(url).headers["ETag"]
+
+    assert client.get(url, headers={"If-None-Match": header.format(etag=etag)}).status_code == 304
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_other_etags_get_the_data(client, completed, endpoint):
+    url = endpoint.format(completed)
+    etag = client.get(url).headers["ETag"]
+
+    response = client.get(url, headers={"If-None-Match": f'"other", W/"{etag}x"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_new_correction_changes_the_etag(client, completed, endpoint):
+    url = endpoint.format(completed)
+    etag = client.get(url).headers["ETag"]
+    client.post("/save_correction", data={
+        "doc_id": completed, "word_id": "p0_w0", "original_text": "Totai", "corrected_text": "Total"
+    })
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "Total" in response.text
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+@pytest.mark.parametrize("header", [None, "*"])
+def test_documents_in_progress_have_no_etag(Session, add_document, client, endpoint, header):
+    with Session() as db:
+        doc_id = add_document(db, status="processing")
+
+    response = client.get(endpoint.format(doc_id), headers={"If-None-Match": header} if header else {})
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert "no-store" in response.headers["Cache-Control"]
@@ -0,0 +1,114 @@
+import uuid
+from datetime import datetime
+
+from database import models
+from database.versions import CORRECTIONS, bump_version
+from processing import document_snapshots
+from processing.document_snapshots import DocumentSnapshotStore, SnapshotRefresher
+
+def add_correction(db, original, corrected, document_id):
+    db.add(models.Correction(document_id=document_id, original_text=original, corrected_text=corrected,
+                             timestamp=datetime.now()))
+    bump_version(db, CORRECTIONS)
+    db.commit()
+
+def values(corrected):
+    return [word["value"] for line in corrected.ocr_data["pages"][0]["blocks"][0]["lines"] for word in line["words"]]
+
+def test_snapshot_is_stored_and_served_until_corrections_change(Session, add_document):
+    with Session() as db:
+        document_id = add_document(db)
+        first = DocumentSnapshotStore(db).load(str(document_id))
+        assert values(first) == ["Totai", "100.00"]
+        assert first.image_paths == ["/data/outputs/x_page_0.png"]
+        stored = db.get(models.DocumentSnapshot, document_id)
+        assert stored.corrections_version == 0
+
+        add_correction(db, "Totai", "Total", document_id)
+        second = DocumentSnapshotStore(db).load(document_id)
+        assert values(second) == ["Total", "100.00"]
+        assert second.corrections_version == 1
+        assert db.get(models.DocumentSnapshot, document_id).corrections_version == 1
+
+def test_documents_in_progress_are_not_stored(Session, add_document):
+    with Session() as db:
+        document_id = add_document(db, status="processing")
+        assert values(DocumentSnapshotStore(db).load(document_id)) == ["Totai", "100.00"]
+        assert db.get(models.DocumentSnapshot, document_id) is None
+        assert DocumentSnapshotStore(db).load(uuid.uuid4()) is None
+        assert DocumentSnapshotStore(db).load("not-a-uuid") is None
+
+def test_refresher_rebuilds_stale_and_missing_snapshots(Session, add_document):
+    with Session() as db:
+        stale_id = add_document(db)
+        DocumentSnapshotStore(db).load(stale_id)
+        missing_id = add_document(db, words=("Totai",))
+        add_correction(db, "Totai", "Total", stale_id)
+
+    refresher = SnapshotRefresher(batch_size=10)
+    assert refresher.refresh_batch() == 2
+    assert refresher.refresh_batch() == 0
+
+    with Session() as db:
+        for document_id in (stale_id, missing_id):
+            assert db.get(models.DocumentSnapshot, document_id).corrections_version == 1
+        assert values(DocumentSnapshotStore(db).load(missing_id)) == ["Total"]
+
+def test_etag_follows_the_versions_of_the_data(Session, add_document):
+    with Session() as db:
+        document_id = add_document(db)
+        store = DocumentSnapshotStore(db)
+        etag = store.current_etag(document_id)
+        assert etag is not None and store.load(document_id).etag == etag
+        # Served from the stored snapshot
+        assert store.load(document_id).etag == etag
+
+        add_correction(db, "Totai", "Total", document_id)
+        assert store.current_etag(document_id) != etag
+        assert store.load(document_id).etag == store.current_etag(document_id)
+
+        in_progress_id = add_document(db, status="processing")
+        assert store.current_etag(in_progress_id) is None
+        assert store.load(in_progress_id).etag is None
+
+def test_refresher_counts_only_stored_snapshots(Session):
+    with Session() as db:
+        # Completed with pages recorded but none stored, so it cannot get a snapshot
+        db.add(models.Document(filename="empty.pdf", status="completed", page_count=2))
+        db.commit()
+
+    refresher = SnapshotRefresher(batch_size=10)
+    assert refresher.refresh_batch() == 0
+    with Session() as db:
+        assert db.query(models.DocumentSnapshot).count() == 0
+
+def test_refresher_skips_documents_that_fail(Session, add_document, monkeypatch):
+    with Session() as db:
+        failing_id = add_document(db)
+        other_id = add_document(db)
+        store = DocumentSnapshotStore(db)
+        store.load(failing_id)
+        store.load(other_id)
+        add_correction(db, "Totai", "Total", other_id)
+
+    load = document_snapshots.DocumentLoader.load
+    def failing_load(self, document_id):
+        if document_id == failing_id:
+            raise RuntimeError("corrupt page data")
+        return load(self, document_id)
+    monkeypatch.setattr(document_snapshots.DocumentLoader, "load", failing_load)
+
+    # The failing snapshot is the least recently refreshed, it must not block the other one
+    refresher = SnapshotRefresher(batch_size=1)
+    assert refresher.refresh_batch() == 0
+    assert refresher.refresh_batch() == 1
+    assert refresher.refresh_batch() == 0
+
+    with Session() as db:
+        assert db.get(models.DocumentSnapshot, other_id).corrections_version == 1
+        assert db.get(models.DocumentSnapshot, failing_id).corrections_version == 0
+        add_correction(db, "Totai", "Total", other_id)
+
+    # Retried once the corrections change
+    monkeypatch.setattr(document_snapshots.DocumentLoader, "load", load)
+    assert refresher.refresh_batch() == 1
@@ -0,0 +1,162 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import models
+from processing import job_queue
+from processing.job_queue import STATUS_COMPLETED, STATUS_FAILED, STATUS_PROCESSING, STATUS_QUEUED, DocumentJobQueue
+
+@pytest.fixture(autouse=True)
+def job_queue_sessions(Session, monkeypatch):
+    monkeypatch.setattr(job_queue, "SessionLocal", Session)
+
+@pytest.fixture
+def add_job(add_document):
+    """Returns add_job(db, status, ...): adds a document claimed, created and heartbeating the given minutes ago."""
+    def add_job(db, status, claimed_minutes_ago=None, created_minutes_ago=0, pages=0, heartbeat_minutes_ago=None):
+        now = datetime.now(timezone.utc)
+        return add_document(
+            db, status, words=(), pages=pages, storage_path="invoice.pdf",
+            created_at=now - timedelta(minutes=created_minutes_ago),
+            claimed_at=None if claimed_minutes_ago is None else now - timedelta(minutes=claimed_minutes_ago),
+            heartbeat_at=None if heartbeat_minutes_ago is None else now - timedelta(minutes=heartbeat_minutes_ago)
+        )
+    return add_job
+
+def test_claims_queued_documents_oldest_first(Session, add_job, tmp_path):
+    queue = DocumentJobQueue(tmp_path, claim_timeout=600)
+    with Session() as db:
+        newer = add_job(db, STATUS_QUEUED, created_minutes_ago=1)
+        older = add_job(db, STATUS_QUEUED, created_minutes_ago=2)
+        add_job(db, STATUS_PROCESSING, claimed_minutes_ago=1, created_minutes_ago=3)
+        # Claimed long ago, but its worker is still alive
+        add_job(db, STATUS_PROCESSING, claimed_minutes_ago=60, heartbeat_minutes_ago=1, created_minutes_ago=4)
+
+    assert queue._claim_next_job().document_id == older
+    assert queue._claim_next_job().document_id == newer
+    # The processing document is still within its claim timeout
+    assert queue._claim_next_job() is None
+
+    with Session() as db:
+        document = db.get(models.Document, older)
+        assert document.status == STATUS_PROCESSING and document.claimed_at is not None
+
+def test_abandoned_documents_are_claimed_again(Session, add_job, tmp_path):
+    queue = DocumentJobQueue(tmp_path, claim_timeout=600)
+    with Session() as db:
+        timed_out = add_job(db, STATUS_PROCESSING, claimed_minutes_ago=11, created_minutes_ago=20, pages=2)
+        never_claimed = add_job(db, STATUS_PROCESSING, created_minutes_ago=1)
+
+    assert queue._claim_next_job().document_id == timed_out
+    assert queue._claim_next_job().document_id == never_claimed
+    assert queue._claim_next_job() is None
+
+    with Session() as db:
+        # Pages stored before the worker died are dropped so the retry starts clean
+        assert db.query(models.Page).filter(models.Page.document_id == timed_out).count() == 0
+        claimed_at = db.get(models.Document, timed_out).claimed_at.replace(tzinfo=timezone.utc)
+        assert datetime.now(timezone.utc) - claimed_at < timedelta(minutes=1)
+
+def stub_ocr(monkeypatch, on_window=None):
+    windows = [(0, ["page 0"]), (1, ["page 1"])]
+    monkeypatch.setattr(job_queue, "is_pdf", lambda path: True)
+    monkeypatch.setattr(job_queue, "count_pdf_pages", lambda path: len(windows))
+    monkeypatch.setattr(job_queue, "iter_page_windows", lambda path, window_pages: iter(windows))
+    monkeypatch.setattr(job_queue, "get_active_model_version", lambda db: "test")
+
+    async def recognize_pages(pages, doc_id, output_dir, first_page_idx):
+        if on_window is not None:
+            on_window(first_page_idx)
+        return {"pages": [{"blocks": []}]}, [f"x_page_{first_page_idx}.png"]
+    monkeypatch.setattr(job_queue, "recognize_pages", recognize_pages)
+
+def test_worker_completes_its_claimed_document(Session, add_job, tmp_path, monkeypatch):
+    stub_ocr(monkeypatch)
+    queue = DocumentJobQueue(tmp_path, claim_timeout=600)
+    with Session() as db:
+        doc_id = add_job(db, STATUS_QUEUED)
+
+    queue.run_job(queue._claim_next_job())
+
+    with Session() as db:
+        document = db.get(models.Document, doc_id)
+        assert (document.status, document.page_count) == (STATUS_COMPLETED, 2)
+        assert document.heartbeat_at is not None
+        assert db.query(models.Page).filter(models.Page.document_id == doc_id).count() == 2
+
+def test_cache_failure_keeps_the_document_completed(Session, add_job, tmp_path, monkeypatch):
+    stub_ocr(monkeypatch)
+    def fail(self, content_hash, model_version, document_id):
+        raise RuntimeError("cache unavailable")
+    monkeypatch.setattr(job_queue.OCRResultCache, "store", fail)
+    queue = DocumentJobQueue(tmp_path, claim_timeout=600)
+    with Session() as db:
+        doc_id = add_job(db, STATUS_QUEUED)
+        db.get(models.Document, doc_id).content_hash = "hash"
+        db.commit()
+
+    queue.run_job(queue._claim_next_job())
+
+    with Session() as db:
+        assert db.get(models.Document, doc_id).status == STATUS_COMPLETED
+        assert db.query(models.Page).filter(models.Page.document_id == doc_id).count() == 2
+
+def test_reclaimed_document_is_not_written_by_the_previous_worker(Session, add_job, tmp_path, monkeypatch):
+    queue = DocumentJobQueue(tmp_path, claim_timeout=600)
+    with Session() as db:
+        doc_id = add_job(db, STATUS_QUEUED)
+    stalled = queue._claim_next_job()
+
+    def reclaim(first_page_idx):
+        # While the first window is recognized, another worker takes the document over
+        if first_page_idx == 0:
+            with Session() as db:
+                db.query(models.Document).filter(models.Document.id == doc_id).update(
+                    {"claimed_at": datetime.now(timezone.utc), "heartbeat_at": None})
+                db.commit()
+    stub_ocr(monkeypatch, reclaim)
+
+    queue.run_job(stalled)
+
+    with Session() as db:
+        document = db.get(models.Document, doc_id)
+        assert document.status == STATUS_PROCESSING and document.processing_error is None
+        assert db.query(models.Page).filter(models.Page.document_id == doc_id).count() == 0
+
+def test_failure_is_recorded_only_while_the_claim_holds(Session, add_job, tmp_path, monkeypatch):
+    def fail(first_page_idx):
+        raise RuntimeError("recognition failed")
+    stub_ocr(monkeypatch, fail)
+    queue = DocumentJobQueue(tmp_path, claim_timeout=600)
+    with Session() as db:
+        failed = add_job(db, STATUS_QUEUED, created_minutes_ago=1)
+        reclaimed = add_job(db, STATUS_QUEUED)
+
+    queue.run_job(queue._claim_next_job())
+    claim = queue._claim_next_job()
+    claim.lost.set()
+    queue.run_job(claim)
+
+    with Session() as db:
+        assert db.get(models.Document, failed).status == STATUS_FAILED
+        assert db.get(models.Document, reclaimed).status == STATUS_PROCESSING
+
+def test_heartbeat_refreshes_the_claim_until_it_is_lost(Session, add_job, tmp_path):
+    queue = DocumentJobQueue(tmp_path, claim_timeout=600)
+    with Session() as db:
+        doc_id = add_job(db, STATUS_QUEUED)
+    claim = queue._claim_next_job()
+
+    with Session() as db:
+        assert claim.touch(db)
+        db.commit()
+        assert db.get(models.Document, doc_id).heartbeat_at is not None
+        db.query(models.Document).filter(models.Document.id == doc_id).update(
+            {"claimed_at": datetime.now(timezone.utc) + timedelta(seconds=1)})
+        db.commit()
+        assert not claim.touch(db)
@@ -0,0 +1,45 @@
+import os
+import random
+import re
+import sys
+
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from postprocessing.lexicon_matcher import LexiconMatcher
+
+def regex_replace(text, lexicon):
+    """The previous implementation: one \\b...\\b regex per entry, applied in turn."""
+    applied = []
+    for original, corrected in lexicon.items():
+        pattern = r'\b' + re.escape(original) + r'\b'
+        if re.search(pattern, text, flags=re.IGNORECASE):
+            text = re.sub(pattern, lambda match: corrected, text, flags=re.IGNORECASE)
+            applied.append((original, corrected))
+    return text, applied
+
+@pytest.mark.parametrize("seed", range(300))
+def test_single_entry_matches_regex(seed):
+    """Word boundaries and case folding behave like re's \\b and IGNORECASE."""
+    rng = random.Random(seed)
+    alphabet = "abAB_ .-$1é"
+    misspelled = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+    text = "".join(rng.choice(alphabet) for _ in range(60))
+    lexicon = {misspelled: "X"}
+
+    assert LexiconMatcher(lexicon.items()).replace(text) == regex_replace(text, lexicon)
+
+def test_whole_words_are_replaced_in_one_pass():
+    lexicon = {"teh": "the", "recieved": "received", "inv": "invoice", "inv no": "invoice number"}
+    matcher = LexiconMatcher(lexicon.items())
+
+    text, applied = matcher.replace("Teh INV NO was recieved; teh invoicing inv.")
+    assert text == "the invoice number was received; the invoicing invoice."
+    assert applied == [("teh", "the"), ("inv no", "invoice number"), ("recieved", "received"), ("inv", "invoice")]
+
+def test_replacements_are_not_rescanned():
+    matcher = LexiconMatcher([("a", "b"), ("b", "c")])
+
+    assert matcher.replace("a b") == ("b c", [("a", "b"), ("b", "c")])
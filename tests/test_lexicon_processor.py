@@ -0,0 +1,78 @@
+import os
+import sys
+
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pytest.importorskip("sqlalchemy")
+from database import models
+from database.versions import LEXICONS, bump_version
+from ocr.lexicon_processor import LexiconProcessor
+from postprocessing.lexicon_cache import LexiconCache
+
+@pytest.fixture(autouse=True)
+def lexicon_entries(db):
+    db.add_all([
+        models.Lexicon(misspelled="recieved", corrected="received", document_type="global"),
+        models.Lexicon(misspelled="Totai", corrected="Total", document_type="invoice"),
+    ])
+    db.commit()
+
+def make_ocr_data():
+    return {
+        "pages": [
+            {"blocks": [{"lines": [{"words": [{"value": "RECIEVED"}, {"value": "on"}]}]}]},
+            {"blocks": [{"lines": [{"words": [{"value": "Totai"}]}, {"words": [{"value": "100.00"}]}]}]},
+        ]
+    }
+
+def test_only_modified_paths_are_copied(db):
+    processor = LexiconProcessor(LexiconCache())
+    ocr_data = make_ocr_data()
+
+    corrected, applied = processor.apply_lexicon_corrections(ocr_data, "invoice", db=db)
+
+    assert applied == ["'RECIEVED' -> 'RECEIVED'", "'Totai' -> 'Total'"]
+    assert ocr_data == make_ocr_data()
+    first_line = corrected["pages"][0]["blocks"][0]["lines"][0]
+    assert first_line["words"][0] == {"value": "RECEIVED", "original_value": "RECIEVED", "auto_corrected": True}
+    assert first_line["words"][1] is ocr_data["pages"][0]["blocks"][0]["lines"][0]["words"][1]
+    assert corrected["pages"][1]["blocks"][0]["lines"][1] is ocr_data["pages"][1]["blocks"][0]["lines"][1]
+
+def test_unchanged_data_is_returned_as_is(db):
+    processor = LexiconProcessor(LexiconCache())
+    ocr_data = {"pages": [{"blocks": [{"lines": [{"words": [{"value": "Totai"}]}]}]}]}
+
+    # 'Totai' is an invoice entry, not a global one
+    assert processor.apply_lexicon_corrections(ocr_data, "receipt", db=db) == (ocr_data, [])
+
+def test_lexicon_reloads_when_its_version_moves(db):
+    processor = LexiconProcessor(LexiconCache())
+    ocr_data = {"pages": [{"blocks": [{"lines": [{"words": [{"value": "amuont"}]}]}]}]}
+    assert processor.apply_lexicon_corrections(ocr_data, "invoice", db=db)[1] == []
+
+    db.add(models.Lexicon(misspelled="amuont", corrected="amount", document_type="global"))
+    bump_version(db, LEXICONS)
+    db.commit()
+
+    assert processor.apply_lexicon_corrections(ocr_data, "invoice", db=db)[1] == ["'amuont' -> 'amount'"]
+
+def test_edit_distance_matches_the_lexicon_of_the_document_type(db):
+    processor = LexiconProcessor(LexiconCache())
+    snapshot = processor._get_snapshot("invoice", db)
+
+    assert processor._find_correction("RECIEVD", snapshot) == "RECEIVED"
+    assert processor._find_correction("Totaj", snapshot) == "Total"
+    assert processor._find_correction("Totaj", processor._get_snapshot("receipt", db)) is None
+    # Digits, mostly punctuation and short words are never matched by edit distance
+    assert processor._find_correction("rec1eved", snapshot) is None
+    assert processor._find_correction("Tot", snapshot) is None
+
+def test_edit_distance_lookups_can_be_disabled(db, monkeypatch):
+    monkeypatch.setattr("postprocessing.lexicon_cache.get_config",
+                        lambda: {"corrections.fuzzy": {"lexicon_enabled": False}})
+    processor = LexiconProcessor(LexiconCache())
+
+    assert processor._find_correction("RECIEVD", processor._get_snapshot("invoice", db)) is None
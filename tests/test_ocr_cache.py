@@ -0,0 +1,43 @@
+import pytest
+
+from database import models
+from processing.ocr_cache import OCRResultCache, get_active_model_version
+
+def use_backend(monkeypatch, backend, quantize=False):
+    config = {"ocr.backend": backend, "ocr.onnx.quantize": quantize}
+    monkeypatch.setattr("processing.ocr_cache.get_config", lambda: config)
+
+@pytest.mark.parametrize("backend, quantize, expected", [
+    ("pytorch", False, "doctr-pretrained@pytorch"),
+    ("pytorch", True, "doctr-pretrained@pytorch"),
+    ("onnx", False, "doctr-pretrained@onnx"),
+    ("onnx", True, "doctr-pretrained@onnx-int8"),
+])
+def test_model_version_includes_the_backend(Session, monkeypatch, backend, quantize, expected):
+    use_backend(monkeypatch, backend, quantize)
+    with Session() as db:
+        assert get_active_model_version(db) == expected
+        db.add(models.DeployedModel(model_name="finetuned_v2.pt", is_active=True))
+        db.commit()
+        assert get_active_model_version(db) == expected.replace("doctr-pretrained", "finetuned_v2.pt")
+
+def test_results_of_another_backend_are_not_reused(Session, add_document, monkeypatch):
+    with Session() as db:
+        document_id = add_document(db)
+        use_backend(monkeypatch, "pytorch")
+        OCRResultCache(db).store("hash", get_active_model_version(db), document_id)
+
+        use_backend(monkeypatch, "onnx", quantize=True)
+        assert OCRResultCache(db).lookup("hash", get_active_model_version(db)) is None
+        use_backend(monkeypatch, "pytorch")
+        assert OCRResultCache(db).lookup("hash", get_active_model_version(db)).id == document_id
+
+def test_storing_a_duplicate_entry_is_a_no_op(Session, add_document):
+    with Session() as db:
+        first_id = add_document(db)
+        second_id = add_document(db)
+        OCRResultCache(db).store("hash", "model", first_id)
+        OCRResultCache(db).store("hash", "model", second_id)
+
+        assert OCRResultCache(db).lookup("hash", "model").id == first_id
+        assert db.query(models.OCRCacheEntry).count() == 1
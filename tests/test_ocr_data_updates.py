@@ -0,0 +1,108 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from corrections.correction_cache import get_correction_index_cache
+from database import models
+from main import collect_correction_words
+
+WORDS = ("Totai", "Arnount", "100.00")
+
+def save(client, doc_id, original, corrected):
+    response = client.post("/save_correction", data={
+        "doc_id": str(doc_id), "word_id": "p0_w0", "original_text": original, "corrected_text": corrected
+    })
+    assert response.status_code == 200
+    return response.json()["corrections_version"]
+
+def values(ocr_data):
+    return [word["value"] for line in ocr_data["pages"][0]["blocks"][0]["lines"] for word in line["words"]]
+
+def test_delta_after_one_save(Session, add_document, client):
+    with Session() as db:
+        doc_id = add_document(db, words=WORDS)
+    base_version = client.get(f"/data/document/{doc_id}").json()["correctionsVersion"]
+    assert base_version == 0
+
+    assert save(client, doc_id, "Totai", "Total") == 1
+    response = client.post(f"/update_ocr_data/{doc_id}", data={"base_version": str(base_version)})
+
+    body = response.json()
+    assert (body["mode"], body["version"]) == ("delta", 1)
+    assert [(word["original_value"], word["value"], word["page_idx"]) for word in body["words"]] == [
+        ("Totai", "Total", 0)
+    ]
+    with Session() as db:
+        word = db.query(models.Word).filter(models.Word.text == "Totai").one()
+        assert body["words"][0]["word_id"] == str(word.id)
+
+def test_full_after_two_saves(Session, add_document, client):
+    with Session() as db:
+        doc_id = add_document(db, words=WORDS)
+    save(client, doc_id, "Totai", "Total")
+    save(client, doc_id, "Arnount", "Amount")
+
+    body = client.post(f"/update_ocr_data/{doc_id}", data={"base_version": "0"}).json()
+
+    # The client missed a save, so it gets every corrected word
+    assert (body["mode"], body["version"]) == ("full", 2)
+    assert values(body["ocrData"]) == ["Total", "Amount", "100.00"]
+
+@pytest.mark.parametrize("base_version", ["1", "5", "abc", "-1", "0.5", ""])
+def test_full_for_stale_or_invalid_base_versions(Session, add_document, client, base_version):
+    with Session() as db:
+        doc_id = add_document(db, words=WORDS)
+    save(client, doc_id, "Totai", "Total")
+
+    body = client.post(f"/update_ocr_data/{doc_id}", data={"base_version": base_version}).json()
+
+    assert (body["mode"], body["version"]) == ("full", 1)
+    assert values(body["ocrData"]) == ["Total", "Arnount", "100.00"]
+
+def test_unknown_document(client):
+    assert client.post("/update_ocr_data/not-a-uuid", data={"base_version": "0"}).status_code == 404
+    assert client.post(f"/update_ocr_data/{uuid.uuid4()}", data={"base_version": "0"}).status_code == 404
+
+def test_correction_words_leave_out_other_corrections(Session, add_document, client):
+    with Session() as db:
+        doc_id = add_document(db, words=WORDS)
+    # Opening the document builds the index the saves are recorded into
+    client.get(f"/data/document/{doc_id}")
+    save(client, doc_id, "Totai", "Total")
+    save(client, doc_id, "Arnount", "Amount")
+
+    cache = get_correction_index_cache()
+    with Session() as db:
+        index, version = cache.get_versioned_index(db)
+        changed = collect_correction_words(db, doc_id, index, cache.saved_entry(index, version))
+
+    assert [(word["original_value"], word["value"]) for word in changed] == [("Arnount", "Amount")]
+    assert changed[0]["corrected"] is True
+
+def test_delta_describes_the_saved_correction_despite_clock_skew(Session, add_document, client):
+    with Session() as db:
+        doc_id = add_document(db, words=WORDS)
+        # Imported from a host whose clock runs ahead
+        db.add(models.Correction(document_id=doc_id, original_text="Totai", corrected_text="Total",
+                                 timestamp=datetime.now() + timedelta(days=1)))
+        db.commit()
+    base_version = client.get(f"/data/document/{doc_id}").json()["correctionsVersion"]
+
+    save(client, doc_id, "Arnount", "Amount")
+    body = client.post(f"/update_ocr_data/{doc_id}", data={"base_version": str(base_version)}).json()
+
+    assert body["mode"] == "delta"
+    assert [(word["original_value"], word["value"]) for word in body["words"]] == [("Arnount", "Amount")]
+
+def test_full_when_the_save_was_not_recorded_here(Session, add_document, client):
+    with Session() as db:
+        doc_id = add_document(db, words=WORDS)
+    save(client, doc_id, "Totai", "Total")
+    # As in a web process that did not handle the save: the index is rebuilt
+    get_correction_index_cache().invalidate()
+
+    body = client.post(f"/update_ocr_data/{doc_id}", data={"base_version": "0"}).json()
+
+    assert (body["mode"], body["version"]) == ("full", 1)
+    assert values(body["ocrData"]) == ["Total", "Arnount", "100.00"]
@@ -0,0 +1,50 @@
+import os
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ocr import process_pool
+
+@pytest.fixture
+def shared_page():
+    page = np.arange(12, dtype=np.uint8).reshape(3, 4)
+    shm = shared_memory.SharedMemory(create=True, size=page.nbytes)
+    np.ndarray(page.shape, dtype=page.dtype, buffer=shm.buf)[...] = page
+    yield shm.name, [(page.shape, page.dtype.str, 0)]
+    shm.close()
+    shm.unlink()
+
+def test_worker_reads_the_pages_from_shared_memory(shared_page, monkeypatch):
+    class Result:
+        def __init__(self, pages):
+            self.sums = [int(page.sum()) for page in pages]
+        def export(self):
+            return {"sums": self.sums}
+    monkeypatch.setattr(process_pool, "_worker_predictor", Result)
+
+    assert process_pool._recognize_shared_pages(*shared_page) == {"sums": [66]}
+
+def test_predictor_errors_are_not_hidden_by_closing_the_block(shared_page, monkeypatch):
+    def fail(pages):
+        raise RuntimeError("recognition failed")
+    monkeypatch.setattr(process_pool, "_worker_predictor", fail)
+
+    attach = process_pool._attach_shared_memory
+    class ExportedBlock:
+        """A block whose close() fails as when views into its buffer are still alive."""
+        def __init__(self, name):
+            self.shm = attach(name)
+            self.buf = self.shm.buf
+        def close(self):
+            self.buf = None
+            self.shm.close()
+            raise BufferError("cannot close exported pointers exist")
+    monkeypatch.setattr(process_pool, "_attach_shared_memory", ExportedBlock)
+
+    with pytest.raises(RuntimeError, match="recognition failed"):
+        process_pool._recognize_shared_pages(*shared_page)
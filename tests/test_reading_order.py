@@ -0,0 +1,100 @@
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from postprocessing.reading_order import UNPLACED_LINE_INDEX, compute_reading_order, group_words_into_lines
+
+def legacy_group_words_into_lines(words, y_tolerance=0.015):
+    """The grouping main.py used before reading_order, copied verbatim."""
+    if not words:
+        return []
+
+    def get_coords(w):
+        if not w.geometry or len(w.geometry) < 2:
+            return (0, 0)
+        if isinstance(w.geometry[0], list):
+            return (w.geometry[0][1], w.geometry[0][0])
+        else:
+            return (w.geometry[1], w.geometry[0])
+
+    sorted_words = sorted(words, key=get_coords)
+    lines = []
+    current_line = []
+    current_y = None
+    for word in sorted_words:
+        if not word.geometry or len(word.geometry) < 2:
+            continue
+        word_y = word.geometry[1] if not isinstance(word.geometry[0], list) else word.geometry[0][1]
+        if current_y is None or abs(word_y - current_y) > y_tolerance:
+            if current_line:
+                lines.append(current_line)
+            current_line = []
+            current_y = word_y
+        current_line.append(word)
+    if current_line:
+        lines.append(current_line)
+    return lines
+
+def make_word(index, geometry):
+    return SimpleNamespace(id=index, text=f"w{index}", geometry=geometry, line_index=None, word_index=None)
+
+def make_page(rng, count):
+    words = []
+    for index in range(count):
+        # Coarse steps put many words exactly on, or just past, the line tolerance
+        y = rng.randrange(40) * rng.choice([0.005, 0.0075, 0.015])
+        x = rng.randrange(20) * 0.05
+        shape = rng.random()
+        if shape < 0.45:
+            geometry = [[x, y], [x + 0.04, y + 0.01]]
+        elif shape < 0.9:
+            geometry = [x, y]
+        else:
+            geometry = rng.choice([None, [], [x]])
+        words.append(make_word(index, geometry))
+    return words
+
+def ids(lines):
+    return [[word.id for word in line] for line in lines]
+
+@pytest.mark.parametrize("seed", range(20))
+def test_grouping_matches_legacy_grouping(seed):
+    rng = random.Random(seed)
+    words = make_page(rng, rng.randint(1, 300))
+
+    assert ids(group_words_into_lines(words)) == ids(legacy_group_words_into_lines(words))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_stored_order_gives_the_same_lines(seed):
+    rng = random.Random(seed)
+    words = make_page(rng, 200)
+    expected = ids(legacy_group_words_into_lines(words))
+
+    # As ingest stores it, then read back ordered by (line_index, word_index)
+    for word, (line_index, word_index) in zip(words, compute_reading_order([word.geometry for word in words])):
+        word.line_index, word.word_index = line_index, word_index
+    stored = sorted(words, key=lambda word: (word.line_index, word.word_index))
+
+    assert ids(group_words_into_lines(stored)) == expected
+
+def test_empty_page():
+    assert compute_reading_order([]) == []
+    assert group_words_into_lines([]) == []
+
+def test_page_without_usable_geometry():
+    words = [make_word(0, None), make_word(1, [0.5])]
+
+    assert compute_reading_order([word.geometry for word in words]) == [(UNPLACED_LINE_INDEX, 0)] * 2
+    assert group_words_into_lines(words) == []
+
+def test_single_word_line():
+    words = [make_word(0, [[0.1, 0.5], [0.2, 0.52]])]
+
+    assert compute_reading_order([words[0].geometry]) == [(0, 0)]
+    assert ids(group_words_into_lines(words)) == [[0]]
@@ -16,6 +16,7 @@ logger = logging.getLogger(__name__)
 
 from database.connector import get_db
 from database import models
+from processing.ocr_cache import OCRResultCache, model_version_for
 from sqlalchemy.orm import Session
 
 class ModelDeploymentManager:
@@ -65,6 +66,9 @@ class ModelDeploymentManager:
         with open(self.active_model_link, 'wb') as f:
             f.write(model_data)
 
+        # Cached OCR results from the previous model are no longer valid
+        OCRResultCache(self.db).evict_stale(model_version_for(model_filename))
+
         return {"status": "success", "message": f"Model {model_filename} deployed."}
 
     def get_active_model_info(self) -> Optional[Dict]:
@@ -96,6 +100,8 @@ class ModelDeploymentManager:
         with open(self.active_model_link, 'wb') as f:
             f.write(previous_active.model_data)
 
+        OCRResultCache(self.db).evict_stale(model_version_for(previous_active.model_name))
+
         return {"status": "success", "message": f"Rolled back to model {previous_active.model_name}"}
 
 def deploy_best_model(deployed_by: str = "system", notes: str = "") -> Dict: